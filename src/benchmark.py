@@ -0,0 +1,234 @@
+"""
+端到端基准测试 - 用模拟爬虫和模拟发布器运行完整的 crawl_and_publish 和清理，不访问网络
+
+用法:
+    python src/benchmark.py --sources 8 --articles 200 --rate 100 --publish-latency 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import NewsApp
+from models.article import Article
+from crawlers.base_crawler import BaseCrawler
+from services.crawler_factory import CrawlerFactory
+from services.publisher_manager import PublisherManager
+from utils.run_budget import RunBudget
+
+logger = logging.getLogger("benchmark")
+
+
+class BenchmarkCrawler(BaseCrawler):
+    """模拟爬虫：按配置的速率产出指定大小的合成文章"""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def crawl(self) -> List[Article]:
+        return await self.collect()
+
+    async def stream(self):
+        count = self.config.get('articles', 100)
+        batch_size = max(1, self.config.get('batch_size', 20))
+        rate = self.config.get('rate', 0)
+        body = 'x' * self.config.get('content_size', 2000)
+        run = self.config.get('run', 0)
+
+        batch = []
+        for index in range(count):
+            batch.append(Article(
+                title=f"{self.name} 第{run}轮 文章{index}",
+                content=f"{index} {body}",
+                source=self.name,
+                url=f"https://bench.local/{self.name}/{run}/{index}",
+                publish_time=datetime.now(),
+                rank=index + 1
+            ))
+            self.mark_seen(f"{run}-{index}")
+            if len(batch) >= batch_size:
+                if rate:
+                    await asyncio.sleep(len(batch) / rate)
+                yield batch
+                batch = []
+        if batch:
+            if rate:
+                await asyncio.sleep(len(batch) / rate)
+            yield batch
+
+
+class BenchmarkPublisher:
+    """模拟发布器：每次调用等待配置的延迟，记录调用时间"""
+
+    calls: List[Dict[str, Any]] = []
+
+    def __init__(self, config: Dict[str, Any], template_config: Dict[str, str] = None):
+        self.config = config
+        self.latency = config.get('latency', 0.0)
+        self.name = config.get('name', 'publisher')
+
+    async def _call(self, count: int) -> bool:
+        start = time.monotonic()
+        await asyncio.sleep(self.latency)
+        BenchmarkPublisher.calls.append({'publisher': self.name, 'start': start, 'end': time.monotonic(), 'articles': count})
+        return True
+
+    async def publish(self, article) -> bool:
+        return await self._call(len(article) if isinstance(article, list) else 1)
+
+    async def send_digest(self, articles: List[Article], subject: str = None) -> bool:
+        return await self._call(len(articles))
+
+
+def build_config(args, data_dir: str, run: int) -> Dict[str, Any]:
+    """基准测试用配置：模拟来源和模拟发布器，关闭自适应调度和磁带"""
+    crawlers = {
+        f"bench_{index}": {
+            'type': 'BenchmarkCrawler',
+            'articles': args.articles,
+            'batch_size': args.batch_size,
+            'rate': args.rate,
+            'content_size': args.content_size,
+            'run': run
+        }
+        for index in range(args.sources)
+    }
+    return {
+        'data_dir': data_dir,
+        'crawlers': crawlers,
+        'wechat': {'enabled': True, 'name': 'wechat', 'latency': args.publish_latency, 'digest_mode': args.digest},
+        'xiaohongshu': {'enabled': args.xiaohongshu, 'name': 'xiaohongshu', 'latency': args.publish_latency},
+        'email': {'enabled': True, 'name': 'email', 'latency': args.email_latency, 'min_articles': 1},
+        'publish_settings': {'max_articles_per_hour': args.max_publish},
+        'pipeline': {
+            'queue_size': args.queue_size,
+            'save_workers': args.save_workers,
+            'publish_workers': args.publish_workers,
+            'crawl_concurrency': args.crawl_concurrency
+        },
+        'data_management': {'cleanup_enabled': True, 'keep_count': args.keep_count, 'keep_days': 7},
+        'adaptive_schedule': {'enabled': False},
+        'run_budget': {'enabled': False},
+        'cpu_pool': {'workers': 0},
+        'http_cassette': {'mode': 'off'},
+        'web': {'preserve_data': True}
+    }
+
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    """执行若干轮并汇总结果"""
+    CrawlerFactory.register_crawler('BenchmarkCrawler', BenchmarkCrawler)
+    for name in ('wechat', 'xiaohongshu', 'email'):
+        PublisherManager.register_publisher(name, BenchmarkPublisher)
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='xinwen_bench_')
+    rounds = []
+    tracemalloc.start()
+    try:
+        for run in range(args.runs):
+            BenchmarkPublisher.calls = []
+            tracemalloc.reset_peak()
+            config = build_config(args, data_dir, run)
+            app = NewsApp(config)
+            # 预算未启用，只用来记录各阶段耗时
+            budget = RunBudget(config['run_budget'])
+
+            start = time.monotonic()
+            await app.crawl_and_publish(budget)
+            crawl_publish_seconds = time.monotonic() - start
+
+            cleanup_start = time.monotonic()
+            await app.storage.cleanup_old_articles(keep_count=args.keep_count, keep_days=7)
+            cleanup_seconds = time.monotonic() - cleanup_start
+            await app.shutdown()
+            stages = budget.stage_seconds
+
+            report = app.article_service.metrics.to_report()
+            sources = report.get('sources', {})
+            calls = BenchmarkPublisher.calls
+            yielded = sum(item.get('articles_yielded', 0) for item in sources.values())
+            crawl_seconds = max((item.get('duration_seconds', 0) for item in sources.values()), default=0)
+            _, peak = tracemalloc.get_traced_memory()
+            rounds.append({
+                'run': run,
+                'articles_yielded': yielded,
+                'crawl_seconds': round(crawl_seconds, 3),
+                # 保存和发布阶段为上游结束之后的收尾时间，与爬取重叠的部分不计入
+                'save_seconds': stages.get('save'),
+                'publish_seconds': stages.get('publish'),
+                'crawl_and_publish_seconds': round(crawl_publish_seconds, 3),
+                'cleanup_seconds': round(cleanup_seconds, 3),
+                'first_publish_seconds': round(min(call['start'] for call in calls) - start, 3) if calls else None,
+                'publish_calls': len(calls),
+                'publish_busy_seconds': round(sum(call['end'] - call['start'] for call in calls), 3),
+                'articles_per_second': round(yielded / crawl_publish_seconds, 1) if crawl_publish_seconds else None,
+                'peak_traced_mb': round(peak / (1024 * 1024), 2)
+            })
+            logger.warning(f"第 {run} 轮: {json.dumps(rounds[-1], ensure_ascii=False)}")
+    finally:
+        tracemalloc.stop()
+        if not args.data_dir and not args.keep:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    return {
+        'settings': {key: value for key, value in vars(args).items() if key != 'output'},
+        'rounds': rounds,
+        # 进程的最大常驻内存（Linux 上单位为KB）
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'data_dir': data_dir if (args.data_dir or args.keep) else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬取-发布流水线基准测试（模拟爬虫和发布器，不访问网络）")
+    parser.add_argument('--sources', type=int, default=4, help="模拟来源数")
+    parser.add_argument('--articles', type=int, default=200, help="每个来源每轮的文章数")
+    parser.add_argument('--batch-size', type=int, default=20, help="每批文章数")
+    parser.add_argument('--rate', type=float, default=200, help="每个来源每秒产出的文章数，0表示不限")
+    parser.add_argument('--content-size', type=int, default=2000, help="正文字符数")
+    parser.add_argument('--publish-latency', type=float, default=0.05, help="微信/小红书每次发布的延迟（秒）")
+    parser.add_argument('--email-latency', type=float, default=0.2, help="邮件发送延迟（秒）")
+    parser.add_argument('--max-publish', type=int, default=20, help="每小时最多发布的文章数")
+    parser.add_argument('--digest', action='store_true', help="微信使用汇总模式")
+    parser.add_argument('--xiaohongshu', action='store_true', help="启用小红书模拟发布")
+    parser.add_argument('--queue-size', type=int, default=8, help="流水线队列长度")
+    parser.add_argument('--save-workers', type=int, default=2, help="保存协程数")
+    parser.add_argument('--publish-workers', type=int, default=1, help="微信逐篇发布协程数")
+    parser.add_argument('--crawl-concurrency', type=int, default=0, help="同时运行的爬虫数，0表示不限")
+    parser.add_argument('--keep-count', type=int, default=200, help="清理时保留的文章数")
+    parser.add_argument('--runs', type=int, default=1, help="运行轮数")
+    parser.add_argument('--data-dir', help="数据目录，默认使用临时目录并在结束后删除")
+    parser.add_argument('--keep', action='store_true', help="保留临时数据目录")
+    parser.add_argument('--output', help="把结果写入JSON文件")
+    parser.add_argument('--log-level', default='WARNING', help="日志级别")
+    args = parser.parse_args()
+
+    # 日志只输出到标准错误，不写 crawler.log
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.WARNING),
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    result = asyncio.run(run_benchmark(args))
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
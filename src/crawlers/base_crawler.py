@@ -1,8 +1,20 @@
 import aiohttp
 import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Any, Optional, Sequence, Tuple
 from models.article import Article
+from storage.watermark_store import Watermark
+from utils.charset import decode_body
+from utils.cpu_pool import run_in_cpu_pool_timed
+from utils.crawl_metrics import SourceMetrics
+from utils.http_cassette import cassette_mode, record_response
+from utils.http_reader import DEFAULT_MAX_RESPONSE_BYTES, StreamedResponse, check_content_type, read_capped
+from utils.rate_limiter import get_host_limiter
+from utils.retry import retry_async
+from utils.session_pool import acquire_session
 
 class BaseCrawler(ABC):
     """爬虫基类"""
@@ -11,21 +23,218 @@ class BaseCrawler(ABC):
         self.name = name
         self.config = config
         self.session = None
+        self.timeout: Optional[aiohttp.ClientTimeout] = None
+        self._owns_session = True
+        # 由 ArticleService 在爬取前注入，未注入时按全量爬取处理
+        self.watermark: Optional[Watermark] = None
+        # 熔断器半开探测时只调用 check() 发一次请求，不重试，不产出文章
+        self.probe = False
+        # 请求统计，用于判断来源是否整体不可用
+        self.fetch_successes = 0
+        self.fetch_errors = 0
+        self.last_error: Optional[BaseException] = None
+        # 指标由 ArticleService 注入到本次运行的报告中
+        self.metrics = SourceMetrics(name)
         self.logger = logging.getLogger(f"crawler.{name}")
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        self.timeout = aiohttp.ClientTimeout(total=self.config.get('timeout', 30))
+        # 常驻模式下复用共享会话；回放模式下使用磁带会话，不访问网络
+        self.session, self._owns_session = acquire_session(self.timeout)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
+        if self.session and self._owns_session:
             await self.session.close()
     
+    @property
+    def retry_config(self) -> Dict[str, Any]:
+        """重试配置，探测模式下不重试"""
+        if self.probe:
+            return {'attempts': 1}
+        return self.config.get('retry', {})
+    
+    async def fetch_text(self, url: str, headers: Dict[str, str] = None,
+                         allowed_types: Optional[Sequence[str]] = None, truncate: bool = False) -> str:
+        """按主机限速获取页面文本，失败按退避策略重试，非2xx响应抛出 aiohttp.ClientResponseError
+        
+        Args:
+            url: 请求地址
+            headers: 请求头
+            allowed_types: 允许的 Content-Type 子串列表
+            truncate: 响应超过 max_response_bytes 时截断而不是报错
+        """
+        body, content_type = await self._fetch(url, headers, allowed_types, truncate)
+        return decode_body(body, content_type)
+    
+    async def fetch_bytes(self, url: str, headers: Dict[str, str] = None,
+                          allowed_types: Optional[Sequence[str]] = None) -> bytes:
+        """同 fetch_text，返回未解码的响应体（适合JSON等自带编码规则的格式）"""
+        body, _ = await self._fetch(url, headers, allowed_types, False)
+        return body
+    
+    async def _fetch(self, url: str, headers: Optional[Dict[str, str]],
+                     allowed_types: Optional[Sequence[str]], truncate: bool) -> Tuple[bytes, str]:
+        """请求URL，返回响应体和 Content-Type"""
+        limiter = get_host_limiter(url, self.config.get('rate_limit'))
+        max_bytes = self.config.get('max_response_bytes', DEFAULT_MAX_RESPONSE_BYTES)
+        
+        async def fetch_once() -> Tuple[bytes, str]:
+            async with limiter.throttle() as outcome:
+                start = time.monotonic()
+                try:
+                    async with self.session.get(url, headers=headers, timeout=self.timeout) as response:
+                        outcome.status = response.status
+                        outcome.retry_after = response.headers.get('Retry-After')
+                        if response.status >= 400:
+                            record_response('GET', url, response.status, response.headers, b'',
+                                            request_headers=response.request_info.headers)
+                        response.raise_for_status()
+                        body = await read_capped(response, max_bytes, allowed_types, truncate)
+                        elapsed = time.monotonic() - start
+                        self.metrics.observe_fetch(elapsed, len(body))
+                        record_response('GET', url, response.status, response.headers, body, elapsed,
+                                        response.request_info.headers)
+                        return body, response.headers.get('Content-Type', '')
+                except Exception as e:
+                    self.metrics.observe_error(e)
+                    raise
+        
+        try:
+            result = await retry_async(fetch_once, self.retry_config, description=f"请求 {url}")
+        except Exception as e:
+            self.fetch_errors += 1
+            self.last_error = e
+            raise
+        self.fetch_successes += 1
+        return result
+    
+    @asynccontextmanager
+    async def open_stream(self, url: str, headers: Dict[str, str] = None,
+                          allowed_types: Optional[Sequence[str]] = None) -> AsyncIterator[StreamedResponse]:
+        """按主机限速打开响应用于流式读取，连接阶段失败按退避策略重试
+        
+        在块内用 iter_chunks() 逐块读取，提前退出时直接关闭连接，不再下载剩余部分。
+        字节上限使用 max_stream_bytes 配置（默认64MB）。
+        """
+        limiter = get_host_limiter(url, self.config.get('rate_limit'))
+        max_bytes = self.config.get('max_stream_bytes', 64 * 1024 * 1024)
+        
+        # 只在建立连接和接收响应头期间占用主机的并发名额：读取响应体时调用方可能
+        # 还要请求同一主机的其他页面（例如逐条抓取正文），一直占用会互相等待。
+        # 与 _fetch 相同，每次尝试单独获取名额，退避等待期间不占用
+        start = time.monotonic()
+        
+        async def connect() -> aiohttp.ClientResponse:
+            async with limiter.throttle() as outcome:
+                response = await self.session.get(url, headers=headers, timeout=self.timeout)
+                outcome.status = response.status
+                outcome.retry_after = response.headers.get('Retry-After')
+                try:
+                    response.raise_for_status()
+                    check_content_type(response, allowed_types)
+                except Exception:
+                    response.close()
+                    raise
+                return response
+        
+        try:
+            response = await retry_async(connect, self.retry_config, description=f"请求 {url}")
+        except Exception as e:
+            self.metrics.observe_error(e)
+            self.fetch_errors += 1
+            self.last_error = e
+            raise
+        self.fetch_successes += 1
+        
+        recording = cassette_mode() == 'record'
+        stream = StreamedResponse(response, max_bytes, keep_body=recording)
+        failed = False
+        try:
+            yield stream
+        except Exception as e:
+            failed = True
+            self.metrics.observe_error(e)
+            raise
+        finally:
+            if recording and not failed and not stream.completed:
+                # 录制时读完整个响应（包括提前停止的情况），回放时才能取到完整内容
+                async for _ in stream.iter_chunks():
+                    pass
+            response.close()
+            elapsed = time.monotonic() - start
+            self.metrics.observe_fetch(elapsed, stream.received)
+            if recording and stream.completed:
+                record_response('GET', url, response.status, response.headers, bytes(stream.body), elapsed,
+                                response.request_info.headers)
+    
+    async def parse(self, func, *args):
+        """在CPU工作池中执行解析函数并记录CPU耗时"""
+        result, cpu_seconds = await run_in_cpu_pool_timed(func, *args)
+        self.metrics.observe_parse(cpu_seconds)
+        return result
+    
+    @property
+    def failed(self) -> bool:
+        """本次爬取是否整体失败（有请求失败且没有任何请求成功）"""
+        return self.fetch_errors > 0 and self.fetch_successes == 0
+    
     @abstractmethod
     async def crawl(self) -> List[Article]:
         """爬取数据，返回文章列表"""
         pass
     
+    async def stream(self) -> AsyncIterator[List[Article]]:
+        """按批次产出文章，默认一次性产出 crawl() 的结果
+        
+        支持流式的爬虫重写此方法，并用 collect() 实现 crawl()。
+        """
+        articles = await self.crawl()
+        if articles:
+            yield articles
+    
+    async def collect(self) -> List[Article]:
+        """收集 stream() 产出的全部文章"""
+        articles = []
+        async for batch in self.stream():
+            articles.extend(batch)
+        return articles
+    
+    async def check(self):
+        """熔断器半开探测：请求一次来源入口地址（探测模式下不重试），失败时抛出异常
+        
+        只确认来源是否恢复，不翻页、不抓取正文；探测成功后下次运行再正常爬取。
+        """
+        url = self.config.get('url')
+        if not url:
+            raise ValueError(f"来源 {self.name} 未配置 url，无法探测")
+        # 响应超过 max_response_bytes 时截断即可，探测只关心请求是否成功
+        await self._fetch(url, self.config.get('headers', {}), None, True)
+    
+    @property
+    def batch_size(self) -> int:
+        """流式产出时每批的文章数量"""
+        return max(1, self.config.get('batch_size', 5))
+    
     def should_crawl(self) -> bool:
         """判断是否应该爬取（可用于频率控制）"""
-        return self.config.get('enabled', True)
\ No newline at end of file
+        return self.config.get('enabled', True)
+    
+    @property
+    def incremental(self) -> bool:
+        """是否启用增量爬取（遇到已爬过的条目即停止）"""
+        return self.watermark is not None and self.config.get('incremental', True)
+    
+    def is_seen(self, key: str, publish_time: datetime = None) -> bool:
+        """条目是否在上次运行时已经爬过"""
+        return self.incremental and self.watermark.is_seen(key, publish_time)
+    
+    def mark_seen(self, key: str, publish_time: datetime = None):
+        """记录本次爬到的条目"""
+        if self.watermark is not None:
+            self.watermark.mark(key, publish_time)
+    
+    @property
+    def new_count(self) -> int:
+        """上次运行之后新出现的条目数"""
+        return self.watermark.new_count if self.watermark is not None else 0
\ No newline at end of file
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+from models.article import Article
+from crawlers.base_crawler import BaseCrawler
+from utils.http_cassette import cassette_config
+
+# 子进程脚本
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'isolated_worker.py')
+
+# 单行输出上限（一批文章序列化后的大小）
+LINE_LIMIT = 32 * 1024 * 1024
+
+# 内存检查间隔（秒）
+MEMORY_CHECK_INTERVAL = 1.0
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+class IsolatedCrawlerError(Exception):
+    """隔离运行的爬虫子进程异常退出或超出限制"""
+
+
+def process_group_rss(pgid: int) -> Optional[int]:
+    """统计进程组（包括浏览器等子进程）的常驻内存字节数，不支持 /proc 时返回None"""
+    if not os.path.isdir('/proc'):
+        return None
+    total = 0
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                stat = f.read()
+            # comm 字段可能含空格，从最后一个右括号之后开始按空格拆分
+            fields = stat[stat.rindex(b')') + 2:].split()
+            if int(fields[2]) == pgid:
+                total += int(fields[21]) * _PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+class IsolatedCrawler(BaseCrawler):
+    """在独立子进程中运行爬虫，文章批次通过管道流式返回
+
+    子进程及其启动的浏览器位于独立进程组，超出内存或时间限制时整组终止，
+    不影响主进程和其他来源。配置项 isolate 为 true 时由 CrawlerFactory 创建。
+    """
+
+    async def __aenter__(self):
+        # 请求在子进程中发出，主进程不需要会话
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def crawl(self) -> List[Article]:
+        """在子进程中爬取"""
+        return await self.collect()
+
+    async def check(self):
+        """在子进程中探测，子进程只发一次请求，不返回文章"""
+        async for _ in self.stream():
+            pass
+
+    def _task(self) -> dict:
+        """发给子进程的任务描述"""
+        config = {key: value for key, value in self.config.items() if key != 'isolate'}
+        return {
+            'name': self.name,
+            'config': config,
+            'watermark': self.watermark.to_dict() if self.watermark is not None else None,
+            'watermark_max_keys': self.watermark.max_keys if self.watermark is not None else 200,
+            'incremental': self.incremental,
+            'probe': self.probe,
+            'cassette': cassette_config(),
+            'log_level': logging.getLogger().getEffectiveLevel()
+        }
+
+    async def _forward_logs(self, stderr: asyncio.StreamReader):
+        """把子进程的日志转发到主进程日志"""
+        while True:
+            line = await stderr.readline()
+            if not line:
+                return
+            text = line.decode('utf-8', errors='replace').rstrip()
+            level, _, rest = text.partition('|')
+            name, _, message = rest.partition('|')
+            if level.isdigit() and name:
+                logging.getLogger(name).log(int(level), message)
+            elif text:
+                self.logger.warning(f"[子进程] {text}")
+
+    async def _watch_memory(self, pgid: int, limit_bytes: int, on_exceed):
+        """定期检查进程组内存，超限时回调"""
+        while True:
+            await asyncio.sleep(MEMORY_CHECK_INTERVAL)
+            rss = process_group_rss(pgid)
+            if rss is None:
+                self.logger.warning("当前系统不支持统计子进程内存，内存限制不生效")
+                return
+            if rss > limit_bytes:
+                on_exceed(rss)
+                return
+
+    @staticmethod
+    def _kill_group(process: asyncio.subprocess.Process, sig: int):
+        try:
+            os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    async def _terminate(self, process: asyncio.subprocess.Process):
+        """先 SIGTERM 整个进程组，5秒内未退出则 SIGKILL"""
+        if process.returncode is not None:
+            # 主进程已退出，仍可能残留浏览器进程
+            self._kill_group(process, signal.SIGKILL)
+            return
+        self._kill_group(process, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            pass
+        self._kill_group(process, signal.SIGKILL)
+        await process.wait()
+
+    def _apply_done(self, message: dict):
+        """合并子进程的运行结果：水位线、请求统计和指标"""
+        for value, publish_time in message.get('marks', []):
+            self.mark_seen(value, datetime.fromisoformat(publish_time) if publish_time else None)
+        self.fetch_successes += message.get('fetch_successes', 0)
+        self.fetch_errors += message.get('fetch_errors', 0)
+        if message.get('last_error'):
+            self.last_error = IsolatedCrawlerError(message['last_error'])
+        self.metrics.merge_state(message.get('metrics', {}))
+
+    async def stream(self) -> AsyncIterator[List[Article]]:
+        """启动子进程并逐批产出其返回的文章"""
+        time_limit = self.config.get('time_limit', 600)
+        memory_limit = self.config.get('memory_limit_mb', 1024) * 1024 * 1024
+        deadline = time.monotonic() + time_limit
+        killed_reason = None
+
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, WORKER_SCRIPT,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+            limit=LINE_LIMIT
+        )
+        self.logger.info(f"隔离爬虫 {self.name} 子进程已启动 (pid {process.pid})")
+
+        def on_memory_exceeded(rss: int):
+            nonlocal killed_reason
+            killed_reason = f"内存 {rss // (1024 * 1024)}MB 超过限制 {memory_limit // (1024 * 1024)}MB"
+            self._kill_group(process, signal.SIGKILL)
+
+        log_task = asyncio.create_task(self._forward_logs(process.stderr))
+        memory_task = asyncio.create_task(self._watch_memory(process.pid, memory_limit, on_memory_exceeded))
+        done = None
+        error = None
+
+        try:
+            process.stdin.write(json.dumps(self._task(), ensure_ascii=False).encode('utf-8') + b'\n')
+            await process.stdin.drain()
+            process.stdin.close()
+
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    killed_reason = f"运行超过 {time_limit} 秒"
+                    break
+                try:
+                    line = await asyncio.wait_for(process.stdout.readline(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    killed_reason = f"运行超过 {time_limit} 秒"
+                    break
+                if not line:
+                    break
+
+                message = json.loads(line)
+                if message['type'] == 'batch':
+                    batch = [Article.from_dict(data) for data in message['articles']]
+                    if batch:
+                        yield batch
+                elif message['type'] == 'done':
+                    done = message
+                elif message['type'] == 'error':
+                    error = message.get('error')
+        finally:
+            memory_task.cancel()
+            await self._terminate(process)
+            await asyncio.gather(memory_task, return_exceptions=True)
+            await log_task
+
+        if done is not None:
+            self._apply_done(done)
+            self.logger.info(f"隔离爬虫 {self.name} 子进程已结束")
+            return
+
+        reason = killed_reason or error or f"子进程退出码 {process.returncode}"
+        self.logger.error(f"隔离爬虫 {self.name} 失败: {reason}")
+        raise IsolatedCrawlerError(reason)
@@ -0,0 +1,99 @@
+"""
+隔离爬虫子进程 - 从标准输入读取任务，运行爬虫，把文章批次按JSON行写到标准输出
+
+由 IsolatedCrawler 启动，不直接运行。
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sys
+
+# 与 main.py 相同，以 src 为导入根目录
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.crawler_factory import CrawlerFactory
+from storage.watermark_store import Watermark
+from utils.cpu_pool import configure_cpu_pool
+from utils.http_cassette import configure_cassette
+
+
+class _RecordingWatermark(Watermark):
+    """记录本次 mark 调用，结束时交给主进程重放"""
+
+    def __init__(self, data=None, max_keys: int = 200):
+        super().__init__(data, max_keys)
+        self.marks = []
+
+    def mark(self, value, publish_time=None) -> bool:
+        self.marks.append([value, publish_time.isoformat() if publish_time else None])
+        return super().mark(value, publish_time)
+
+
+class _Output:
+    """协议输出：原标准输出只用于JSON行，其他打印内容转到标准错误"""
+
+    def __init__(self):
+        self._out = os.fdopen(os.dup(1), 'wb')
+        os.dup2(2, 1)
+        sys.stdout = sys.stderr
+
+    def send(self, message: dict):
+        self._out.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+        self._out.flush()
+
+
+async def run(task: dict, output: _Output):
+    """运行爬虫并逐批输出"""
+    name = task['name']
+    config = task['config']
+    crawler = CrawlerFactory.create_crawler(config.get('type'), name, config)
+    if crawler is None:
+        output.send({'type': 'error', 'error': f"无法创建爬虫 {config.get('type')}"})
+        return
+
+    watermark = _RecordingWatermark(task.get('watermark'), task.get('watermark_max_keys', 200))
+    crawler.watermark = watermark if task.get('incremental', True) else None
+    crawler.probe = task.get('probe', False)
+
+    async with crawler:
+        if crawler.probe:
+            await crawler.check()
+        else:
+            async for batch in crawler.stream():
+                output.send({'type': 'batch', 'articles': [article.to_dict() for article in batch]})
+
+    output.send({
+        'type': 'done',
+        'marks': watermark.marks,
+        'fetch_successes': crawler.fetch_successes,
+        'fetch_errors': crawler.fetch_errors,
+        'last_error': repr(crawler.last_error) if crawler.last_error else None,
+        'metrics': crawler.metrics.to_state()
+    })
+
+
+def main():
+    output = _Output()
+    task = json.loads(sys.stdin.readline())
+
+    # 日志按 "级别|记录器|消息" 写到标准错误，由主进程转发到自己的日志
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter('%(levelno)d|%(name)s|%(message)s'))
+    logging.basicConfig(level=task.get('log_level', logging.INFO), handlers=[handler])
+
+    # 子进程本身已与主进程隔离，解析直接在进程内执行
+    configure_cpu_pool({'workers': 0})
+    configure_cassette(task.get('cassette'))
+
+    try:
+        asyncio.run(run(task, output))
+    except Exception as e:
+        logging.getLogger(f"crawler.{task.get('name')}").exception(f"隔离爬虫异常: {e}")
+        output.send({'type': 'error', 'error': repr(e)})
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
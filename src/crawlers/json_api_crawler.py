@@ -0,0 +1,259 @@
+import asyncio
+from contextlib import aclosing
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+
+# 流式JSON解析，大响应体只构建需要的条目
+import ijson
+
+from models.article import Article
+from crawlers.base_crawler import BaseCrawler
+from utils.html_cleaner import clean_html
+from utils.http_reader import JSON_TYPES
+
+# 默认字段映射：Article字段 -> 条目中的点分路径
+DEFAULT_FIELD_MAP = {
+    'title': 'title',
+    'url': 'url',
+    'content': 'content',
+    'summary': 'summary',
+    'author': 'author',
+    'publish_time': 'publish_time',
+    'tags': 'tags'
+}
+
+
+def get_path(data: Any, path: str) -> Any:
+    """按点分路径取值，数字段作为列表下标，不存在时返回None"""
+    if not path:
+        return data
+    for part in path.split('.'):
+        if isinstance(data, dict):
+            data = data.get(part)
+        elif isinstance(data, list) and part.isdigit() and int(part) < len(data):
+            data = data[int(part)]
+        else:
+            return None
+        if data is None:
+            return None
+    return data
+
+
+def _build_value(events, event: str, value: Any) -> Any:
+    """从当前事件开始构建一个完整的值（对象或数组时读到对应的结束事件）"""
+    if event not in ('start_map', 'start_array'):
+        return value
+    builder = ijson.ObjectBuilder()
+    depth = 1
+    while depth:
+        builder.event(event, value)
+        _, event, value = next(events)
+        if event in ('start_map', 'start_array'):
+            depth += 1
+        elif event in ('end_map', 'end_array'):
+            depth -= 1
+    return builder.value
+
+
+def decode_page(body: bytes, items_path: str, cursor_path: str = '', limit: int = 0) -> Tuple[List[Any], Any]:
+    """解码一页响应，返回条目列表和下一页游标（纯函数，可提交到CPU工作池执行）
+
+    单次扫描解析事件流，只构建前 limit 个条目和游标，
+    两者都已取得时停止扫描，不构建整棵文档树。
+    """
+    item_prefix = f"{items_path}.item" if items_path else "item"
+    items = []
+    cursor = None
+    cursor_found = not cursor_path
+    events = iter(ijson.parse(body, use_float=True))
+    for prefix, event, value in events:
+        if prefix == item_prefix and event not in ('map_key', 'end_map', 'end_array'):
+            if not limit or len(items) < limit:
+                items.append(_build_value(events, event, value))
+        elif not cursor_found and prefix == cursor_path and event not in ('map_key', 'end_map', 'end_array'):
+            cursor = _build_value(events, event, value)
+            cursor_found = True
+        if cursor_found and limit and len(items) >= limit:
+            break
+    return items, cursor
+
+
+def parse_time(value: Any) -> Optional[datetime]:
+    """解析时间戳（秒或毫秒）或ISO格式时间"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit()):
+        timestamp = float(value)
+        if timestamp > 1e11:
+            timestamp /= 1000
+        try:
+            return datetime.fromtimestamp(timestamp)
+        except (OverflowError, OSError, ValueError):
+            return None
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return None
+
+
+class JsonApiCrawler(BaseCrawler):
+    """通用JSON接口爬虫，按配置的字段映射生成文章，不需要启动浏览器"""
+
+    async def crawl(self) -> List[Article]:
+        """爬取JSON接口"""
+        return await self.collect()
+
+    @property
+    def pagination(self) -> Dict[str, Any]:
+        """分页配置：type 为 none / page / cursor"""
+        return self.config.get('pagination', {})
+
+    def _page_url(self, params: Dict[str, Any]) -> str:
+        """在配置的URL上设置查询参数"""
+        parts = urlparse(self.config['url'])
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        query.update({key: str(value) for key, value in params.items()})
+        return urlunparse(parts._replace(query=urlencode(query)))
+
+    async def _fetch_page(self, url: str) -> Tuple[List[Any], Any]:
+        """获取并解码一页"""
+        body = await self.fetch_bytes(url, headers=self.config.get('headers', {}), allowed_types=JSON_TYPES)
+        cursor_path = self.pagination.get('cursor_path', '') if self.pagination.get('type') == 'cursor' else ''
+        return await self.parse(decode_page, body, self.config.get('items_path', ''), cursor_path,
+                                self.config.get('max_articles', 20))
+
+    async def _pages(self) -> AsyncIterator[List[Any]]:
+        """按页序产出各页条目"""
+        mode = self.pagination.get('type', 'none')
+        max_pages = max(1, self.pagination.get('max_pages', 1))
+
+        if mode == 'page':
+            # 页码已知，各页并发获取，按页序产出；提前停止时取消未完成的页
+            param = self.pagination.get('param', 'page')
+            start = self.pagination.get('start', 1)
+            semaphore = asyncio.Semaphore(max(1, self.pagination.get('concurrency', 3)))
+
+            async def fetch(page: int) -> Tuple[List[Any], Any]:
+                async with semaphore:
+                    return await self._fetch_page(self._page_url({param: page}))
+
+            tasks = [asyncio.create_task(fetch(start + n)) for n in range(max_pages)]
+            try:
+                for task in tasks:
+                    items, _ = await task
+                    if not items:
+                        break
+                    yield items
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        elif mode == 'cursor':
+            # 下一页游标来自上一页响应，只能顺序获取
+            param = self.pagination.get('param', 'cursor')
+            cursor = self.pagination.get('start')
+            for _ in range(max_pages):
+                url = self._page_url({param: cursor}) if cursor is not None and cursor != '' else self.config['url']
+                items, cursor = await self._fetch_page(url)
+                if items:
+                    yield items
+                # 游标可以是 0，不能用 in (None, '', False) 判断（0 == False）
+                if not items or cursor is None or cursor == '' or cursor is False:
+                    break
+
+        else:
+            items, _ = await self._fetch_page(self.config['url'])
+            if items:
+                yield items
+
+    def _to_article(self, item: Any, field_map: Dict[str, str], rank: int) -> Optional[Article]:
+        """按字段映射把条目转换为文章，缺少标题时返回None"""
+        if not isinstance(item, dict):
+            return None
+        title = get_path(item, field_map['title'])
+        if not title:
+            return None
+
+        url = get_path(item, field_map['url'])
+        url = urljoin(self.config.get('base_url') or self.config['url'], str(url)) if url else ""
+        summary = get_path(item, field_map['summary'])
+        summary = clean_html(str(summary)) if summary else None
+        content = get_path(item, field_map['content'])
+        author = get_path(item, field_map['author'])
+
+        tags = get_path(item, field_map['tags'])
+        if isinstance(tags, str):
+            tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
+        elif isinstance(tags, list):
+            tags = [str(tag) for tag in tags if isinstance(tag, (str, int, float))]
+        else:
+            tags = []
+
+        return Article(
+            title=str(title).strip(),
+            content=clean_html(str(content)) if content else (summary or ""),
+            source=self.name,
+            url=url,
+            publish_time=parse_time(get_path(item, field_map['publish_time'])) or datetime.now(),
+            author=str(author) if author else None,
+            summary=summary,
+            tags=tags,
+            rank=rank
+        )
+
+    async def stream(self) -> AsyncIterator[List[Article]]:
+        """爬取JSON接口，按批次产出"""
+        if not self.config.get('url'):
+            self.logger.error(f"JSON接口爬虫 {self.name} 未配置URL")
+            return
+
+        field_map = {**DEFAULT_FIELD_MAP, **self.config.get('field_map', {})}
+        max_articles = self.config.get('max_articles', 20)
+        # 按时间倒序的接口遇到已爬过的条目即停止；热榜类接口只统计新条目
+        ordered_by_time = self.config.get('ordered_by_time', False)
+        batch = []
+        count = 0
+        keys = set()
+
+        try:
+            async with aclosing(self._pages()) as pages:
+                async for items in pages:
+                    stop = False
+                    for item in items:
+                        article = self._to_article(item, field_map, count + 1)
+                        if article is None:
+                            continue
+                        # 分页期间榜单变化可能导致条目跨页重复
+                        key = article.url or article.title
+                        if key in keys:
+                            continue
+                        keys.add(key)
+
+                        if ordered_by_time and self.is_seen(key, article.publish_time):
+                            self.logger.info(f"JSON接口爬虫 {self.name} 到达上次爬取位置，停止")
+                            stop = True
+                            break
+                        self.mark_seen(key, article.publish_time if ordered_by_time else None)
+
+                        batch.append(article)
+                        count += 1
+                        if len(batch) >= self.batch_size:
+                            yield batch
+                            batch = []
+                        if count >= max_articles:
+                            stop = True
+                            break
+                    if stop:
+                        break
+
+            if batch:
+                yield batch
+
+        except Exception as e:
+            self.logger.error(f"JSON接口爬虫 {self.name} 出错: {e}")
+            if batch:
+                yield batch
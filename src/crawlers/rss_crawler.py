@@ -1,28 +1,45 @@
+import asyncio
+import time
 import feedparser
-from bs4 import BeautifulSoup
 from datetime import datetime
-from typing import List
+from typing import AsyncIterator, List
 from models.article import Article
 from crawlers.base_crawler import BaseCrawler
-from utils.html_cleaner import clean_html
+from utils.http_reader import FEED_TYPES, HTML_TYPES
+from utils.content_extractor import DEFAULT_MAX_LENGTH, extract_main_content
+
+# 主要内容区域选择器，按优先级排列
+CONTENT_SELECTORS = [
+    'article',
+    '.content',
+    '.post-content',
+    '.entry-content',
+    '.article-content'
+]
 
 class RSSCrawler(BaseCrawler):
     """RSS feed爬虫"""
 
     async def crawl(self) -> List[Article]:
         """爬取RSS feed"""
-        articles = []
+        return await self.collect()
+
+    async def stream(self) -> AsyncIterator[List[Article]]:
+        """爬取RSS feed，每凑满一批就获取完整内容并产出"""
+        batch = []
+        count = 0
 
         try:
             # 获取RSS内容
             feed_url = self.config.get('url')
             headers = self.config.get('headers', {})
 
-            async with self.session.get(feed_url, headers=headers) as response:
-                content = await response.text()
+            content = await self.fetch_text(feed_url, headers=headers, allowed_types=FEED_TYPES)
 
             # 解析RSS
+            parse_start = time.process_time()
             feed = feedparser.parse(content)
+            self.metrics.observe_parse(time.process_time() - parse_start)
 
             for entry in feed.entries:
                 # 提取文章信息
@@ -32,64 +49,56 @@ class RSSCrawler(BaseCrawler):
 
                 # 处理发布时间
                 published_time = entry.get('published_parsed')
-                if published_time:
-                    publish_time = datetime(*published_time[:6])
-                else:
-                    publish_time = datetime.now()
+                entry_time = datetime(*published_time[:6]) if published_time else None
+                publish_time = entry_time or datetime.now()
 
-                # 获取完整内容
-                content = await self.get_full_content(link)
+                # 增量爬取：feed按时间倒序，遇到上次已爬过的条目即停止
+                if self.is_seen(link or title, entry_time):
+                    self.logger.info(f"RSS爬虫 {self.name} 到达上次爬取位置，停止")
+                    break
+                self.mark_seen(link or title, entry_time)
 
-                article = Article(
+                batch.append(Article(
                     title=title,
-                    content=content or summary,
+                    content=summary,
                     source=self.name,
                     url=link,
                     publish_time=publish_time,
                     author=entry.get('author', ''),
                     summary=summary
-                )
+                ))
+                count += 1
 
-                articles.append(article)
+                if len(batch) >= self.batch_size:
+                    yield await self._fill_contents(batch)
+                    batch = []
 
                 # 限制文章数量
-                if len(articles) >= self.config.get('max_articles', 10):
+                if count >= self.config.get('max_articles', 10):
                     break
 
+            if batch:
+                yield await self._fill_contents(batch)
+
         except Exception as e:
             self.logger.error(f"RSS爬虫 {self.name} 出错: {e}")
 
+    async def _fill_contents(self, articles: List[Article]) -> List[Article]:
+        """并发获取一批文章的完整内容，实际并发度由主机限速器控制"""
+        contents = await asyncio.gather(*(self.get_full_content(article.url) for article in articles))
+        for article, full_content in zip(articles, contents):
+            article.content = full_content or article.summary
         return articles
 
     async def get_full_content(self, url: str) -> str:
         """获取文章完整内容"""
         try:
-            async with self.session.get(url) as response:
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-
-                # 移除脚本和样式
-                for script in soup(["script", "style"]):
-                    script.decompose()
-
-                # 尝试找到主要内容区域
-                content_selectors = [
-                    'article',
-                    '.content',
-                    '.post-content',
-                    '.entry-content',
-                    '.article-content'
-                ]
-
-                for selector in content_selectors:
-                    content_div = soup.select_one(selector)
-                    if content_div:
-                        return clean_html(content_div.get_text(strip=True))
-
-                # 如果没找到特定区域，返回body内容
-                body = soup.find('body')
-                if body:
-                    return clean_html(body.get_text(strip=True)[:2000])  # 限制长度
+            # 正文页超限时只保留前面部分，正文提取够长度即停止
+            html = await self.fetch_text(url, allowed_types=HTML_TYPES, truncate=True)
+
+            # 单次扫描提取正文，解析交给CPU工作池，避免阻塞其他网络请求
+            max_length = self.config.get('max_content_length', DEFAULT_MAX_LENGTH)
+            return await self.parse(extract_main_content, html, CONTENT_SELECTORS, max_length)
 
         except Exception as e:
             self.logger.error(f"获取完整内容失败 {url}: {e}")
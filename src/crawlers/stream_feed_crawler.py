@@ -0,0 +1,274 @@
+import asyncio
+import codecs
+import re
+import time
+from contextlib import aclosing
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from xml.etree.ElementTree import Element, XMLPullParser
+
+from models.article import Article
+from crawlers.base_crawler import BaseCrawler
+from utils.charset import detect_encoding
+from utils.content_extractor import DEFAULT_MAX_LENGTH, extract_main_content
+from utils.html_cleaner import clean_html
+from utils.http_reader import FEED_TYPES, HTML_TYPES
+
+# 正文区域选择器，可在配置中通过 content_selectors 覆盖
+CONTENT_SELECTORS = [
+    'article',
+    '.content',
+    '.post-content',
+    '.entry-content',
+    '.article-content'
+]
+
+# 根元素 -> 条目元素
+_ENTRY_TAGS = {
+    'rss': 'item',
+    'RDF': 'item',
+    'feed': 'entry',
+    'urlset': 'url',
+    'sitemapindex': 'sitemap'
+}
+
+# 按时间倒序排列的条目类型，遇到已爬过的条目即可停止
+_ORDERED_KINDS = {'item', 'entry'}
+
+_TITLE_RE = re.compile(r'<title[^>]*>(.*?)</title>', re.I | re.S)
+
+
+def _local(tag: Any) -> str:
+    """去掉命名空间的标签名"""
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def _child_text(elem: Element, *names: str) -> str:
+    """按名称顺序取第一个有文本的子元素"""
+    for name in names:
+        for child in elem:
+            if _local(child.tag) == name and child.text and child.text.strip():
+                return child.text.strip()
+    return ''
+
+
+def _descendant_text(elem: Element, name: str) -> str:
+    """取第一个有文本的后代元素"""
+    for child in elem.iter():
+        if child is not elem and _local(child.tag) == name and child.text and child.text.strip():
+            return child.text.strip()
+    return ''
+
+
+def _parse_time(value: str) -> Optional[datetime]:
+    """解析 RFC 822 / ISO 8601 时间，统一为不带时区的UTC时间"""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _entry_fields(elem: Element, kind: str) -> Dict[str, Any]:
+    """提取条目字段"""
+    if kind == 'item':
+        description = _child_text(elem, 'description')
+        return {
+            'title': _child_text(elem, 'title'),
+            'url': _child_text(elem, 'link', 'guid'),
+            'summary': description,
+            'content': _child_text(elem, 'encoded') or description,
+            'author': _child_text(elem, 'creator', 'author'),
+            'publish_time': _parse_time(_child_text(elem, 'pubDate', 'date'))
+        }
+
+    if kind == 'entry':
+        url = ''
+        for child in elem:
+            if _local(child.tag) == 'link' and child.get('rel', 'alternate') == 'alternate':
+                url = child.get('href', '')
+                break
+        author = next((child for child in elem if _local(child.tag) == 'author'), None)
+        summary = _child_text(elem, 'summary')
+        return {
+            'title': _child_text(elem, 'title'),
+            'url': url,
+            'summary': summary,
+            'content': _child_text(elem, 'content') or summary,
+            'author': _child_text(author, 'name') if author is not None else '',
+            'publish_time': _parse_time(_child_text(elem, 'published', 'updated'))
+        }
+
+    # 网站地图条目只有地址和时间，Google News 地图带有标题
+    return {
+        'title': _descendant_text(elem, 'title') if kind == 'url' else '',
+        'url': _child_text(elem, 'loc'),
+        'summary': '',
+        'content': '',
+        'author': '',
+        'publish_time': _parse_time(_child_text(elem, 'lastmod') or _descendant_text(elem, 'publication_date'))
+    }
+
+
+def extract_page(html: str, selectors: List[str], max_length: int) -> Tuple[str, str]:
+    """提取页面标题和正文（纯函数，可提交到CPU工作池执行）"""
+    match = _TITLE_RE.search(html)
+    title = clean_html(match.group(1)) if match else ''
+    return title, extract_main_content(html, selectors, max_length)
+
+
+class StreamingFeedCrawler(BaseCrawler):
+    """流式 RSS/Atom/网站地图爬虫，边下载边解析，取够条目即断开连接"""
+
+    async def crawl(self) -> List[Article]:
+        """爬取feed或网站地图"""
+        return await self.collect()
+
+    async def _iter_entries(self, url: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """流式解析一个文档，逐条产出 (条目类型, 字段)
+
+        每个条目解析完即从树中移除，内存占用与文档大小无关。
+        """
+        headers = self.config.get('headers', {})
+        async with self.open_stream(url, headers=headers, allowed_types=FEED_TYPES) as response:
+            parser = XMLPullParser(events=('start', 'end'))
+            decoder = None
+            stack: List[Element] = []
+            kind = None
+
+            async for chunk in response.iter_chunks():
+                if decoder is None:
+                    # 按首块确定编码，解码后交给解析器，避免 expat 不支持的中文编码
+                    encoding = detect_encoding(chunk, response.content_type)
+                    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+                parse_start = time.process_time()
+                parser.feed(decoder.decode(chunk))
+                entries = []
+                for event, elem in parser.read_events():
+                    if event == 'start':
+                        if kind is None:
+                            kind = _ENTRY_TAGS.get(_local(elem.tag))
+                            if kind is None:
+                                raise ValueError(f"不支持的文档类型 <{_local(elem.tag)}>: {url}")
+                        stack.append(elem)
+                        continue
+
+                    stack.pop()
+                    if _local(elem.tag) == kind:
+                        entries.append(_entry_fields(elem, kind))
+                        elem.clear()
+                        if stack:
+                            stack[-1].remove(elem)
+                self.metrics.observe_parse(time.process_time() - parse_start)
+
+                for fields in entries:
+                    yield kind, fields
+
+    async def _walk(self, url: str, depth: int = 0) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """产出文档中的条目，网站地图索引按最近修改时间展开子地图"""
+        children = []
+        async with aclosing(self._iter_entries(url)) as entries:
+            async for kind, fields in entries:
+                if kind != 'sitemap':
+                    yield kind, fields
+                elif fields['url']:
+                    children.append((fields['publish_time'] or datetime.min, fields['url']))
+
+        if not children:
+            return
+        if depth >= self.config.get('max_sitemap_depth', 2):
+            self.logger.warning(f"网站地图嵌套超过 {depth} 层，忽略: {url}")
+            return
+
+        children.sort(reverse=True)
+        for _, child_url in children[:self.config.get('max_sitemaps', 3)]:
+            async with aclosing(self._walk(child_url, depth + 1)) as entries:
+                async for item in entries:
+                    yield item
+
+    async def stream(self) -> AsyncIterator[List[Article]]:
+        """流式爬取，每凑满一批就获取完整内容并产出"""
+        url = self.config.get('url')
+        if not url:
+            self.logger.error(f"流式feed爬虫 {self.name} 未配置URL")
+            return
+
+        max_articles = self.config.get('max_articles', 10)
+        batch = []
+        count = 0
+
+        try:
+            async with aclosing(self._walk(url)) as entries:
+                async for kind, fields in entries:
+                    key = fields['url'] or fields['title']
+                    if not key:
+                        continue
+
+                    # 增量爬取：feed按时间倒序，遇到已爬过的条目即停止；网站地图无序，跳过即可
+                    if self.is_seen(key, fields['publish_time']):
+                        if kind in _ORDERED_KINDS:
+                            self.logger.info(f"流式feed爬虫 {self.name} 到达上次爬取位置，停止")
+                            break
+                        continue
+                    self.mark_seen(key, fields['publish_time'])
+
+                    summary = clean_html(fields['summary']) if fields['summary'] else ''
+                    batch.append(Article(
+                        title=fields['title'],
+                        content=clean_html(fields['content']) if fields['content'] else summary,
+                        source=self.name,
+                        url=fields['url'],
+                        publish_time=fields['publish_time'] or datetime.now(),
+                        author=fields['author'],
+                        summary=summary
+                    ))
+                    count += 1
+
+                    if len(batch) >= self.batch_size:
+                        yield await self._fill_contents(batch)
+                        batch = []
+
+                    # 取够条目即停止，剩余部分不再下载
+                    if count >= max_articles:
+                        break
+
+        except Exception as e:
+            self.logger.error(f"流式feed爬虫 {self.name} 出错: {e}")
+
+        if batch:
+            yield await self._fill_contents(batch)
+
+    async def _fill_contents(self, articles: List[Article]) -> List[Article]:
+        """并发获取一批文章的完整内容，缺少标题的网站地图条目同时补全标题"""
+        if not self.config.get('fetch_content', True):
+            for article in articles:
+                article.title = article.title or article.url
+            return articles
+
+        pages = await asyncio.gather(*(self._get_page(article.url) for article in articles))
+        for article, (title, content) in zip(articles, pages):
+            article.title = article.title or title or article.url
+            article.content = content or article.content
+        return articles
+
+    async def _get_page(self, url: str) -> Tuple[str, str]:
+        """获取文章页面的标题和正文"""
+        if not url:
+            return '', ''
+        try:
+            html = await self.fetch_text(url, allowed_types=HTML_TYPES, truncate=True)
+            selectors = self.config.get('content_selectors', CONTENT_SELECTORS)
+            max_length = self.config.get('max_content_length', DEFAULT_MAX_LENGTH)
+            return await self.parse(extract_page, html, selectors, max_length)
+        except Exception as e:
+            self.logger.error(f"获取完整内容失败 {url}: {e}")
+        return '', ''
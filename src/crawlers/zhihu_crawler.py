@@ -1,90 +1,128 @@
 import asyncio
-from typing import List
+from typing import Any, AsyncIterator, Dict, List
 from datetime import datetime
 from bs4 import BeautifulSoup
 from models.article import Article
 from crawlers.base_crawler import BaseCrawler
-from utils.html_cleaner import clean_html
+from utils.http_reader import HTML_TYPES
+from utils.content_extractor import extract_main_content
+
+# 文章正文区域选择器
+ARTICLE_CONTENT_SELECTORS = ['div[class*="ArticleContent"]']
+
+
+def parse_column_page(html: str) -> List[Dict[str, Any]]:
+    """解析专栏页面，返回文章条目列表（纯函数，可提交到CPU工作池执行）"""
+    soup = BeautifulSoup(html, 'html.parser')
+    entries = []
+
+    # 提取文章列表 (基于搜索结果中的XPath转换为CSS选择器)
+    for article in soup.select('div[class*="ColumnPage-articles"] > div'):
+        # 提取文章链接
+        link_tag = article.select_one('a[class*="ContentItem-title"]')
+        if not link_tag:
+            continue
+        article_url = link_tag['href']
+        if not article_url.startswith('http'):
+            article_url = f"https://zhihu.com{article_url}"
+
+        # 提取发布时间
+        time_tag = article.select_one('time')
+        publish_time = None
+        if time_tag and 'datetime' in time_tag.attrs:
+            try:
+                publish_time = datetime.fromisoformat(time_tag['datetime'].replace('Z', '+00:00'))
+            except ValueError:
+                pass
+
+        # 提取作者信息
+        author_tag = article.select_one('a[class*="UserLink"]')
+        # 提取文章摘要
+        summary_tag = article.select_one('div[class*="ContentItem-summary"]')
+
+        entries.append({
+            'url': article_url,
+            'title': link_tag.get_text(strip=True),
+            'publish_time': publish_time,
+            'author': author_tag.get_text(strip=True) if author_tag else "",
+            'summary': summary_tag.get_text(strip=True) if summary_tag else ""
+        })
+
+    return entries
+
 
 class ZhihuColumnCrawler(BaseCrawler):
     """知乎专栏爬虫"""
 
     async def crawl(self) -> List[Article]:
         """爬取知乎专栏文章"""
-        articles = []
+        return await self.collect()
+
+    async def stream(self) -> AsyncIterator[List[Article]]:
+        """爬取知乎专栏文章，按批次并发获取详情并产出"""
         column_url = self.config.get('url')
         if not column_url:
             self.logger.error("知乎专栏URL未配置")
-            return articles
+            return
 
         try:
             # 初始页面请求
-            async with self.session.get(column_url, headers=self._get_headers()) as response:
-                html = await response.text()
-                print(html)
-                soup = BeautifulSoup(html, 'html.parser')
-
-                # 提取文章列表 (基于搜索结果中的XPath转换为CSS选择器)
-                article_elements = soup.select('div[class*="ColumnPage-articles"] > div')
-                self.logger.info(f"找到{len(article_elements)}篇文章")
-
-                for idx, article in enumerate(article_elements):
-                    # 提取文章链接
-                    link_tag = article.select_one('a[class*="ContentItem-title"]')
-                    if not link_tag:
-                        continue
-                    article_url = link_tag['href']
-                    if not article_url.startswith('http'):
-                        article_url = f"https://zhihu.com{article_url}"
-
-                    # 提取标题
-                    title = link_tag.get_text(strip=True)
-
-                    # 提取发布时间
-                    time_tag = article.select_one('time')
-                    publish_time = datetime.now()
-                    if time_tag and 'datetime' in time_tag.attrs:
-                        try:
-                            publish_time = datetime.fromisoformat(time_tag['datetime'].replace('Z', '+00:00'))
-                        except ValueError:
-                            pass
-
-                    # 获取文章详情
-                    content = await self._get_article_content(article_url)
-
-                    # 创建文章对象
-                    articles.append(Article(
-                        title=title,
+            html = await self.fetch_text(column_url, headers=self._get_headers(), allowed_types=HTML_TYPES)
+
+            entries = await self.parse(parse_column_page, html)
+            self.logger.info(f"找到{len(entries)}篇文章")
+
+            selected = []
+            for entry in entries:
+                # 增量爬取：专栏按时间倒序，遇到上次已爬过的文章即停止
+                if self.is_seen(entry['url'], entry['publish_time']):
+                    self.logger.info("到达上次爬取位置，停止")
+                    break
+                self.mark_seen(entry['url'], entry['publish_time'])
+                selected.append(entry)
+
+                # 控制爬取数量
+                if len(selected) >= self.config.get('max_articles', 10):
+                    break
+
+            for start in range(0, len(selected), self.batch_size):
+                batch = selected[start:start + self.batch_size]
+
+                # 并发获取文章详情，实际并发度由主机限速器控制
+                contents = await asyncio.gather(*(self._get_article_content(entry['url']) for entry in batch))
+
+                # 创建文章对象
+                yield [
+                    Article(
+                        title=entry['title'],
                         content=content,
                         source=self.name,
-                        url=article_url,
-                        publish_time=publish_time,
-                        author=self._extract_author(article),
-                        summary=self._extract_summary(article)
-                    ))
-
-                    # 控制爬取数量
-                    if len(articles) >= self.config.get('max_articles', 10):
-                        break
+                        url=entry['url'],
+                        publish_time=entry['publish_time'] or datetime.now(),
+                        author=entry['author'],
+                        summary=entry['summary']
+                    )
+                    for entry, content in zip(batch, contents)
+                ]
 
         except Exception as e:
             self.logger.error(f"知乎专栏爬虫出错: {str(e)}")
 
-        return articles
-
     async def _get_article_content(self, url: str) -> str:
         """获取文章详细内容"""
         try:
-            async with self.session.get(url, headers=self._get_headers()) as response:
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                content_div = soup.select_one('div[class*="ArticleContent"]')
-                if content_div:
-                    return clean_html(content_div.get_text())
+            html = await self.fetch_text(url, headers=self._get_headers(), allowed_types=HTML_TYPES, truncate=True)
+            # 知乎文章原来不截断，默认保持全文，可用 max_content_length 限制
+            max_length = self.config.get('max_content_length', 0)
+            return await self.parse(extract_main_content, html, ARTICLE_CONTENT_SELECTORS, max_length)
         except Exception as e:
             self.logger.error(f"获取文章内容失败 {url}: {str(e)}")
         return ""
 
+    async def check(self):
+        """探测时带上与正常爬取相同的请求头，只请求专栏页"""
+        await self.fetch_text(self.config['url'], headers=self._get_headers(), allowed_types=HTML_TYPES, truncate=True)
+
     def _get_headers(self):
         """构建请求头"""
         return {
@@ -93,13 +131,3 @@ class ZhihuColumnCrawler(BaseCrawler):
             'Accept-Language': 'zh-CN,zh;q=0.8,en-US;q=0.5,en;q=0.3',
             'Referer': 'https://www.zhihu.com/'
         }
-
-    def _extract_author(self, article_element) -> str:
-        """提取作者信息"""
-        author_tag = article_element.select_one('a[class*="UserLink"]')
-        return author_tag.get_text(strip=True) if author_tag else ""
-
-    def _extract_summary(self, article_element) -> str:
-        """提取文章摘要"""
-        summary_tag = article_element.select_one('div[class*="ContentItem-summary"]')
-        return summary_tag.get_text(strip=True) if summary_tag else ""
\ No newline at end of file
@@ -1,30 +1,48 @@
+import argparse
 import asyncio
 import logging
 import os
+import signal
 import sys
+import time
 from datetime import datetime
 
 # 将父目录添加到Python路径中，以便导入配置文件等
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+_import_start = time.perf_counter()
 from storage.file_storage import FileStorage
 from services.config_manager import ConfigManager
 from services.publisher_manager import PublisherManager
 from services.article_service import ArticleService
 from services.publish_service import PublishService
-# from services.scheduler_service import SchedulerService  # 使用crontab方式，不需要内置调度器
+from services.pipeline_service import PipelineService
+from services.job_queue import JobQueue
+from services.crawl_worker import CrawlWorker
+from services.scheduler_service import SchedulerService
+from utils.browser_pool import close_browser_pool, enable_browser_pool
+from utils.cpu_pool import configure_cpu_pool, shutdown_cpu_pool
+from utils.http_cassette import configure_cassette
+from utils.import_timer import get_import_report, record_import_time
 from utils.logger import setup_logger
+from utils.rate_limiter import reset_host_limiters
+from utils.run_budget import RunBudget
+from utils.run_journal import RunJournal
+from utils.session_pool import close_shared_session, enable_shared_session
+
+# 启动时导入的模块耗时，爬虫和发布器模块在启用时才按需导入
+record_import_time('main', time.perf_counter() - _import_start)
 
 # 设置日志
-setup_logger()
 logger = logging.getLogger("main")
 
 class NewsApp:
     """新闻应用主类"""
     
-    def __init__(self):
+    def __init__(self, config: dict = None):
         self.config_manager = ConfigManager()
-        self.config = self.config_manager.load_config()
+        # 传入配置时不读取 config.ini（基准测试等场景）
+        self.config = config if config is not None else self.config_manager.load_config()
         
         # 初始化存储
         storage_config = {
@@ -32,74 +50,206 @@ class NewsApp:
         }
         self.storage = FileStorage(storage_config)
         
+        self._setup()
+        # 常驻模式使用内置调度器，crontab方式下不使用
+        self.scheduler = None
+        self._reload_requested = False
+    
+    def _setup(self):
+        """根据当前配置初始化工作池和服务"""
+        # 初始化CPU工作池（HTML解析在独立进程中执行）
+        configure_cpu_pool(self.config.get('cpu_pool', {}))
+        
+        # HTTP录制/回放（默认关闭）
+        configure_cassette(self.config.get('http_cassette', {}))
+        
         # 初始化服务
         self.publisher_manager = PublisherManager(self.config)
-        self.article_service = ArticleService(self.storage)
+        self.article_service = ArticleService(self.storage, self.config)
         self.publish_service = PublishService(self.storage, self.publisher_manager, self.config)
-        # 注释掉 scheduler，因为使用crontab方式不需要内置定时器
-        # self.scheduler = SchedulerService(self.crawl_and_publish)
+        self.pipeline = PipelineService(self.storage, self.article_service, self.publish_service, self.config)
+    
+    def reload(self):
+        """重新加载配置并重建服务（存储、会话和浏览器保持不变）"""
+        self.config = self.config_manager.reload()
+        # 限速器按配置创建，丢弃旧的以使用新的 rate_limit
+        reset_host_limiters()
+        self._setup()
+        logger.info("配置已重新加载")
     
-    async def crawl_and_publish(self):
-        """爬取并发布文章"""
+    async def crawl_and_publish(self, budget: RunBudget = None):
+        """爬取并发布文章（本小时内上一次运行中断时从断点继续）"""
+        budget = budget or RunBudget(self.config.get('run_budget', {}))
+        journal = RunJournal(self.storage.data_dir)
+        if not journal.begin():
+            return
         try:
             logger.info("开始爬取和发布任务")
             
-            # 爬取文章
-            crawlers_config = self.config.get('crawlers', {})
-            articles = await self.article_service.crawl_articles(crawlers_config)
-
-            # 保存文章
-            await self.article_service.save_articles(articles)
-            
-            # 获取未发布文章
-            max_publish = self.config.get('publish_settings', {}).get('max_articles_per_hour', 1)
-            unpublished = await self.article_service.get_unpublished_articles(limit=max_publish, current_hour_only=True)
-
-            # 发布到各平台
-            await self.publish_service.publish_to_wechat(unpublished)
-            await self.publish_service.publish_to_xiaohongshu(unpublished)
-            await self.publish_service.send_email_digest()
+            if self.config.get('job_queue', {}).get('enabled', False):
+                # 爬取分发给任务队列的工作进程，结果由其他进程保存，发布时从存储读取
+                await self.crawl_via_queue(budget)
+                await budget.run('publish', self.pipeline.publish_from_storage(journal))
+            else:
+                # 爬取、去重、保存、发布各阶段经有界队列并发执行，新文章在内存中直接交给发布阶段
+                await self.pipeline.run(self.config.get('crawlers', {}), journal=journal, budget=budget)
             
+            journal.finish()
             logger.info("爬取和发布任务完成")
             
         except Exception as e:
             logger.error(f"爬取和发布任务异常: {e}")
+        finally:
+            # 未正常结束时保留运行日志，下一次运行从断点继续
+            journal.close()
+    
+    def enqueue_due_sources(self, run_id: str = None) -> int:
+        """把到期的来源加入任务队列，返回新增的任务数"""
+        queue = JobQueue(self.config.get('job_queue', {}))
+        run_id = run_id or datetime.now().strftime('%Y%m%d%H%M%S')
+        added = 0
+        for name, crawler_config in self.article_service.due_sources(self.config.get('crawlers', {})).items():
+            if queue.enqueue(name, crawler_config, run_id) is not None:
+                added += 1
+        removed = queue.purge()
+        logger.info(f"已加入 {added} 个爬取任务（批次 {run_id}），清理 {removed} 个旧任务")
+        return added
+    
+    async def crawl_via_queue(self, budget: RunBudget = None):
+        """入队本轮到期的来源并等待工作进程完成（超时后照常发布已保存的文章）"""
+        queue_config = self.config.get('job_queue', {})
+        queue = JobQueue(queue_config)
+        run_id = datetime.now().strftime('%Y%m%d%H%M%S')
+        await asyncio.to_thread(self.enqueue_due_sources, run_id)
+        
+        wait_timeout = queue.config['wait_timeout']
+        crawl_budget = budget.timeout('crawl') if budget is not None else None
+        if crawl_budget is not None:
+            wait_timeout = min(wait_timeout, crawl_budget)
+        deadline = time.monotonic() + wait_timeout
+        while True:
+            counts = await asyncio.to_thread(queue.counts, run_id)
+            remaining = counts.get('pending', 0) + counts.get('leased', 0)
+            if remaining == 0:
+                logger.info(f"本轮爬取任务已结束: {counts}")
+                return
+            if time.monotonic() >= deadline:
+                logger.warning(f"等待爬取任务超时，仍有 {remaining} 个未完成: {counts}")
+                return
+            await asyncio.sleep(queue.config['poll_interval'])
+    
+    async def run_worker(self, worker_id: str = None, exit_when_idle: bool = False):
+        """作为任务队列的工作进程运行，SIGTERM/SIGINT 在当前任务完成后退出"""
+        queue = JobQueue(self.config.get('job_queue', {}))
+        worker = CrawlWorker(self.storage, self.config, queue, worker_id)
+        
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, worker.stop)
+        loop.add_signal_handler(signal.SIGINT, worker.stop)
+        try:
+            await worker.run(exit_when_idle=exit_when_idle)
+        finally:
+            await self.shutdown()
+    
+    async def run_cycle(self):
+        """执行一轮爬取、发布、清理，并输出本轮指标"""
+        if self._reload_requested:
+            self._reload_requested = False
+            self.reload()
+        
+        # 整轮截止时间和各阶段预算，整点任务在一小时内结束
+        budget = RunBudget(self.config.get('run_budget', {}))
+        
+        # 执行爬取和发布
+        await self.crawl_and_publish(budget)
+        
+        # 清理旧数据（根据配置文件）
+        data_config = self.config.get('data_management', {})
+        if data_config.get('cleanup_enabled', True):
+            keep_count = data_config.get('keep_count', 200)
+            keep_days = data_config.get('keep_days', 7)
+            
+            logger.info(f"开始清理旧数据（保留{keep_count}篇文章或{keep_days}天内数据）...")
+            deleted_count = await budget.run(
+                'cleanup', self.storage.cleanup_old_articles(keep_count=keep_count, keep_days=keep_days)
+            ) or 0
+            if deleted_count > 0:
+                logger.info(f"数据清理完成，删除了 {deleted_count} 个旧文件")
+            else:
+                logger.info("无需清理数据")
+        else:
+            logger.info("数据清理已禁用")
+        
+        # 输出本次运行的爬虫指标（JSON报告和Prometheus文本格式）
+        import_report = get_import_report()
+        logger.info(f"模块导入耗时(ms): {import_report}")
+        self.article_service.metrics.extra['import_times_ms'] = import_report
+        if budget.exceeded:
+            self.article_service.metrics.extra['budget_exceeded'] = budget.exceeded
+        self.article_service.metrics.extra['stage_seconds'] = budget.stage_seconds
+        if self.pipeline.last_report:
+            self.article_service.metrics.extra['publish'] = self.pipeline.last_report
+        self.article_service.metrics.write(self.storage.data_dir)
+    
+    async def run_crawl_only(self):
+        """常驻模式下整点之间的爬取：只爬取到期的来源并保存，不发布"""
+        if self._reload_requested:
+            self._reload_requested = False
+            self.reload()
+        
+        budget = RunBudget(self.config.get('run_budget', {}))
+        await self.pipeline.run(self.config.get('crawlers', {}), publish=False, budget=budget)
+        self.article_service.metrics.write(self.storage.data_dir)
     
     async def run_once(self):
         """运行一次爬取和发布"""
         logger.info("开始执行单次爬取和发布任务")
         
         try:
-            # 执行爬取和发布
-            await self.crawl_and_publish()
-            logger.info("爬取和发布任务完成")
-            
-            # 清理旧数据（根据配置文件）
-            data_config = self.config.get('data_management', {})
-            if data_config.get('cleanup_enabled', True):
-                keep_count = data_config.get('keep_count', 200)
-                keep_days = data_config.get('keep_days', 7)
-                
-                logger.info(f"开始清理旧数据（保留{keep_count}篇文章或{keep_days}天内数据）...")
-                deleted_count = await self.storage.cleanup_old_articles(keep_count=keep_count, keep_days=keep_days)
-                if deleted_count > 0:
-                    logger.info(f"数据清理完成，删除了 {deleted_count} 个旧文件")
-                else:
-                    logger.info("无需清理数据")
-            else:
-                logger.info("数据清理已禁用")
-                
+            await self.run_cycle()
         except Exception as e:
             logger.error(f"执行爬取和发布任务时出错: {e}")
             raise
+        finally:
+            await self.shutdown()
+    
+    def request_reload(self):
+        """收到 SIGHUP：在下一轮开始前重新加载配置，不打断正在进行的任务"""
+        self._reload_requested = True
+        logger.info("收到重新加载请求，将在下一轮任务开始前生效")
     
-    # async def run_scheduled(self):
-    #     """运行定时任务（已弃用，改用crontab方式）"""
-    #     # 先运行一次
-    #     await self.run_once()
-    #     
-    #     # 启动定时任务
-    #     await self.scheduler.start_hourly_schedule()
+    def request_stop(self):
+        """收到 SIGTERM/SIGINT：等待当前任务完成后退出"""
+        logger.info("收到停止信号，当前任务完成后退出")
+        if self.scheduler:
+            self.scheduler.stop()
+    
+    async def run_daemon(self):
+        """常驻运行：每整点执行一次，两次运行之间保留连接池、浏览器和各服务的缓存"""
+        daemon_config = self.config.get('daemon', {})
+        enable_shared_session(daemon_config.get('shared_session', True))
+        enable_browser_pool(daemon_config.get('browser_pool', True))
+        
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGTERM, self.request_stop)
+        loop.add_signal_handler(signal.SIGINT, self.request_stop)
+        loop.add_signal_handler(signal.SIGHUP, self.request_reload)
+        
+        self.scheduler = SchedulerService(
+            self.run_cycle,
+            crawl_func=self.run_crawl_only,
+            next_due_func=lambda: self.article_service.next_due(self.config.get('crawlers', {}))
+        )
+        try:
+            await self.scheduler.start_hourly_schedule(run_immediately=daemon_config.get('run_on_start', True))
+        finally:
+            await self.shutdown()
+    
+    async def shutdown(self):
+        """释放工作池、共享会话和浏览器"""
+        shutdown_cpu_pool()
+        await close_shared_session()
+        await close_browser_pool()
     
     def setup_directories(self):
         """创建必要的目录"""
@@ -107,13 +257,32 @@ class NewsApp:
         os.makedirs("resources", exist_ok=True)
         os.makedirs("services", exist_ok=True)
 
-async def main_async():
+async def main_async(daemon: bool = False, worker: bool = False, enqueue: bool = False,
+                     worker_id: str = None, exit_when_idle: bool = False):
     """异步主函数"""
     logger.info("启动爬虫程序")
     
     app = NewsApp()
     app.setup_directories()
     
+    if enqueue:
+        # 只把到期的来源加入任务队列
+        app.enqueue_due_sources()
+        await app.shutdown()
+        return
+    
+    if worker:
+        # 任务队列工作进程（可在多个进程或共享数据卷的多台机器上同时运行）
+        await app.run_worker(worker_id=worker_id, exit_when_idle=exit_when_idle)
+        return
+    
+    if daemon:
+        # 常驻模式（SIGHUP 重新加载配置，SIGTERM 在当前任务完成后退出）
+        logger.info("以常驻模式运行")
+        await app.run_daemon()
+        logger.info("常驻进程已退出")
+        return
+    
     # 只运行一次任务（适用于crontab调度）
     await app.run_once()
     
@@ -121,8 +290,19 @@ async def main_async():
 
 def main():
     """主函数"""
+    # 只在作为程序运行时配置日志，导入 main（如基准测试）不写 crawler.log
+    setup_logger()
+    parser = argparse.ArgumentParser(description="新闻爬取与发布")
+    parser.add_argument('--daemon', action='store_true', help="常驻运行，每整点执行一次（替代crontab）")
+    parser.add_argument('--worker', action='store_true', help="作为爬取任务队列的工作进程运行")
+    parser.add_argument('--worker-id', help="工作进程标识，默认为 主机名:进程号")
+    parser.add_argument('--exit-when-idle', action='store_true', help="工作进程在队列为空时退出")
+    parser.add_argument('--enqueue', action='store_true', help="把到期的来源加入爬取任务队列后退出")
+    args = parser.parse_args()
+    
     try:
-        asyncio.run(main_async())
+        asyncio.run(main_async(daemon=args.daemon, worker=args.worker, enqueue=args.enqueue,
+                               worker_id=args.worker_id, exit_when_idle=args.exit_when_idle))
     except KeyboardInterrupt:
         logger.info("程序被用户中断")
     except Exception as e:
@@ -25,6 +25,22 @@ class Article:
         data['tags'] = ','.join(self.tags) if self.tags else ''
         return data
     
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Article':
+        """从 to_dict() 的结果还原文章"""
+        return cls(
+            title=data['title'],
+            content=data['content'],
+            source=data['source'],
+            url=data['url'],
+            publish_time=datetime.datetime.fromisoformat(data['publish_time']),
+            author=data.get('author'),
+            tags=data.get('tags', '').split(',') if data.get('tags') else [],
+            summary=data.get('summary'),
+            published=data.get('published', False),
+            rank=data.get('rank')
+        )
+
     @property
     def hash(self) -> str:
         """生成文章哈希值，用于去重"""
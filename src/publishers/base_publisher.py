@@ -5,9 +5,24 @@ from models.article import Article
 class BasePublisher(ABC):
     """发布器基类"""
     
+    # 模板注册表，由 PublisherManager 注入各发布器共用的实例
+    _templates = None
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
     
+    @property
+    def templates(self):
+        """模板注册表，未注入时按发布器自身的 template_config 编译"""
+        if self._templates is None:
+            from utils.template_registry import TemplateRegistry
+            self._templates = TemplateRegistry(getattr(self, 'template_config', None) or {})
+        return self._templates
+    
+    @templates.setter
+    def templates(self, registry):
+        self._templates = registry
+    
     @abstractmethod
     async def publish(self, article: Article) -> bool:
         """发布文章"""
@@ -22,6 +22,8 @@ class EmailSender(BasePublisher):
         self.recipients = config.get('recipients', [])
         self.use_ssl = config.get('use_ssl', False)
         self.use_tls = config.get('use_tls', True)
+        # SMTP连接和读写超时（秒），发送在线程中执行无法取消，必须设置超时
+        self.timeout = config.get('timeout', 30)
         self.template_config = template_config
         self.template = template_config.get(config.get('template', 'email'), '')
         self.logger = logging.getLogger("publisher.email")
@@ -382,9 +384,9 @@ class EmailSender(BasePublisher):
         try:
             # 连接SMTP服务器
             if self.use_ssl:
-                server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port)
+                server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=self.timeout)
             else:
-                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+                server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
                 if self.use_tls:
                     server.starttls()
 
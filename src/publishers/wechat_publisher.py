@@ -2,9 +2,9 @@ import logging
 import aiohttp
 import json
 from typing import Dict, Any, List
-from jinja2 import Template
 from models.article import Article, WechatArticle
 from publishers.base_publisher import BasePublisher
+from utils.token_cache import TokenCache
 from datetime import datetime
 
 class WechatPublisher(BasePublisher):
@@ -16,17 +16,20 @@ class WechatPublisher(BasePublisher):
         self.app_secret = config.get('app_secret')
         self.template_config = template_config
         self.access_token = None
+        # 令牌缓存，PublisherManager 会替换为按 data_dir 和 token_cache 配置创建的实例
+        self.token_cache = TokenCache()
         self.logger = logging.getLogger("publisher.wechat")
+        # 所有请求的超时（秒），避免接口无响应时拖住整轮任务
+        self.timeout = aiohttp.ClientTimeout(total=config.get('timeout', 30))
 
     async def publish(self, article: Article) -> bool:
         """发布文章到微信公众号（使用草稿箱方式）"""
         try:
             # 确保有访问令牌
+            await self._get_access_token()
             if not self.access_token:
-                await self._get_access_token()
-                if not self.access_token:
-                    self.logger.error("无法获取访问令牌")
-                    return False
+                self.logger.error("无法获取访问令牌")
+                return False
 
             # 准备文章内容
             wechat_article = await self._prepare_article(article)
@@ -78,7 +81,7 @@ class WechatPublisher(BasePublisher):
         self.logger.info(f"添加草稿数据: {json.dumps(data, ensure_ascii=False, indent=2)}")
         json_data = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
         try:
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=self.timeout) as session:
                 headers = {
                     'Content-Type': 'application/json; charset=utf-8',
                     'Accept': 'application/json',
@@ -103,8 +106,9 @@ class WechatPublisher(BasePublisher):
                 # 如果是access_token相关错误，尝试重新获取
                 if result['errcode'] in [40001, 40014, 42001]:
                     self.logger.info("访问令牌可能过期，尝试重新获取")
-                    await self._get_access_token()
-                    if self.access_token:
+                    stale_token = self.access_token
+                    await self._get_access_token(force=True)
+                    if self.access_token and self.access_token != stale_token:
                         # 重试一次
                         return await self._add_draft(wechat_article, article)
 
@@ -130,7 +134,7 @@ class WechatPublisher(BasePublisher):
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=self.timeout) as session:
                 headers = {
                     'Content-Type': 'application/json; charset=utf-8'
                 }
@@ -171,7 +175,7 @@ class WechatPublisher(BasePublisher):
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=self.timeout) as session:
                 headers = {
                     'Content-Type': 'application/json; charset=utf-8'
                 }
@@ -201,7 +205,7 @@ class WechatPublisher(BasePublisher):
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=self.timeout) as session:
                 headers = {
                     'Content-Type': 'application/json; charset=utf-8'
                 }
@@ -229,7 +233,7 @@ class WechatPublisher(BasePublisher):
         }
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=self.timeout) as session:
                 headers = {
                     'Content-Type': 'application/json; charset=utf-8'
                 }
@@ -255,25 +259,35 @@ class WechatPublisher(BasePublisher):
             self.logger.error(f"删除草稿异常: {e}")
             return False
 
-    async def _get_access_token(self):
-        """获取微信访问令牌"""
+    async def _get_access_token(self, force: bool = False):
+        """获取微信访问令牌，优先使用缓存，即将过期时提前刷新
+
+        Args:
+            force: 当前令牌已被接口判定失效，需要刷新
+        """
+        self.access_token = await self.token_cache.get(
+            f"wechat:{self.app_id}", self._fetch_access_token, stale=self.access_token if force else None
+        )
+
+    async def _fetch_access_token(self):
+        """向微信请求新的访问令牌，返回 (access_token, expires_in)"""
         url = f"https://api.weixin.qq.com/cgi-bin/token?grant_type=client_credential&appid={self.app_id}&secret={self.app_secret}"
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=self.timeout) as session:
                 async with session.get(url) as response:
                     response_text = await response.text()
-                    self.logger.info(f"获取token响应: {response_text}")
+                    self.logger.debug(f"获取token响应状态: {response.status}")
 
                     try:
                         result = json.loads(response_text)
                     except json.JSONDecodeError:
                         self.logger.error(f"无法解析token响应: {response_text}")
-                        return
+                        return None
 
             if 'access_token' in result:
-                self.access_token = result['access_token']
                 self.logger.info("获取访问令牌成功")
+                return result['access_token'], result.get('expires_in')
             elif 'errcode' in result:
                 error_msg = self._get_error_message(result['errcode'])
                 self.logger.error(f"获取访问令牌失败: {result['errcode']} - {error_msg}")
@@ -282,16 +296,15 @@ class WechatPublisher(BasePublisher):
 
         except Exception as e:
             self.logger.error(f"获取访问令牌异常: {e}")
+        return None
 
     async def _prepare_article(self, article: Article) -> WechatArticle:
         """准备微信公众号文章"""
         # 选择模板
         template_name = self.config.get('template', 'news')
-        template_html = self.template_config.get(template_name, '')
 
         # 渲染模板
-        template = Template(template_html)
-        content = template.render(**article.to_dict())
+        content = self.templates.render(template_name, **article.to_dict())
 
         # 获取封面图片media_id（如果配置了默认封面）
         thumb_media_id = self.config.get('thumb_media_id', '')
@@ -421,10 +434,9 @@ class WechatPublisher(BasePublisher):
 
     async def upload_thumb_image(self, image_path: str) -> str:
         """上传封面图片并返回media_id（临时素材）"""
+        await self._get_access_token()
         if not self.access_token:
-            await self._get_access_token()
-            if not self.access_token:
-                return ""
+            return ""
 
         url = f"https://api.weixin.qq.com/cgi-bin/media/upload?access_token={self.access_token}&type=thumb"
 
@@ -433,7 +445,7 @@ class WechatPublisher(BasePublisher):
                 data = aiohttp.FormData()
                 data.add_field('media', f, filename='thumb.jpg', content_type='image/jpeg')
 
-                async with aiohttp.ClientSession() as session:
+                async with aiohttp.ClientSession(timeout=self.timeout) as session:
                     async with session.post(url, data=data) as response:
                         response_text = await response.text()
 
@@ -456,10 +468,9 @@ class WechatPublisher(BasePublisher):
 
     async def upload_permanent_thumb_image(self, image_path: str) -> str:
         """上传永久封面图片并返回media_id"""
+        await self._get_access_token()
         if not self.access_token:
-            await self._get_access_token()
-            if not self.access_token:
-                return ""
+            return ""
 
         url = f"https://api.weixin.qq.com/cgi-bin/material/add_material?access_token={self.access_token}&type=thumb"
 
@@ -468,7 +479,7 @@ class WechatPublisher(BasePublisher):
                 data = aiohttp.FormData()
                 data.add_field('media', f, filename='thumb.jpg', content_type='image/jpeg')
 
-                async with aiohttp.ClientSession() as session:
+                async with aiohttp.ClientSession(timeout=self.timeout) as session:
                     async with session.post(url, data=data) as response:
                         response_text = await response.text()
 
@@ -558,8 +569,9 @@ class WechatPublisher(BasePublisher):
         title_template = self.config.get('digest_title_template', '🔥 {{ date }} 热门资讯 ({{ count }}篇)')
         title = title_template.replace('{{ date }}', datetime.now().strftime('%m月%d日')).replace('{{ count }}', str(article_count))
         
-        # 生成各平台内容区块
+        # 生成各平台内容区块，每篇文章使用digest模板
         platform_sections = ""
+        article_template = self.templates.get('digest')
         platform_icons = {
             'NowHots': '🔥',
             '知乎': '🤔', 
@@ -597,18 +609,13 @@ class WechatPublisher(BasePublisher):
             # 为每个平台的文章生成内容
             for i, article in enumerate(platform_articles_list, 1):
                 # 使用digest模板渲染每篇文章
-                template_name = 'digest'
-                template_html = self.template_config.get(template_name, '')
-                
                 # 单个来源内用分割线分割（除了第一篇）
                 separator = "<hr style='border: none; border-top: 1px solid #eee; margin: 16px 0;'>" if i > 1 else ""
                 
-                if template_html:
-                    from jinja2 import Template
-                    template = Template(template_html)
+                if article_template:
                     article_data = article.to_dict()
                     article_data['index'] = i
-                    article_html = template.render(**article_data)
+                    article_html = article_template.render(**article_data)
                     platform_sections += separator + article_html
                 else:
                     # 极简的备用格式，只显示标题
@@ -619,12 +626,9 @@ class WechatPublisher(BasePublisher):
             platform_sections += "</div></div>\n"
         
         # 使用汇总模板
-        template_name = self.config.get('template', 'digest_summary')
-        template_html = self.template_config.get(template_name, '')
+        template = self.templates.get(self.config.get('template', 'digest_summary'))
         
-        if template_html:
-            from jinja2 import Template
-            template = Template(template_html)
+        if template:
             content = template.render(
                 current_time=current_time,
                 article_count=article_count,
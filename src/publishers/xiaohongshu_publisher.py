@@ -3,11 +3,10 @@ import aiohttp
 import json
 import os
 import base64
-from datetime import datetime
 from typing import Dict, Any, List
-from jinja2 import Template
 from models.article import Article
 from publishers.base_publisher import BasePublisher
+from utils.token_cache import TokenCache
 
 class XiaohongshuPublisher(BasePublisher):
     """小红书发布器"""
@@ -19,18 +18,20 @@ class XiaohongshuPublisher(BasePublisher):
         self.api_url = config.get('api_url', 'https://api.xiaohongshu.com/open/v1/notes/publish')
         self.template_config = template_config
         self.logger = logging.getLogger("publisher.xiaohongshu")
+        # 所有请求的超时（秒），避免接口无响应时拖住整轮任务
+        self.timeout = aiohttp.ClientTimeout(total=config.get('timeout', 30))
         self.access_token = None
-        self.token_expires = 0
+        # 令牌缓存，PublisherManager 会替换为按 data_dir 和 token_cache 配置创建的实例
+        self.token_cache = TokenCache()
 
     async def publish(self, article: Article) -> bool:
         """发布文章到小红书"""
         try:
-            # 确保有访问令牌
-            if not self.access_token or datetime.now().timestamp() > self.token_expires:
-                await self._get_access_token()
-                if not self.access_token:
-                    self.logger.error("无法获取小红书访问令牌")
-                    return False
+            # 确保有访问令牌（缓存的令牌即将过期时提前刷新）
+            await self._get_access_token()
+            if not self.access_token:
+                self.logger.error("无法获取小红书访问令牌")
+                return False
 
             # 准备文章内容
             xhs_content = await self._prepare_content(article)
@@ -45,8 +46,18 @@ class XiaohongshuPublisher(BasePublisher):
             self.logger.error(f"发布小红书文章异常: {e}")
             return False
 
-    async def _get_access_token(self):
-        """获取小红书访问令牌"""
+    async def _get_access_token(self, force: bool = False):
+        """获取小红书访问令牌，优先使用缓存
+
+        Args:
+            force: 当前令牌已被接口判定失效，需要刷新
+        """
+        self.access_token = await self.token_cache.get(
+            f"xiaohongshu:{self.api_key}", self._fetch_access_token, stale=self.access_token if force else None
+        )
+
+    async def _fetch_access_token(self):
+        """向小红书请求新的访问令牌，返回 (access_token, expires_in)"""
         try:
             token_url = self.config.get('token_url', 'https://api.xiaohongshu.com/open/v1/token')
             data = {
@@ -55,29 +66,29 @@ class XiaohongshuPublisher(BasePublisher):
                 'grant_type': 'client_credentials'
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=self.timeout) as session:
                 async with session.post(token_url, json=data) as response:
                     result = await response.json()
                     
                     if 'access_token' in result:
-                        self.access_token = result['access_token']
-                        # 设置过期时间（通常是7200秒）
-                        self.token_expires = datetime.now().timestamp() + result.get('expires_in', 7200) - 300  # 提前5分钟刷新
                         self.logger.info("成功获取小红书访问令牌")
+                        # 有效期通常是7200秒，缓存会在过期前提前刷新
+                        return result['access_token'], result.get('expires_in', 7200)
                     else:
                         self.logger.error(f"获取小红书访问令牌失败: {result}")
         except Exception as e:
             self.logger.error(f"获取小红书访问令牌异常: {e}")
+        return None
 
     async def _prepare_content(self, article: Article) -> Dict[str, Any]:
         """准备小红书发布内容"""
         # 使用模板美化内容
         template_name = self.config.get('template', 'default')
-        template_str = self.template_config.get(template_name, '{{ title }}\n\n{{ content }}')
-        template = Template(template_str)
         
         # 渲染内容
-        content = template.render(
+        content = self.templates.render(
+            template_name,
+            '{{ title }}\n\n{{ content }}',
             title=article.title,
             content=article.content,
             summary=article.summary or '',
@@ -130,7 +141,8 @@ class XiaohongshuPublisher(BasePublisher):
         
         return images
 
-    async def _publish_note(self, content: Dict[str, Any], images: List[str], article: Article) -> bool:
+    async def _publish_note(self, content: Dict[str, Any], images: List[str], article: Article,
+                            retried: bool = False) -> bool:
         """发布小红书笔记"""
         try:
             headers = {
@@ -147,13 +159,20 @@ class XiaohongshuPublisher(BasePublisher):
                 'type': 'normal'  # 普通笔记类型
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(timeout=self.timeout) as session:
                 async with session.post(self.api_url, headers=headers, json=data) as response:
                     result = await response.json()
                     
                     if response.status == 200 and result.get('success'):
                         self.logger.info(f"成功发布小红书笔记: {content['title']}")
                         return True
+                    elif response.status == 401 and not retried:
+                        # 令牌在过期前被作废，刷新后重试一次
+                        self.logger.info("小红书访问令牌已失效，尝试重新获取")
+                        await self._get_access_token(force=True)
+                        if self.access_token:
+                            return await self._publish_note(content, images, article, retried=True)
+                        return False
                     else:
                         self.logger.error(f"发布小红书笔记失败: {result}")
                         return False
@@ -1,54 +1,171 @@
+import asyncio
 import logging
-from typing import List
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from datetime import datetime
 
+from crawlers.base_crawler import BaseCrawler
 from models.article import Article
 from storage.file_storage import FileStorage
+from storage.watermark_store import WatermarkStore
 from services.crawler_factory import CrawlerFactory
+from utils.adaptive_schedule import AdaptiveSchedule
 from utils.article_aggregator import ArticleAggregator
+from utils.circuit_breaker import CircuitBreaker
+from utils.crawl_metrics import CrawlMetrics
+from utils.source_priority import SourcePriority
 
 logger = logging.getLogger(__name__)
 
 class ArticleService:
     """文章服务类"""
     
-    def __init__(self, storage: FileStorage):
+    def __init__(self, storage: FileStorage, config: Dict[str, Any] = None):
         self.storage = storage
+        self.config = config or {}
         self.aggregator = ArticleAggregator()
+        self.watermarks = WatermarkStore(storage.data_dir)
+        self.circuit_breaker = CircuitBreaker(storage.data_dir, self.config.get('circuit_breaker'))
+        self.schedule = AdaptiveSchedule(storage.data_dir, self.config.get('adaptive_schedule'))
+        self.priority = SourcePriority(storage.data_dir, self.config.get('source_priority'))
+        # 各来源上次运行之后的新增条目数
+        self.new_counts = {}
+        # 本次运行失败的来源及错误
+        self.failures = {}
+        # 爬取已结束、等待文章保存完成后再提交的水位线
+        self.pending_watermarks = {}
+        # 本次运行的爬虫指标
+        self.metrics = CrawlMetrics()
     
-    async def crawl_articles(self, crawlers_config: dict) -> List[Article]:
-        """爬取文章"""
-        all_articles = []
+    def reset_metrics(self):
+        """开始新一轮运行时重置指标"""
+        self.metrics = CrawlMetrics()
+        self.failures = {}
+        self.pending_watermarks = {}
+    
+    def due_sources(self, crawlers_config: dict) -> Dict[str, dict]:
+        """已启用且按自适应间隔到期的来源，按优先级从高到低排列"""
+        due = [
+            (name, crawler_config) for name, crawler_config in crawlers_config.items()
+            if crawler_config.get('enabled', True) and self.schedule.is_due(name, crawler_config)
+        ]
+        configs = dict(due)
+        return {name: configs[name] for name in self.priority.plan(due)}
+    
+    def order_crawlers(self, crawlers: List[BaseCrawler], budget: Optional[float] = None,
+                       concurrency: int = 0) -> List[BaseCrawler]:
+        """按优先级排列爬虫，爬取预算不足时去掉排不下的低价值来源"""
+        by_name = {crawler.name: crawler for crawler in crawlers}
+        names = self.priority.plan([(crawler.name, crawler.config) for crawler in crawlers], budget, concurrency)
+        return [by_name[name] for name in names]
+    
+    def create_crawlers(self, crawlers_config: dict, check_schedule: bool = True) -> List[BaseCrawler]:
+        """创建本次需要运行的爬虫（跳过未启用、未到期和熔断中的来源）
         
+        Args:
+            crawlers_config: 爬虫配置
+            check_schedule: 是否检查自适应间隔，任务队列的工作进程在入队时已检查过
+        """
+        crawlers = []
         for name, crawler_config in crawlers_config.items():
             if not crawler_config.get('enabled', True):
                 continue
 
+            # 按自适应间隔判断本次是否需要爬取
+            if check_schedule and not self.schedule.is_due(name, crawler_config):
+                continue
+
             crawler_type = crawler_config.get('type')
             crawler = CrawlerFactory.create_crawler(crawler_type, name, crawler_config)
 
             if not crawler:
                 continue
 
-            try:
-                async with crawler:
-                    articles = await crawler.crawl()
-                    logger.info(f"爬虫 {name} 获取到 {len(articles)} 篇文章")
-                    all_articles.extend(articles)
-            except Exception as e:
-                logger.error(f"爬虫 {name} 运行异常: {e}")
-        
-        return all_articles
-    
-    async def save_articles(self, articles: List[Article]) -> int:
-        """保存文章"""
-        saved_count = 0
-        for article in articles:
-            if await self.storage.save_article(article):
-                saved_count += 1
+            # 熔断中的来源直接跳过，不占用本次运行时间
+            if not self.circuit_breaker.allow(name):
+                continue
+
+            crawler.watermark = self.watermarks.get(name)
+            crawler.probe = self.circuit_breaker.is_probe(name)
+            crawler.metrics = self.metrics.source(name)
+            crawlers.append(crawler)
+        return crawlers
+    
+    async def run_crawler(self, crawler: BaseCrawler, sink: Callable[[str, List[Article]], Awaitable[None]],
+                          commit_watermark: bool = True) -> int:
+        """运行单个爬虫，逐批交给 sink(来源名, 批次) 处理，返回产出的文章数
         
-        logger.info(f"共保存 {saved_count} 篇新文章")
-        return saved_count
+        Args:
+            crawler: 爬虫
+            sink: 批次处理函数
+            commit_watermark: 爬取结束后立即提交水位线，只有 sink 返回时批次已保存才能使用；
+                              为False时水位线暂存，由调用方在该来源的文章全部保存后调用 commit_watermark()
+        """
+        name = crawler.name
+        metrics = crawler.metrics
+        count = 0
+        start = time.monotonic()
+        started_at = datetime.now().timestamp()
+        try:
+            async with crawler:
+                if crawler.probe:
+                    # 半开探测只发一次请求，不产出文章，也不记录调度和优先级统计
+                    await crawler.check()
+                else:
+                    async for batch in crawler.stream():
+                        count += len(batch)
+                        metrics.articles_yielded += len(batch)
+                        await sink(name, batch)
+        except asyncio.CancelledError as e:
+            # 超出时间预算被取消：已产出的批次保留，水位线不提交，下次重新爬取未完成的部分
+            logger.warning(f"爬虫 {name} 被取消，已产出 {count} 篇文章")
+            metrics.observe_error(e)
+            self.priority.record(name, crawler.new_count, time.monotonic() - start)
+            raise
+        except Exception as e:
+            logger.error(f"爬虫 {name} 运行异常: {e}")
+            metrics.observe_error(e)
+            self.failures[name] = repr(e)
+            self.circuit_breaker.record_failure(name, repr(e))
+            self.schedule.record_failure(name, crawler.config, started_at)
+            self.priority.record(name, 0, time.monotonic() - start)
+            return count
+        finally:
+            metrics.duration = time.monotonic() - start
+
+        if crawler.failed:
+            logger.error(f"爬虫 {name} 所有请求均失败: {crawler.last_error!r}")
+            self.failures[name] = repr(crawler.last_error)
+            self.circuit_breaker.record_failure(name, repr(crawler.last_error))
+            self.schedule.record_failure(name, crawler.config, started_at)
+            self.priority.record(name, 0, metrics.duration)
+            return count
+
+        self.circuit_breaker.record_success(name)
+        if crawler.probe:
+            logger.info(f"爬虫 {name} 探测成功，下次运行恢复正常爬取")
+            return 0
+        self.new_counts[name] = crawler.new_count
+        metrics.new_entries = crawler.new_count
+        logger.info(f"爬虫 {name} 获取到 {count} 篇文章，较上次运行新增 {crawler.new_count} 篇，耗时 {metrics.duration:.1f} 秒")
+        if commit_watermark:
+            self.watermarks.commit(name, crawler.watermark)
+        else:
+            self.pending_watermarks[name] = crawler.watermark
+        self.schedule.record(name, crawler.new_count, count, crawler.config, started_at)
+        self.priority.record(name, crawler.new_count, metrics.duration)
+        return count
+    
+    def commit_watermark(self, name: str):
+        """该来源的文章已全部保存，提交暂存的水位线"""
+        watermark = self.pending_watermarks.pop(name, None)
+        if watermark is not None:
+            self.watermarks.commit(name, watermark)
+    
+    def next_due(self, crawlers_config: dict) -> Optional[float]:
+        """已启用来源中最早的下次爬取时间戳，未启用自适应调度时返回None"""
+        names = [name for name, crawler_config in crawlers_config.items() if crawler_config.get('enabled', True)]
+        return self.schedule.next_due(names)
     
     async def get_unpublished_articles(self, limit: int = 10, current_hour_only: bool = False) -> List[Article]:
         """获取未发布文章"""
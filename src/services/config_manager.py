@@ -51,6 +51,11 @@ class ConfigManager:
                 self._config = {}
         return self._config
     
+    def reload(self) -> Dict[str, Any]:
+        """重新读取配置文件"""
+        self._config = None
+        return self.load_config()
+    
     def get(self, key: str, default=None):
         """获取配置项"""
         config = self.load_config()
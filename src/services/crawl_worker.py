@@ -0,0 +1,125 @@
+"""
+爬取工作进程 - 从任务队列领取来源任务，爬取结果经存储层保存
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from typing import Any, Dict, List
+
+from models.article import Article
+from storage.file_storage import FileStorage
+from services.article_service import ArticleService
+from services.job_queue import Job, JobQueue
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    """主机名加进程号，区分同一共享卷上的不同机器和进程"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class CrawlWorker:
+    """任务队列的工作进程
+
+    每个任务使用新的 ArticleService，重新读取其他进程写入的水位线、熔断和调度状态；
+    运行期间按租约时长的三分之一定期续约。
+    """
+
+    def __init__(self, storage: FileStorage, config: Dict[str, Any], queue: JobQueue, worker_id: str = None):
+        self.storage = storage
+        self.config = config
+        self.queue = queue
+        self.worker_id = worker_id or default_worker_id()
+        self._stop_event = asyncio.Event()
+
+    def stop(self):
+        """当前任务完成后退出"""
+        self._stop_event.set()
+
+    async def run(self, exit_when_idle: bool = False) -> int:
+        """循环领取并执行任务，返回执行的任务数
+
+        Args:
+            exit_when_idle: 队列为空时退出，否则轮询等待新任务直到 stop()
+        """
+        poll_interval = float(self.queue.config['poll_interval'])
+        processed = 0
+        logger.info(f"工作进程 {self.worker_id} 已启动")
+        while not self._stop_event.is_set():
+            job = await asyncio.to_thread(self.queue.lease, self.worker_id)
+            if job is None:
+                if exit_when_idle:
+                    break
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.process(job)
+            processed += 1
+        logger.info(f"工作进程 {self.worker_id} 已退出，共执行 {processed} 个任务")
+        return processed
+
+    async def _keep_lease(self, job: Job):
+        """定期续约，租约被其他工作进程接手时停止续约"""
+        interval = max(1.0, self.queue.visibility_timeout / 3)
+        while True:
+            await asyncio.sleep(interval)
+            if not await asyncio.to_thread(self.queue.extend, job):
+                logger.warning(f"任务 #{job.id}（{job.source}）租约已失效，结果可能与其他工作进程重复")
+                return
+
+    async def process(self, job: Job):
+        """执行单个任务"""
+        logger.info(f"开始任务 #{job.id}: {job.source}（第 {job.attempts} 次）")
+        article_service = ArticleService(self.storage, self.config)
+        saved_count = 0
+        unsaved_count = 0
+
+        async def save(name: str, batch: List[Article]):
+            nonlocal saved_count, unsaved_count
+            for article in batch:
+                if await self.storage.article_exists(article):
+                    article_service.metrics.source(name).duplicates_skipped += 1
+                    continue
+                if await self.storage.save_article(article):
+                    saved_count += 1
+                elif not await self.storage.article_exists(article):
+                    unsaved_count += 1
+
+        keeper = asyncio.create_task(self._keep_lease(job))
+        try:
+            # 入队时已按自适应间隔筛选，重试时不再检查
+            crawlers = article_service.create_crawlers({job.source: job.payload}, check_schedule=False)
+            count = 0
+            for crawler in crawlers:
+                count += await article_service.run_crawler(crawler, save, commit_watermark=False)
+        except Exception as e:
+            logger.error(f"任务 #{job.id}（{job.source}）异常: {e}")
+            await asyncio.to_thread(self.queue.fail, job, repr(e))
+            return
+        finally:
+            keeper.cancel()
+            await asyncio.gather(keeper, return_exceptions=True)
+
+        if job.source in article_service.failures:
+            await asyncio.to_thread(self.queue.fail, job, article_service.failures[job.source])
+            return
+        if unsaved_count:
+            # 有文章保存失败时不提交水位线，重试时重新爬取这些文章
+            await asyncio.to_thread(self.queue.fail, job, f"{unsaved_count} 篇文章保存失败")
+            return
+        article_service.commit_watermark(job.source)
+
+        result = {
+            'worker': self.worker_id,
+            'skipped': not crawlers,
+            'articles': count,
+            'saved': saved_count,
+            'new_entries': article_service.new_counts.get(job.source, 0)
+        }
+        await asyncio.to_thread(self.queue.complete, job, result)
+        logger.info(f"任务 #{job.id}（{job.source}）完成: 获取 {count} 篇，保存 {saved_count} 篇")
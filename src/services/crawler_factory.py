@@ -1,33 +1,55 @@
 import logging
-from typing import Dict, Type, Optional
+from typing import Dict, Type, Optional, Union
 
 from crawlers.base_crawler import BaseCrawler
-from crawlers.rss_crawler import RSSCrawler
-from crawlers.zhihu_crawler import ZhihuColumnCrawler
-from crawlers.nowhots_crawler import NowHotsCrawler
+from crawlers.isolated_crawler import IsolatedCrawler
+from utils.import_timer import import_object
 
 logger = logging.getLogger(__name__)
 
 class CrawlerFactory:
     """爬虫工厂类"""
     
-    _crawler_map: Dict[str, Type[BaseCrawler]] = {
-        "RSSCrawler": RSSCrawler,
-        "ZhihuCrawler": ZhihuColumnCrawler,
-        "NowHotsCrawler": NowHotsCrawler,
+    # 值为点分路径时在首次创建该类型爬虫时才导入，未启用的爬虫不加载其依赖（playwright、feedparser等）
+    _crawler_map: Dict[str, Union[str, Type[BaseCrawler]]] = {
+        "RSSCrawler": "crawlers.rss_crawler.RSSCrawler",
+        "ZhihuCrawler": "crawlers.zhihu_crawler.ZhihuColumnCrawler",
+        "NowHotsCrawler": "crawlers.nowhots_crawler.NowHotsCrawler",
+        "JsonApiCrawler": "crawlers.json_api_crawler.JsonApiCrawler",
+        "StreamingFeedCrawler": "crawlers.stream_feed_crawler.StreamingFeedCrawler",
     }
+
+    @classmethod
+    def get_crawler_class(cls, crawler_type: str) -> Optional[Type[BaseCrawler]]:
+        """获取爬虫类，按需导入"""
+        crawler_class = cls._crawler_map.get(crawler_type)
+        if isinstance(crawler_class, str):
+            try:
+                crawler_class = import_object(crawler_class)
+            except ImportError as e:
+                logger.error(f"加载爬虫类型 {crawler_type} 失败: {e}")
+                return None
+            cls._crawler_map[crawler_type] = crawler_class
+        return crawler_class
     
     @classmethod
     def create_crawler(cls, crawler_type: str, name: str, config: dict) -> Optional[BaseCrawler]:
         """创建爬虫实例"""
-        crawler_class = cls._crawler_map.get(crawler_type)
-        if not crawler_class:
+        if crawler_type not in cls._crawler_map:
             logger.error(f"未知的爬虫类型: {crawler_type}")
             return None
+
+        # 隔离运行的爬虫在子进程中导入和创建，主进程不加载其依赖
+        if config.get('isolate', False):
+            return IsolatedCrawler(name, config)
+
+        crawler_class = cls.get_crawler_class(crawler_type)
+        if not crawler_class:
+            return None
         
         return crawler_class(name, config)
     
     @classmethod
-    def register_crawler(cls, crawler_type: str, crawler_class: Type[BaseCrawler]):
-        """注册新的爬虫类型"""
+    def register_crawler(cls, crawler_type: str, crawler_class: Union[str, Type[BaseCrawler]]):
+        """注册新的爬虫类型（类或点分路径）"""
         cls._crawler_map[crawler_type] = crawler_class
\ No newline at end of file
@@ -0,0 +1,225 @@
+"""
+爬取任务队列 - 基于SQLite的持久化队列，多个工作进程（同机或共享卷上的多台机器）领取来源任务
+
+任务领取后进入租约期，租约内未完成（工作进程崩溃或失联）时重新变为可领取；
+失败的任务按指数退避重试，超过最大次数后标记为失败。
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+
+# 默认队列配置，可在 config.ini 的 job_queue 中覆盖
+DEFAULT_JOB_QUEUE = {
+    'enabled': False,
+    'path': 'data/state/jobs.db',   # 数据库文件，多台机器时放在共享卷上
+    'visibility_timeout': 900,      # 租约时长（秒），工作进程运行期间定期续约
+    'max_attempts': 3,              # 最多尝试次数
+    'retry_delay': 60,              # 首次重试等待（秒），之后每次翻倍
+    'poll_interval': 5,             # 队列为空时工作进程的轮询间隔（秒）
+    'wait_timeout': 1800,           # 定时任务等待本轮任务完成的最长时间（秒）
+    'keep_days': 7,                 # 已结束任务的保留天数
+    'busy_timeout': 30              # 数据库被其他进程锁定时的等待时间（秒）
+}
+
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    run_id TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    result TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_run ON jobs (run_id);
+"""
+
+
+@dataclass
+class Job:
+    """已领取的任务"""
+    id: int
+    source: str
+    run_id: Optional[str]
+    payload: Dict[str, Any]
+    attempts: int
+    lease_owner: str
+
+
+class JobQueue:
+    """SQLite任务队列
+
+    所有写操作在 BEGIN IMMEDIATE 事务中执行，同一时间只有一个进程能领取任务；
+    每次操作使用独立连接，可在线程中调用（asyncio.to_thread）。
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = {**DEFAULT_JOB_QUEUE, **(config or {})}
+        self.path = self.config['path']
+        self.visibility_timeout = float(self.config['visibility_timeout'])
+        self.max_attempts = max(1, int(self.config['max_attempts']))
+        self.retry_delay = float(self.config['retry_delay'])
+        self.logger = logging.getLogger("job_queue")
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # 共享卷（NFS等）上不能使用WAL，保持默认的回滚日志模式
+        conn = sqlite3.connect(self.path, timeout=float(self.config['busy_timeout']), isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """写事务：开始时即获取写锁，避免两个进程领取同一个任务"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+    def enqueue(self, source: str, payload: Dict[str, Any], run_id: str = None) -> Optional[int]:
+        """添加任务，该来源已有未结束的任务时不重复添加，返回任务ID"""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE source = ? AND status IN (?, ?)", (source, PENDING, LEASED)
+            ).fetchone()
+            if row:
+                self.logger.info(f"来源 {source} 已有未完成的任务 #{row['id']}，跳过")
+                return None
+            cursor = conn.execute(
+                "INSERT INTO jobs (source, run_id, payload, status, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (source, run_id, json.dumps(payload, ensure_ascii=False), PENDING, now, now, now)
+            )
+            return cursor.lastrowid
+
+    def lease(self, worker_id: str) -> Optional[Job]:
+        """领取一个可执行的任务（待执行且已到时间，或租约已过期），没有时返回None"""
+        now = time.time()
+        with self._transaction() as conn:
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires < ?) "
+                    "ORDER BY available_at, id LIMIT 1",
+                    (PENDING, now, LEASED, now)
+                ).fetchone()
+                if row is None:
+                    return None
+                if row['status'] != LEASED:
+                    break
+
+                self.logger.warning(f"任务 #{row['id']}（{row['source']}）租约已过期，原工作进程 {row['lease_owner']} 可能已退出")
+                if row['attempts'] < self.max_attempts:
+                    break
+                conn.execute(
+                    "UPDATE jobs SET status = ?, last_error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                    "WHERE id = ?",
+                    (FAILED, '租约过期次数超过上限', now, row['id'])
+                )
+
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?, updated_at = ? "
+                "WHERE id = ?",
+                (LEASED, worker_id, now + self.visibility_timeout, now, row['id'])
+            )
+            return Job(
+                id=row['id'],
+                source=row['source'],
+                run_id=row['run_id'],
+                payload=json.loads(row['payload']),
+                attempts=row['attempts'] + 1,
+                lease_owner=worker_id
+            )
+
+    def extend(self, job: Job) -> bool:
+        """续约，租约已被其他工作进程接手时返回False"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (now + self.visibility_timeout, now, job.id, LEASED, job.lease_owner)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job: Job, result: Dict[str, Any] = None) -> bool:
+        """标记任务完成"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (DONE, json.dumps(result or {}, ensure_ascii=False), now, job.id, LEASED, job.lease_owner)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job: Job, error: str) -> bool:
+        """任务失败：未超过最大次数时退避后重试，否则标记为失败"""
+        now = time.time()
+        if job.attempts >= self.max_attempts:
+            status, available_at = FAILED, now
+            self.logger.error(f"任务 #{job.id}（{job.source}）失败 {job.attempts} 次，不再重试: {error}")
+        else:
+            status = PENDING
+            available_at = now + self.retry_delay * (2 ** (job.attempts - 1))
+            self.logger.warning(f"任务 #{job.id}（{job.source}）第 {job.attempts} 次失败，{int(available_at - now)} 秒后重试: {error}")
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, last_error = ?, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (status, available_at, error[:500], now, job.id, LEASED, job.lease_owner)
+            )
+            return cursor.rowcount == 1
+
+    def counts(self, run_id: str = None) -> Dict[str, int]:
+        """各状态的任务数，可按批次过滤"""
+        conn = self._connect()
+        try:
+            if run_id is None:
+                rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT status, COUNT(*) AS n FROM jobs WHERE run_id = ? GROUP BY status", (run_id,)
+                ).fetchall()
+        finally:
+            conn.close()
+        return {row['status']: row['n'] for row in rows}
+
+    def purge(self, keep_days: float = None) -> int:
+        """删除结束超过保留天数的任务"""
+        keep_days = self.config['keep_days'] if keep_days is None else keep_days
+        cutoff = time.time() - keep_days * 86400
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?", (DONE, FAILED, cutoff)
+            )
+            return cursor.rowcount
@@ -0,0 +1,387 @@
+"""
+流水线服务 - 爬取 → 去重 → 保存 → 发布 四个阶段经有界队列连接，各阶段并发执行
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from models.article import Article
+from storage.file_storage import FileStorage
+from services.article_service import ArticleService
+from services.publish_service import PublishService
+from utils.run_budget import RunBudget
+from utils.run_journal import RunJournal
+
+logger = logging.getLogger(__name__)
+
+# 默认流水线配置，可在 config.ini 的 pipeline 中覆盖
+DEFAULT_PIPELINE = {
+    'queue_size': 8,            # 各阶段之间的队列长度，队列满时上游暂停
+    'crawl_concurrency': 0,     # 同时运行的爬虫数，0表示不限制
+    'save_workers': 2,          # 保存协程数
+    'publish_workers': 1,       # 逐篇发布时的发布协程数
+    'email_limit': 200,         # 邮件摘要最多包含的文章数
+    'platform_timeout': 300     # 单个平台的发布超时（秒），平台配置中的 publish_timeout 优先
+}
+
+# 队列结束标记
+_DONE = object()
+
+
+class PipelineService:
+    """分阶段流水线
+
+    各阶段之间的队列有界，下游处理不过来时上游在 put 处等待；
+    保存成功的文章直接在内存中交给发布阶段，不再从磁盘读回。
+    """
+
+    def __init__(self, storage: FileStorage, article_service: ArticleService,
+                 publish_service: PublishService, config: Dict[str, Any] = None):
+        self.storage = storage
+        self.article_service = article_service
+        self.publish_service = publish_service
+        self.config = config or {}
+        self.settings = {**DEFAULT_PIPELINE, **self.config.get('pipeline', {})}
+        # 最近一次发布的各平台结果
+        self.last_report: Dict[str, Dict] = {}
+
+    async def run(self, crawlers_config: dict, publish: bool = True, journal: RunJournal = None,
+                  budget: RunBudget = None) -> int:
+        """运行一轮流水线
+
+        Args:
+            crawlers_config: 爬虫配置
+            publish: 是否发布，为False时只爬取和保存
+            journal: 运行日志，从中断处继续时跳过已完成的爬虫并补发已保存的文章
+            budget: 时间预算；爬取超时取消未完成的爬虫，已产出的文章照常保存和发布，
+                    保存和发布分别从上游结束时开始计时
+
+        Returns:
+            保存的新文章数量
+        """
+        article_service = self.article_service
+        article_service.reset_metrics()
+        budget = budget or RunBudget({'enabled': False})
+        queue_size = self.settings['queue_size']
+        save_workers = max(1, self.settings['save_workers'])
+
+        dedup_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        save_queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        publish_queue: Optional[asyncio.Queue] = asyncio.Queue(maxsize=queue_size) if publish else None
+        saved_count = 0
+
+        # 水位线和运行日志中的爬虫完成记录在来源的文章全部处理完（保存或判定重复）后才写入，
+        # 否则中断或保存超时时，已越过水位线但未保存的文章下次不会再被爬取
+        outstanding: Dict[str, int] = {}    # 来源 → 已产出但尚未处理完的文章数
+        crawled: Set[str] = set()           # 爬取已正常结束、等待文章处理完的来源
+        unsaved: Set[str] = set()           # 有文章保存失败的来源，本次不提交水位线
+
+        def settle(name: str):
+            if name not in crawled or outstanding.get(name):
+                return
+            crawled.discard(name)
+            if name in unsaved:
+                logger.warning(f"来源 {name} 有文章保存失败，水位线不提交，下次重新爬取")
+                return
+            article_service.commit_watermark(name)
+            if journal is not None:
+                journal.crawler_done(name)
+
+        def processed(name: str):
+            outstanding[name] -= 1
+            settle(name)
+
+        async def crawl_stage():
+            crawlers = article_service.create_crawlers(crawlers_config)
+            if journal is not None and journal.crawlers_done:
+                skipped = [crawler.name for crawler in crawlers if crawler.name in journal.crawlers_done]
+                if skipped:
+                    logger.info(f"中断前已完成的爬虫，本次跳过: {', '.join(skipped)}")
+                crawlers = [crawler for crawler in crawlers if crawler.name not in journal.crawlers_done]
+            # 高价值来源先启动，爬取预算不足时跳过排不下的低价值来源
+            crawlers = article_service.order_crawlers(
+                crawlers, budget.timeout('crawl'), self.settings['crawl_concurrency']
+            )
+            concurrency = self.settings['crawl_concurrency'] or len(crawlers) or 1
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def produce(name: str, batch: List[Article]):
+                outstanding[name] = outstanding.get(name, 0) + len(batch)
+                await dedup_queue.put((name, batch))
+
+            async def run_one(crawler):
+                async with semaphore:
+                    await article_service.run_crawler(crawler, produce, commit_watermark=False)
+                if crawler.name not in article_service.failures:
+                    crawled.add(crawler.name)
+                    settle(crawler.name)
+
+            cancelled = False
+            try:
+                await budget.run('crawl', asyncio.gather(*(run_one(crawler) for crawler in crawlers)))
+            except asyncio.CancelledError:
+                # 整轮被取消时下游同时被取消，队列不再被消费，不能等待写入结束标记
+                cancelled = True
+                raise
+            finally:
+                # 爬取出错时同样通知下游结束，否则去重、保存和发布会一直等待
+                if not cancelled:
+                    await dedup_queue.put(_DONE)
+
+        async def dedup_stage():
+            # 同一轮中不同来源可能产出相同文章，保存前按文件名去重
+            seen = set()
+            while True:
+                item = await dedup_queue.get()
+                if item is _DONE:
+                    break
+                name, batch = item
+                for article in batch:
+                    filename = article.get_filename()
+                    if filename in seen or await self.storage.article_exists(article):
+                        article_service.metrics.source(name).duplicates_skipped += 1
+                        processed(name)
+                        continue
+                    seen.add(filename)
+                    await save_queue.put((name, article))
+            for _ in range(save_workers):
+                await save_queue.put(_DONE)
+
+        async def save_worker():
+            nonlocal saved_count
+            while True:
+                item = await save_queue.get()
+                if item is _DONE:
+                    return
+                name, article = item
+                if await self.storage.save_article(article):
+                    saved_count += 1
+                    if journal is not None:
+                        journal.article_saved(article.get_filename())
+                    processed(name)
+                    if publish_queue is not None:
+                        await publish_queue.put(article)
+                else:
+                    if not await self.storage.article_exists(article):
+                        unsaved.add(name)
+                    processed(name)
+
+        resumed = await self._load_saved(journal) if publish and journal is not None and journal.resumed else []
+        crawl_task = asyncio.create_task(crawl_stage())
+        save_task = asyncio.gather(dedup_stage(), *(save_worker() for _ in range(save_workers)))
+        publish_task = asyncio.create_task(self._publish_stage(publish_queue, resumed, journal)) if publish else None
+        tasks = [task for task in (crawl_task, save_task, publish_task) if task is not None]
+        try:
+            # 上游结束（或超时被取消）后通知下游，下游把已收到的部分处理完
+            await crawl_task
+            await budget.run('save', save_task)
+            if publish_task is not None:
+                await publish_queue.put(_DONE)
+                await budget.run('publish', publish_task)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        unsaved_counts = {name: count for name, count in sorted(outstanding.items()) if count}
+        if unsaved_counts:
+            # 保存超时或出错时队列中剩余的文章：对应来源的水位线没有提交，下次运行重新爬取
+            details = ', '.join(f"{name} {count} 篇" for name, count in unsaved_counts.items())
+            logger.warning(f"共 {sum(unsaved_counts.values())} 篇文章未保存（{details}），这些来源的水位线不提交，下次重新爬取")
+            article_service.metrics.extra['unsaved'] = unsaved_counts
+        logger.info(f"共保存 {saved_count} 篇新文章")
+        return saved_count
+
+    async def _load_saved(self, journal: RunJournal) -> List[Article]:
+        """读取中断前已保存的文章，交给发布阶段"""
+        articles = []
+        for filename in journal.saved_files:
+            article = await self.storage.load_article(filename)
+            if article is not None:
+                articles.append(article)
+        return articles
+
+    async def _publish_stage(self, queue: asyncio.Queue, resumed: List[Article], journal: Optional[RunJournal]):
+        """发布阶段：收集本小时的新文章（从中断处继续时先处理中断前已保存的文章）
+
+        微信逐篇发布模式下文章到达即发布，与爬取和保存重叠；
+        微信汇总、小红书和邮件需要完整列表，在上游结束后发布。
+        """
+        max_publish = self.config.get('publish_settings', {}).get('max_articles_per_hour', 1)
+        email_limit = self.settings['email_limit']
+        stream_wechat = self.publish_service.wechat_streaming()
+
+        to_publish: List[Article] = []
+        email_articles: List[Article] = []
+        wechat_queue: Optional[asyncio.Queue] = None
+        wechat_tasks = []
+        # 各平台已发布的篇数，超时被取消时报告已完成的部分
+        progress: Dict[str, int] = {'wechat': 0}
+        if stream_wechat:
+            # 只有计入 to_publish 的文章进入队列，数量不超过 max_publish；不设上限，
+            # 微信接口卡住时收集不会被阻塞，其他平台照常在上游结束后开始
+            wechat_queue = asyncio.Queue()
+            workers = max(1, self.settings['publish_workers'])
+            wechat_tasks = [asyncio.create_task(self._wechat_worker(wechat_queue, journal, progress)) for _ in range(workers)]
+
+        async def accept(article: Article):
+            # 与原来从磁盘读取时一致：只发布发布时间在当前小时的文章
+            if article.publish_time.strftime('%Y_%m_%d_%H') != datetime.now().strftime('%Y_%m_%d_%H'):
+                return
+            if len(email_articles) < email_limit:
+                email_articles.append(article)
+            if len(to_publish) >= max_publish:
+                return
+            to_publish.append(article)
+            if wechat_queue is not None:
+                await wechat_queue.put(article)
+
+        try:
+            for article in resumed:
+                await accept(article)
+            while True:
+                article = await queue.get()
+                if article is _DONE:
+                    break
+                await accept(article)
+
+            wechat_drain = None
+            if wechat_tasks:
+                async def wechat_drain() -> int:
+                    # 等待逐篇发布协程处理完队列中剩余的文章
+                    for _ in wechat_tasks:
+                        await wechat_queue.put(_DONE)
+                    published = sum(await asyncio.gather(*wechat_tasks))
+                    logger.info(f"微信共发布 {published} 篇文章")
+                    return published
+            await self.publish_collected(to_publish, email_articles, journal, wechat_drain, progress)
+        finally:
+            for task in wechat_tasks:
+                task.cancel()
+
+    async def publish_collected(self, to_publish: List[Article], email_articles: List[Article],
+                                journal: RunJournal = None,
+                                wechat_drain: Optional[Callable[[], Awaitable[int]]] = None,
+                                progress: Dict[str, int] = None) -> Dict[str, Dict]:
+        """并发发布到各启用的平台，单个平台失败或超时不影响其他平台，返回汇总报告
+
+        运行日志中已记录发布成功的平台跳过。
+
+        Args:
+            to_publish: 发布到微信和小红书的文章
+            email_articles: 邮件摘要的文章
+            journal: 运行日志
+            wechat_drain: 微信逐篇发布已随文章到达进行时，等待其发布完剩余文章的协程函数，
+                          与其他平台同时执行并受同样的平台超时限制；为None时在这里发布微信
+            progress: 逐篇发布时各平台已发布的篇数，平台超时被取消时计入报告
+        """
+        publish_service = self.publish_service
+        progress = progress if progress is not None else {}
+
+        async def wechat():
+            if publish_service.wechat_streaming():
+                progress['wechat'] = 0
+                for article in to_publish:
+                    if await self._publish_wechat(article, journal):
+                        progress['wechat'] += 1
+                return progress['wechat']
+            if await publish_service.publish_to_wechat(to_publish):
+                self._mark(journal, 'wechat')
+                return len(to_publish)
+            return 0
+
+        async def xiaohongshu():
+            published = await publish_service.publish_to_xiaohongshu(to_publish)
+            if published:
+                self._mark(journal, 'xiaohongshu')
+            return published
+
+        async def email():
+            sent = await publish_service.send_email_digest(email_articles)
+            if sent:
+                self._mark(journal, 'email')
+            return len(email_articles) if sent else 0
+
+        platforms = {}
+        if publish_service.is_enabled('wechat'):
+            if wechat_drain is not None:
+                platforms['wechat'] = wechat_drain
+            elif publish_service.wechat_streaming() or self._pending(journal, 'wechat'):
+                platforms['wechat'] = wechat
+        if publish_service.is_enabled('xiaohongshu') and self._pending(journal, 'xiaohongshu'):
+            platforms['xiaohongshu'] = xiaohongshu
+        if publish_service.is_enabled('email') and self._pending(journal, 'email'):
+            platforms['email'] = email
+
+        results = await asyncio.gather(*(self._run_platform(name, func, progress) for name, func in platforms.items()))
+        report: Dict[str, Dict] = dict(zip(platforms, results))
+
+        summary = ', '.join(f"{name}: {item['status']}" for name, item in report.items())
+        logger.info(f"发布结果 - {summary or '没有启用的平台'}")
+        self.last_report = report
+        return report
+
+    async def _run_platform(self, name: str, func, progress: Dict[str, int]) -> Dict[str, Any]:
+        """在平台超时内执行一次发布，异常和超时只记入该平台的结果"""
+        timeout = self.config.get(name, {}).get('publish_timeout', self.settings['platform_timeout'])
+        start = time.monotonic()
+        try:
+            published = await asyncio.wait_for(func(), timeout=timeout)
+            status, error = ('ok' if published else 'failed'), None
+        except asyncio.TimeoutError:
+            published, status, error = progress.get(name, 0), 'timeout', f"超过 {timeout} 秒"
+            logger.error(f"{name} 发布超时（{timeout} 秒），已取消")
+        except Exception as e:
+            published, status, error = progress.get(name, 0), 'error', repr(e)
+            logger.error(f"{name} 发布异常: {e}")
+        result = {'status': status, 'published': published, 'seconds': round(time.monotonic() - start, 3)}
+        if error:
+            result['error'] = error
+        return result
+
+    async def publish_from_storage(self, journal: RunJournal = None) -> Dict[str, Dict]:
+        """发布存储中当前小时的未发布文章（爬取由其他进程完成时使用）"""
+        max_publish = self.config.get('publish_settings', {}).get('max_articles_per_hour', 1)
+        to_publish = await self.storage.get_unpublished_articles(limit=max_publish, current_hour_only=True)
+        email_articles = await self.storage.get_unpublished_articles(
+            limit=self.settings['email_limit'], current_hour_only=True
+        )
+        return await self.publish_collected(to_publish, email_articles, journal)
+
+    @staticmethod
+    def _pending(journal: Optional[RunJournal], platform: str) -> bool:
+        """汇总发布本轮是否还未成功"""
+        if journal is not None and journal.is_published(platform, 'digest'):
+            logger.info(f"{platform} 在中断前已发布，本次跳过")
+            return False
+        return True
+
+    @staticmethod
+    def _mark(journal: Optional[RunJournal], platform: str):
+        if journal is not None:
+            journal.mark_published(platform, 'digest')
+
+    async def _publish_wechat(self, article: Article, journal: Optional[RunJournal]) -> bool:
+        """逐篇发布到微信，中断前已发布的文章跳过"""
+        key = article.get_filename()
+        if journal is not None and journal.is_published('wechat', key):
+            return False
+        if not await self.publish_service.publish_wechat_article(article):
+            return False
+        if journal is not None:
+            journal.mark_published('wechat', key)
+        return True
+
+    async def _wechat_worker(self, queue: asyncio.Queue, journal: Optional[RunJournal], progress: Dict[str, int]) -> int:
+        """微信逐篇发布协程，返回本协程发布的篇数"""
+        published = 0
+        while True:
+            article = await queue.get()
+            if article is _DONE:
+                return published
+            if await self._publish_wechat(article, journal):
+                published += 1
+                progress['wechat'] += 1
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 from models.article import Article
@@ -20,7 +20,7 @@ class PublishService:
     
     async def publish_to_wechat(self, articles: List[Article]) -> int:
         """发布到微信"""
-        if not self._is_enabled('wechat'):
+        if not self.is_enabled('wechat'):
             return 0
 
         publisher = self.publisher_manager.get_publisher('wechat')
@@ -58,17 +58,8 @@ class PublishService:
             # 单篇发布模式：逐个发布文章
             published_count = 0
             for article in articles:
-                try:
-                    # 将单个文章包装成列表传递
-                    if await publisher.publish([article]):
-                        if not preserve_for_web:
-                            await self.storage.delete_article(article)
-                        published_count += 1
-                        logger.info(f"微信发布成功: {article.title}")
-                    else:
-                        logger.error(f"微信发布失败: {article.title}")
-                except Exception as e:
-                    logger.error(f"微信发布异常: {article.title}, 错误: {e}")
+                if await self.publish_wechat_article(article):
+                    published_count += 1
             
             if preserve_for_web:
                 logger.info(f"微信共发布 {published_count} 篇文章，Web数据保留模式启用，跳过删除文件")
@@ -76,9 +67,32 @@ class PublishService:
                 logger.info(f"微信共发布 {published_count} 篇文章")
             return published_count
     
+    def wechat_streaming(self) -> bool:
+        """微信是否为逐篇发布模式（文章可以到达即发布）"""
+        return self.is_enabled('wechat') and not self.config.get('wechat', {}).get('digest_mode', False)
+    
+    async def publish_wechat_article(self, article: Article) -> bool:
+        """单篇发布到微信"""
+        publisher = self.publisher_manager.get_publisher('wechat')
+        if not publisher:
+            return False
+        
+        preserve_for_web = self.config.get('web', {}).get('preserve_data', True)
+        try:
+            # 将单个文章包装成列表传递
+            if await publisher.publish([article]):
+                if not preserve_for_web:
+                    await self.storage.delete_article(article)
+                logger.info(f"微信发布成功: {article.title}")
+                return True
+            logger.error(f"微信发布失败: {article.title}")
+        except Exception as e:
+            logger.error(f"微信发布异常: {article.title}, 错误: {e}")
+        return False
+    
     async def publish_to_xiaohongshu(self, articles: List[Article]) -> int:
         """发布到小红书"""
-        if not self._is_enabled('xiaohongshu'):
+        if not self.is_enabled('xiaohongshu'):
             return 0
         
         publisher = self.publisher_manager.get_publisher('xiaohongshu')
@@ -114,20 +128,27 @@ class PublishService:
         
         return published_count
     
-    async def send_email_digest(self) -> bool:
-        """发送邮件摘要"""
-        if not self._is_enabled('email'):
+    async def send_email_digest(self, articles: Optional[List[Article]] = None) -> bool:
+        """发送邮件摘要
+        
+        Args:
+            articles: 摘要文章，为None时从存储读取当前小时的未发布文章
+        """
+        if not self.is_enabled('email'):
             return False
         
         publisher = self.publisher_manager.get_publisher('email')
         if not publisher:
             return False
         
-        # 获取当前小时的未发布文章
-        recent_articles = await self.storage.get_unpublished_articles(
-            limit=200,
-            current_hour_only=True
-        )
+        if articles is not None:
+            recent_articles = articles
+        else:
+            # 获取当前小时的未发布文章
+            recent_articles = await self.storage.get_unpublished_articles(
+                limit=200,
+                current_hour_only=True
+            )
         
         min_articles = self.config.get('email', {}).get('min_articles', 1)
         
@@ -160,6 +181,6 @@ class PublishService:
             logger.error(f"邮件发送失败: {subject}")
             return False
     
-    def _is_enabled(self, platform: str) -> bool:
+    def is_enabled(self, platform: str) -> bool:
         """检查平台是否启用"""
         return self.config.get(platform, {}).get('enabled', False)
\ No newline at end of file
@@ -1,56 +1,87 @@
 import logging
-from typing import Dict, Any
+import os
+from typing import Dict, Any, Optional, Type, Union
 
-from publishers.wechat_publisher import WechatPublisher
-from publishers.xiaohongshu_publisher import XiaohongshuPublisher
-from publishers.email_sender import EmailSender
-# from publishers.browser_wechat_publisher import BrowserWechatPublisher
+from publishers.base_publisher import BasePublisher
+from utils.import_timer import import_object
+from utils.token_cache import TokenCache
 
 logger = logging.getLogger(__name__)
 
 class PublisherManager:
     """发布器管理器"""
     
+    # 发布器按需导入，首次获取时才加载对应模块（及 jinja2 等依赖）
+    _publisher_map: Dict[str, Union[str, Type]] = {
+        "wechat": "publishers.wechat_publisher.WechatPublisher",
+        "xiaohongshu": "publishers.xiaohongshu_publisher.XiaohongshuPublisher",
+        "email": "publishers.email_sender.EmailSender",
+        # "browser_wechat": "publishers.browser_wechat_publisher.BrowserWechatPublisher",
+    }
+
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.publishers = {}
-        self._initialize_publishers()
+        # 各发布器共用的访问令牌缓存
+        self.token_cache = TokenCache(config.get('data_dir', 'data'), config.get('token_cache'))
+        # 各发布器共用的模板注册表，首次创建发布器时编译；重新加载配置时随管理器一起重建
+        self._templates = None
     
-    def _initialize_publishers(self):
-        """初始化发布器"""
-        # 微信发布器
-        if "wechat" in self.config:
-            wechat_config = self.config.get('wechat', {})
-            if wechat_config.get('use_browser', False):
-                browser_config = {
-                    'headless': wechat_config.get('headless', False),
-                    'user_data_dir': wechat_config.get('user_data_dir', None)
-                }
-                # self.publishers["wechat"] = BrowserWechatPublisher(browser_config)
-            else:
-                self.publishers["wechat"] = WechatPublisher(
-                    wechat_config,
-                    self.config.get('templates', {})
-                )
+    def _create_publisher(self, name: str):
+        """创建发布器实例，未配置或加载失败时返回None"""
+        if name not in self.config or name not in self._publisher_map:
+            return None
         
-        # 小红书发布器
-        if "xiaohongshu" in self.config:
-            self.publishers["xiaohongshu"] = XiaohongshuPublisher(
-                self.config.get('xiaohongshu', {}),
-                self.config.get('templates', {})
-            )
+        publisher_config = self.config.get(name, {})
+        if name == "wechat" and publisher_config.get('use_browser', False):
+            browser_config = {
+                'headless': publisher_config.get('headless', False),
+                'user_data_dir': publisher_config.get('user_data_dir', None)
+            }
+            # self.publishers["wechat"] = BrowserWechatPublisher(browser_config)
+            return None
         
-        # 邮件发送器
-        if "email" in self.config:
-            self.publishers["email"] = EmailSender(
-                self.config.get('email', {}),
-                self.config.get('templates', {})
-            )
+        target = self._publisher_map[name]
+        try:
+            publisher_class = import_object(target) if isinstance(target, str) else target
+        except ImportError as e:
+            logger.error(f"加载发布器 {name} 失败: {e}")
+            return None
+
+        template_config = self.config.get('templates', {})
+        publisher = publisher_class(publisher_config, template_config)
+        if hasattr(publisher, 'token_cache'):
+            publisher.token_cache = self.token_cache
+        if isinstance(publisher, BasePublisher):
+            publisher.templates = self.templates
+        return publisher
+
+    @property
+    def templates(self):
+        """编译并校验全部模板（jinja2 在此时才导入），按 data_dir 启用字节码缓存"""
+        if self._templates is None:
+            from utils.template_registry import TemplateRegistry
+
+            cache_dir = os.path.join(self.config.get('data_dir', 'data'), 'cache', 'templates')
+            self._templates = TemplateRegistry(self.config.get('templates', {}), cache_dir=cache_dir)
+        return self._templates
     
     def get_publisher(self, name: str):
         """获取发布器"""
-        return self.publishers.get(name)
+        if name not in self.publishers:
+            publisher = self._create_publisher(name)
+            if publisher is None:
+                return None
+            self.publishers[name] = publisher
+        return self.publishers[name]
+
+    @classmethod
+    def register_publisher(cls, name: str, publisher_class: Union[str, Type]):
+        """注册或替换发布器（类或点分路径）"""
+        cls._publisher_map[name] = publisher_class
     
     def get_all_publishers(self) -> Dict[str, Any]:
         """获取所有发布器"""
+        for name in self._publisher_map:
+            self.get_publisher(name)
         return self.publishers
\ No newline at end of file
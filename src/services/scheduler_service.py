@@ -7,38 +7,95 @@ logger = logging.getLogger(__name__)
 class SchedulerService:
     """调度服务类"""
     
-    def __init__(self, task_func):
+    def __init__(self, task_func, crawl_func=None, next_due_func=None):
+        """
+        Args:
+            task_func: 每整点执行的完整任务（爬取、发布、清理）
+            crawl_func: 整点之间来源到期时执行的仅爬取任务
+            next_due_func: 返回最早到期来源的时间戳，None表示没有
+        """
         self.task_func = task_func
+        self.crawl_func = crawl_func
+        self.next_due_func = next_due_func
         self.running = False
+        self._last_crawl = None
+        self._stop_event = asyncio.Event()
     
-    async def start_hourly_schedule(self):
-        """启动每小时定时任务"""
+    async def _sleep(self, seconds: float) -> bool:
+        """可被 stop() 打断的等待，返回是否应继续运行"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+        return self.running
+    
+    async def start_hourly_schedule(self, run_immediately: bool = False):
+        """启动每小时定时任务
+        
+        Args:
+            run_immediately: 启动后先执行一次，再等待整点
+        """
         logger.info("已设置定时任务，每整点执行一次")
         self.running = True
+        self._stop_event.clear()
+        
+        if run_immediately:
+            try:
+                await self.task_func()
+            except Exception as e:
+                logger.error(f"定时任务执行异常: {e}")
         
         while self.running:
             try:
                 # 计算下一个整点的时间
                 now = datetime.now()
                 next_hour = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
-                sleep_seconds = (next_hour - now).total_seconds()
                 
+                # 有来源在整点之前到期时，先执行一次仅爬取任务
+                next_crawl = self._next_crawl(now, next_hour)
+                if next_crawl is not None:
+                    sleep_seconds = max(0.0, (next_crawl - now).total_seconds())
+                    logger.info(f"等待 {sleep_seconds:.0f} 秒后爬取到期来源（{next_crawl.strftime('%Y-%m-%d %H:%M:%S')}）")
+                    if not await self._sleep(sleep_seconds):
+                        break
+                    self._last_crawl = datetime.now()
+                    await self.crawl_func()
+                    continue
+                
+                sleep_seconds = (next_hour - now).total_seconds()
                 logger.info(f"等待 {sleep_seconds:.0f} 秒后执行下一次任务（{next_hour.strftime('%Y-%m-%d %H:%M:%S')}）")
                 
                 # 等待到下一个整点
-                await asyncio.sleep(sleep_seconds)
+                if not await self._sleep(sleep_seconds):
+                    break
                 
-                if self.running:
-                    # 执行任务
-                    logger.info(f"开始执行定时任务: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                    await self.task_func()
+                # 执行任务（执行期间收到停止信号时，等本次任务完成后退出）
+                logger.info(f"开始执行定时任务: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+                await self.task_func()
                 
             except Exception as e:
                 logger.error(f"定时任务执行异常: {e}")
                 # 出错后等待5分钟再重试
-                await asyncio.sleep(300)
+                await self._sleep(300)
+        
+        logger.info("定时任务循环已退出")
+    
+    def _next_crawl(self, now: datetime, next_hour: datetime):
+        """整点之前最早的来源到期时间，距整点不足1分钟时并入整点任务"""
+        if self.crawl_func is None or self.next_due_func is None:
+            return None
+        due = self.next_due_func()
+        if due is None:
+            return None
+        # 两次爬取之间至少间隔1分钟，避免无法创建或一直被跳过的来源导致连续空转
+        earliest = now if self._last_crawl is None else max(now, self._last_crawl + timedelta(minutes=1))
+        due_time = max(earliest, datetime.fromtimestamp(due))
+        if due_time >= next_hour - timedelta(minutes=1):
+            return None
+        return due_time
     
     def stop(self):
         """停止调度"""
         self.running = False
+        self._stop_event.set()
         logger.info("定时任务已停止")
\ No newline at end of file
@@ -1,7 +1,8 @@
+import asyncio
 import os
 import json
 import logging
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 from datetime import datetime
 from models.article import Article
 from storage.base_storage import BaseStorage
@@ -31,11 +32,9 @@ class FileStorage(BaseStorage):
             filename = article.get_filename()
             filepath = os.path.join(self.data_dir, filename)
             
-            # 保存文章内容
+            # 保存文章内容（在线程中写入，不阻塞同时运行的爬虫）
             article_data = article.to_dict()
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(article_data, f, ensure_ascii=False, indent=2)
+            await asyncio.to_thread(self._write_json, filepath, article_data)
             
             self.logger.info(f"文章已保存: {article.title}")
             return True
@@ -44,6 +43,11 @@ class FileStorage(BaseStorage):
             self.logger.error(f"保存文章失败: {e}")
             return False
     
+    @staticmethod
+    def _write_json(filepath: str, data: dict):
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    
     async def get_unpublished_articles(self, limit: int = 10, current_hour_only: bool = False) -> List[Article]:
         """获取未发布的文章
         
@@ -110,6 +114,18 @@ class FileStorage(BaseStorage):
         
         return articles
     
+    async def load_article(self, filename: str) -> Optional[Article]:
+        """按文件名读取文章，文件不存在或无法解析时返回None"""
+        filepath = os.path.join(self.data_dir, filename)
+        if not os.path.exists(filepath):
+            return None
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                return Article.from_dict(json.load(f))
+        except Exception as e:
+            self.logger.error(f"读取文章失败 {filename}: {e}")
+            return None
+    
     async def delete_article(self, article: Article) -> bool:
         """删除文章文件"""
         try:
@@ -146,6 +162,10 @@ class FileStorage(BaseStorage):
         Returns:
             删除的文章数量
         """
+        # 遍历和删除文件都是阻塞操作，在线程中执行，不阻塞事件循环，时间预算也能按时返回
+        return await asyncio.to_thread(self._cleanup_old_articles, keep_count, keep_days)
+    
+    def _cleanup_old_articles(self, keep_count: int, keep_days: int) -> int:
         try:
             if not os.path.exists(self.data_dir):
                 return 0
@@ -0,0 +1,131 @@
+"""
+水位线存储 - 记录每个来源上次爬取到的位置，用于增量爬取
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+from utils.state_file import update_entry
+
+
+class Watermark:
+    """单个来源的水位线"""
+
+    def __init__(self, data: Dict = None, max_keys: int = 200):
+        data = data or {}
+        self.max_keys = max_keys
+        self.last_publish_time = self._parse_time(data.get('last_publish_time'))
+        self.keys = list(data.get('keys', []))
+        self.updated_at = data.get('updated_at')
+        self._seen = set(self.keys)
+        self._new_keys = []
+        self._new_set = set()
+        self._touched = []
+        self._new_publish_time = self.last_publish_time
+
+    @staticmethod
+    def make_key(value: str) -> str:
+        """把URL或标题转换为定长哈希"""
+        return hashlib.md5(value.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def _parse_time(value: Optional[str]) -> Optional[datetime]:
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _naive(publish_time: datetime) -> datetime:
+        """带时区的时间统一转换为本地时间，便于比较"""
+        if publish_time.tzinfo is not None:
+            return publish_time.astimezone().replace(tzinfo=None)
+        return publish_time
+
+    @property
+    def is_empty(self) -> bool:
+        """是否为首次爬取"""
+        return not self.keys and self.last_publish_time is None
+
+    @property
+    def new_count(self) -> int:
+        """本次爬取中上次运行之后新出现的条目数"""
+        return len(self._new_keys)
+
+    def is_seen(self, value: str, publish_time: datetime = None) -> bool:
+        """判断条目是否在上次运行时已经见过"""
+        if self.make_key(value) in self._seen:
+            return True
+        if publish_time and self.last_publish_time:
+            return self._naive(publish_time) <= self.last_publish_time
+        return False
+
+    def mark(self, value: str, publish_time: datetime = None) -> bool:
+        """记录本次见到的条目，返回是否为新条目"""
+        key = self.make_key(value)
+        if publish_time:
+            publish_time = self._naive(publish_time)
+            if self._new_publish_time is None or publish_time > self._new_publish_time:
+                self._new_publish_time = publish_time
+        if key in self._seen:
+            # 仍在列表中的旧条目保留在前面，避免被挤出水位线后又被当作新条目
+            if key not in self._new_set:
+                self._touched.append(key)
+                self._new_set.add(key)
+            return False
+        if key in self._new_set:
+            return False
+        self._new_keys.append(key)
+        self._new_set.add(key)
+        return True
+
+    def to_dict(self) -> Dict:
+        """合并本次结果，保留最近的 max_keys 个哈希"""
+        keys = (self._new_keys + self._touched + [k for k in self.keys if k not in self._new_set])[:self.max_keys]
+        return {
+            'last_publish_time': self._new_publish_time.isoformat() if self._new_publish_time else None,
+            'keys': keys,
+            'updated_at': datetime.now().isoformat(),
+            'new_count': self.new_count
+        }
+
+
+class WatermarkStore:
+    """水位线文件存储（data/state/watermarks.json）"""
+
+    def __init__(self, data_dir: str = 'data', max_keys: int = 200):
+        self.state_dir = os.path.join(data_dir, 'state')
+        self.path = os.path.join(self.state_dir, 'watermarks.json')
+        self.max_keys = max_keys
+        self.logger = logging.getLogger("storage.watermark")
+        self._data = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        """读取水位线文件"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.error(f"读取水位线失败，将全量爬取: {e}")
+            return {}
+
+    def get(self, source: str) -> Watermark:
+        """获取来源的水位线"""
+        return Watermark(self._data.get(source), self.max_keys)
+
+    def commit(self, source: str, watermark: Watermark):
+        """保存来源本次爬取后的水位线"""
+        self._data[source] = watermark.to_dict()
+        try:
+            # 只写回该来源的条目，保留其他进程（爬取工作进程）的更新
+            self._data = update_entry(self.path, source, self._data[source])
+        except Exception as e:
+            self.logger.error(f"保存水位线失败: {e}")
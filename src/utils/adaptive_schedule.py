@@ -0,0 +1,137 @@
+"""
+自适应调度 - 按每次爬取的新条目比例调整各来源的爬取间隔
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from utils.state_file import update_entry
+
+# 默认调度配置，可在 config.ini 的 adaptive_schedule 中覆盖，单个来源可通过 schedule 再覆盖
+DEFAULT_SCHEDULE = {
+    'enabled': True,
+    'min_interval': 900,        # 最短间隔（秒）
+    'max_interval': 21600,      # 最长间隔（秒）
+    'initial_interval': 3600,   # 新来源的初始间隔（秒）
+    'target_low': 0.2,          # 新条目比例低于该值时放慢
+    'target_high': 0.6,         # 新条目比例高于该值时加快
+    'speedup': 0.5,             # 加快时间隔乘以该系数
+    'backoff': 1.5,             # 放慢时间隔乘以该系数
+    'alpha': 0.5,               # 新条目比例的指数平滑系数
+    'tolerance': 120            # 提前多少秒也视为到期，避免定时任务的时间抖动错过一轮
+}
+
+
+class AdaptiveSchedule:
+    """按来源持久化的爬取间隔（data/state/source_schedules.json）"""
+
+    def __init__(self, data_dir: str = 'data', config: Dict[str, Any] = None):
+        self.config = {**DEFAULT_SCHEDULE, **(config or {})}
+        self.enabled = self.config['enabled']
+        self.path = os.path.join(data_dir, 'state', 'source_schedules.json')
+        self.logger = logging.getLogger("adaptive_schedule")
+        self._states = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.error(f"读取调度状态失败: {e}")
+            return {}
+
+    def _save(self, source: str):
+        try:
+            # 只写回该来源的条目，保留其他进程（爬取工作进程）的更新
+            self._states = update_entry(self.path, source, self._states[source])
+        except Exception as e:
+            self.logger.error(f"保存调度状态失败: {e}")
+
+    def _settings(self, source_config: Dict[str, Any] = None) -> Dict[str, Any]:
+        """全局配置与来源 schedule 配置合并"""
+        return {**self.config, **((source_config or {}).get('schedule') or {})}
+
+    def is_due(self, source: str, source_config: Dict[str, Any] = None, now: float = None) -> bool:
+        """来源本次是否到期"""
+        if not self.enabled:
+            return True
+        state = self._states.get(source)
+        if not state:
+            return True
+        now = now if now is not None else datetime.now().timestamp()
+        next_run = state['last_run'] + state['interval']
+        if now + self._settings(source_config)['tolerance'] >= next_run:
+            return True
+        self.logger.info(f"来源 {source} 未到爬取时间，{int(next_run - now)} 秒后再爬")
+        return False
+
+    def record(self, source: str, new_count: int, total: int, source_config: Dict[str, Any] = None,
+               started_at: float = None):
+        """记录一次成功爬取，按新条目比例调整间隔
+
+        Args:
+            source: 来源名称
+            new_count: 上次运行之后新出现的条目数
+            total: 本次处理的条目数；遇到旧条目即停止的爬虫按 max_articles 计，
+                   比例表示本次爬取窗口被新条目填满的程度
+            source_config: 来源配置
+            started_at: 本次爬取开始的时间戳
+        """
+        if not self.enabled:
+            return
+        settings = self._settings(source_config)
+        min_interval = float(settings['min_interval'])
+        max_interval = max(min_interval, float(settings['max_interval']))
+
+        capacity = max(total, (source_config or {}).get('max_articles', 0), 1)
+        novelty = min(1.0, new_count / capacity)
+
+        state = self._states.get(source)
+        if state is None:
+            state = {'interval': float(settings['initial_interval']), 'novelty': novelty}
+            self._states[source] = state
+        else:
+            alpha = float(settings['alpha'])
+            state['novelty'] = alpha * novelty + (1 - alpha) * state.get('novelty', novelty)
+
+        old_interval = state['interval']
+        if state['novelty'] > settings['target_high']:
+            state['interval'] = old_interval * float(settings['speedup'])
+        elif state['novelty'] < settings['target_low']:
+            state['interval'] = old_interval * float(settings['backoff'])
+        state['interval'] = min(max_interval, max(min_interval, state['interval']))
+        state['last_run'] = started_at if started_at is not None else datetime.now().timestamp()
+        state['last_novelty'] = round(novelty, 3)
+        state['novelty'] = round(state['novelty'], 3)
+
+        if int(state['interval']) != int(old_interval):
+            self.logger.info(f"来源 {source} 新条目比例 {state['novelty']:.2f}，爬取间隔调整为 {int(state['interval'])} 秒")
+        self._save(source)
+
+    def record_failure(self, source: str, source_config: Dict[str, Any] = None, started_at: float = None):
+        """记录一次失败的爬取：间隔不变，从本次开始重新计时（连续失败由熔断器处理）"""
+        if not self.enabled:
+            return
+        state = self._states.setdefault(source, {
+            'interval': float(self._settings(source_config)['initial_interval']),
+            'novelty': 0.0
+        })
+        state['last_run'] = started_at if started_at is not None else datetime.now().timestamp()
+        self._save(source)
+
+    def next_due(self, sources: Iterable[str]) -> Optional[float]:
+        """给定来源中最早的下次爬取时间戳，有来源从未爬过时返回当前时间，未启用时返回None"""
+        if not self.enabled:
+            return None
+        times = []
+        for source in sources:
+            state = self._states.get(source)
+            if not state:
+                return datetime.now().timestamp()
+            times.append(state['last_run'] + state['interval'])
+        return min(times) if times else None
@@ -0,0 +1,75 @@
+"""
+浏览器池 - 常驻模式下复用 Playwright 和 Chromium 进程，每次爬取使用独立的浏览器上下文
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_enabled = False
+_playwright = None
+_browser = None
+_lock: Optional[asyncio.Lock] = None
+
+
+def enable_browser_pool(enabled: bool = True):
+    """开启或关闭浏览器复用（仅常驻模式开启）"""
+    global _enabled
+    _enabled = enabled
+
+
+async def _get_browser(launch_options: Dict[str, Any]):
+    """获取常驻浏览器，未启动或已断开时重新启动"""
+    global _playwright, _browser, _lock
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if _browser is not None and _browser.is_connected():
+            return _browser
+        if _playwright is None:
+            from playwright.async_api import async_playwright
+            _playwright = await async_playwright().start()
+        _browser = await _playwright.chromium.launch(**launch_options)
+        logger.info("已启动常驻浏览器")
+        return _browser
+
+
+@asynccontextmanager
+async def acquire_browser(**launch_options) -> AsyncIterator[Any]:
+    """获取浏览器
+
+    未开启复用时启动新浏览器并在退出时关闭；开启时返回常驻浏览器，
+    调用方应使用独立的 new_context() 并自行关闭，不要关闭浏览器本身。
+    首次启动时的 launch_options 生效，之后的调用沿用已启动的浏览器。
+    """
+    if not _enabled:
+        from playwright.async_api import async_playwright
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(**launch_options)
+            try:
+                yield browser
+            finally:
+                await browser.close()
+        return
+
+    yield await _get_browser(launch_options)
+
+
+async def close_browser_pool():
+    """关闭常驻浏览器和 Playwright"""
+    global _playwright, _browser
+    if _browser is not None:
+        try:
+            await _browser.close()
+        except Exception as e:
+            logger.warning(f"关闭浏览器失败: {e}")
+        _browser = None
+    if _playwright is not None:
+        try:
+            await _playwright.stop()
+        except Exception as e:
+            logger.warning(f"停止 Playwright 失败: {e}")
+        _playwright = None
@@ -0,0 +1,108 @@
+"""
+字符集识别 - 依次根据响应头、meta标签、BOM和有限长度的嗅探确定编码
+"""
+
+import codecs
+import re
+from typing import Optional
+
+try:
+    # 可选的快速检测库，未安装时使用内置规则
+    from charset_normalizer import from_bytes as _detect
+except ImportError:
+    _detect = None
+
+# 查找 meta / XML 声明的范围
+META_SCAN_BYTES = 4096
+# 嗅探窗口大小
+SNIFF_BYTES = 8192
+
+_HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.I)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w.:-]+)', re.I)
+_XML_ENCODING_RE = re.compile(rb'^\s*<\?xml[^>]+encoding\s*=\s*["\']([\w.:-]+)["\']', re.I)
+_NON_ASCII_RE = re.compile(rb'[\x80-\xff]')
+
+# 常见中文编码统一为超集，避免生僻字解码失败
+_ALIASES = {
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+    'x-gbk': 'gb18030',
+    'cp936': 'gb18030',
+    'utf8': 'utf-8',
+    'unicode': 'utf-8'
+}
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16')
+)
+
+
+def normalize_encoding(name: Optional[str]) -> Optional[str]:
+    """规范化编码名称，Python 不支持的编码返回None"""
+    if not name:
+        return None
+    name = name.strip().lower()
+    name = _ALIASES.get(name, name)
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def _from_header(content_type: str) -> Optional[str]:
+    match = _HEADER_CHARSET_RE.search(content_type or '')
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def _from_markup(body: bytes) -> Optional[str]:
+    head = body[:META_SCAN_BYTES]
+    match = _XML_ENCODING_RE.search(head) or _META_CHARSET_RE.search(head)
+    return normalize_encoding(match.group(1).decode('ascii', 'ignore')) if match else None
+
+
+def _from_bom(body: bytes) -> Optional[str]:
+    for bom, encoding in _BOMS:
+        if body.startswith(bom):
+            return encoding
+    return None
+
+
+def _sniff(body: bytes) -> str:
+    """在第一段非ASCII内容附近取有限长度样本判断编码"""
+    match = _NON_ASCII_RE.search(body)
+    if not match:
+        return 'utf-8'
+    start = max(0, match.start() - 16)
+    sample = body[start:start + SNIFF_BYTES]
+
+    # 合法的UTF-8最常见，允许样本末尾截断半个字符
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    if _detect is not None:
+        best = _detect(sample).best()
+        encoding = normalize_encoding(best.encoding) if best else None
+        if encoding:
+            return encoding
+
+    # 中文站点最常见的非UTF-8编码
+    return 'gb18030'
+
+
+def detect_encoding(body: bytes, content_type: str = '') -> str:
+    """确定响应体编码：响应头 > meta标签/XML声明 > BOM > 嗅探"""
+    return _from_header(content_type) or _from_markup(body) or _from_bom(body) or _sniff(body)
+
+
+def decode_body(body: bytes, content_type: str = '') -> str:
+    """按识别出的编码解码响应体，无法解码的字节替换为占位符"""
+    if not body:
+        return ""
+    return body.decode(detect_encoding(body, content_type), errors='replace')
@@ -0,0 +1,108 @@
+"""
+熔断器 - 连续失败的来源在冷却期内跳过，冷却后放行一次探测
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict
+
+from utils.state_file import update_entry
+
+# 默认熔断配置，可在 config.ini 的 circuit_breaker 中覆盖
+DEFAULT_CIRCUIT_BREAKER = {
+    'failure_threshold': 3,   # 连续失败多少次后熔断
+    'cooldown': 3600,         # 首次熔断冷却时间（秒）
+    'max_cooldown': 86400     # 探测失败后冷却时间翻倍的上限（秒）
+}
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """按来源持久化的熔断器（data/state/circuit_breakers.json）"""
+
+    def __init__(self, data_dir: str = 'data', config: Dict[str, Any] = None):
+        config = {**DEFAULT_CIRCUIT_BREAKER, **(config or {})}
+        self.failure_threshold = max(1, int(config['failure_threshold']))
+        self.cooldown = float(config['cooldown'])
+        self.max_cooldown = max(self.cooldown, float(config['max_cooldown']))
+        self.path = os.path.join(data_dir, 'state', 'circuit_breakers.json')
+        self.logger = logging.getLogger("circuit_breaker")
+        self._states = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.error(f"读取熔断状态失败: {e}")
+            return {}
+
+    def _save(self, source: str):
+        try:
+            # 只写回该来源的条目，保留其他进程（爬取工作进程）的更新
+            self._states = update_entry(self.path, source, self._states[source])
+        except Exception as e:
+            self.logger.error(f"保存熔断状态失败: {e}")
+
+    def _state(self, source: str) -> Dict:
+        return self._states.setdefault(source, {
+            'state': CLOSED,
+            'failures': 0,
+            'open_until': 0,
+            'cooldown': self.cooldown,
+            'last_error': ''
+        })
+
+    def allow(self, source: str) -> bool:
+        """来源本次是否允许爬取；冷却结束时转为半开状态放行一次探测"""
+        state = self._state(source)
+        if state['state'] == OPEN:
+            now = datetime.now().timestamp()
+            if now < state['open_until']:
+                remaining = int(state['open_until'] - now)
+                self.logger.info(f"来源 {source} 处于熔断状态，剩余冷却 {remaining} 秒，跳过")
+                return False
+            state['state'] = HALF_OPEN
+            self._save(source)
+            self.logger.info(f"来源 {source} 冷却结束，进行半开探测")
+        return True
+
+    def is_probe(self, source: str) -> bool:
+        """当前是否为半开探测"""
+        return self._states.get(source, {}).get('state') == HALF_OPEN
+
+    def record_success(self, source: str):
+        """爬取成功，关闭熔断"""
+        state = self._state(source)
+        if state['state'] != CLOSED:
+            self.logger.info(f"来源 {source} 探测成功，恢复正常")
+        if state['state'] != CLOSED or state['failures']:
+            state.update(state=CLOSED, failures=0, open_until=0, cooldown=self.cooldown, last_error='')
+            self._save(source)
+
+    def record_failure(self, source: str, error: str = ""):
+        """爬取失败，达到阈值或探测失败时熔断"""
+        state = self._state(source)
+        state['failures'] += 1
+        state['last_error'] = error[:200]
+
+        if state['state'] == HALF_OPEN:
+            # 探测失败，冷却时间翻倍
+            state['cooldown'] = min(self.max_cooldown, state['cooldown'] * 2)
+            self._open(source, state)
+        elif state['failures'] >= self.failure_threshold:
+            state['cooldown'] = self.cooldown
+            self._open(source, state)
+        self._save(source)
+
+    def _open(self, source: str, state: Dict):
+        state['state'] = OPEN
+        state['open_until'] = datetime.now().timestamp() + state['cooldown']
+        self.logger.warning(f"来源 {source} 连续失败 {state['failures']} 次，熔断 {int(state['cooldown'])} 秒")
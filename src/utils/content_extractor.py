@@ -0,0 +1,323 @@
+"""
+正文提取器 - 单次扫描HTML，按可读性评分选出正文区域
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import List, Optional
+
+# 默认正文最大长度（字符）
+DEFAULT_MAX_LENGTH = 5000
+
+# 未命中选择器时，最多扫描 max_length 的多少倍文本后停止
+SCAN_FACTOR = 10
+
+# 连续空白压缩为一个空格（与原 clean_html 的两次替换结果一致）
+_WHITESPACE_RE = re.compile(r'\s{2,}')
+
+# 选择器形式: tag / .class / #id / tag[class*="x"]
+_SELECTOR_RE = re.compile(r'^(?P<tag>[a-zA-Z0-9]*)(?:\.(?P<cls>[\w-]+)|#(?P<id>[\w-]+)|\[class\*="(?P<contains>[^"]+)"\])?$')
+
+# 正文倾向 / 非正文倾向的 class、id 关键字
+_POSITIVE_RE = re.compile(r'article|body|content|entry|main|post|text|story|rich', re.I)
+_NEGATIVE_RE = re.compile(r'comment|footer|footnote|nav|menu|sidebar|side|share|related|recommend|banner|ad-|advert|header|copyright|login', re.I)
+
+# 内容被整体丢弃的标签
+_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'iframe', 'select', 'button'}
+# 可以出现在 <head> 中的标签；遇到其他标签时 head 隐式结束（很多页面不写 </head>）
+_HEAD_TAGS = {'head', 'title', 'meta', 'link', 'base', 'script', 'style', 'noscript', 'template'}
+# 参与候选评分的容器标签
+_CONTAINER_TAGS = {'div', 'article', 'section', 'main', 'td', 'body'}
+# 作为段落计分的标签
+_PARAGRAPH_TAGS = {'p', 'pre', 'blockquote', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+# 块级标签，前后插入换行
+_BLOCK_TAGS = _CONTAINER_TAGS | _PARAGRAPH_TAGS | {'ul', 'ol', 'table', 'tr', 'br', 'hr', 'header', 'footer', 'aside', 'nav', 'dd', 'dt', 'figure'}
+# 无结束标签的元素
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'}
+# 段落标签遇到同类开始标签时隐式闭合
+_AUTO_CLOSE = {'p': {'p'}, 'li': {'li'}}
+
+_PUNCTUATION = '，,。；;！!？?'
+
+
+class _StopParsing(Exception):
+    """已获得足够正文，提前结束扫描"""
+
+
+class _Node:
+    """扫描过程中的元素状态，文本通过片段区间引用，不做复制"""
+
+    __slots__ = ('tag', 'weight', 'hint', 'frag_start', 'chars_start', 'links_start', 'commas_start', 'score', 'is_candidate')
+
+    def __init__(self, tag: str, weight: int, hint: Optional[int], frag_start: int, chars_start: int, links_start: int, commas_start: int):
+        self.tag = tag
+        self.weight = weight
+        self.hint = hint
+        self.frag_start = frag_start
+        self.chars_start = chars_start
+        self.links_start = links_start
+        self.commas_start = commas_start
+        self.score = 0.0
+        self.is_candidate = tag in _CONTAINER_TAGS
+
+
+class _Candidate:
+    """已闭合的候选区域"""
+
+    __slots__ = ('frag_start', 'frag_end', 'chars', 'score')
+
+    def __init__(self, frag_start: int, frag_end: int, chars: int, score: float):
+        self.frag_start = frag_start
+        self.frag_end = frag_end
+        self.chars = chars
+        self.score = score
+
+
+def _parse_selector(selector: str):
+    """解析简单CSS选择器，不支持的写法返回None"""
+    match = _SELECTOR_RE.match(selector.strip())
+    if not match:
+        return None
+    return match.group('tag').lower(), match.group('cls'), match.group('id'), match.group('contains')
+
+
+class _ContentParser(HTMLParser):
+    """单次扫描解析器"""
+
+    def __init__(self, hints: List[str], max_length: int, main_only: bool):
+        super().__init__(convert_charrefs=True)
+        self.hints = [h for h in (_parse_selector(s) for s in hints) if h]
+        self.max_length = max_length
+        self.main_only = main_only
+        self.scan_limit = max_length * SCAN_FACTOR if max_length else 0
+
+        self.fragments: List[str] = []
+        self.chars = 0
+        self.link_chars = 0
+        self.commas = 0
+        self.stack: List[_Node] = []
+        self.skip_depth = 0
+        self.link_depth = 0
+        # <head> 中的文本（如 <title>）不计入正文
+        self.in_head = False
+
+        self.best: Optional[_Candidate] = None
+        self.hinted: Optional[_Candidate] = None
+        self.hinted_priority = len(self.hints)
+
+    def _match_hint(self, tag: str, attrs) -> Optional[int]:
+        """返回命中的选择器序号（越小优先级越高）"""
+        if not self.hints:
+            return None
+        classes = ''
+        element_id = ''
+        for key, value in attrs:
+            if key == 'class' and value:
+                classes = value
+            elif key == 'id' and value:
+                element_id = value
+        for index, (h_tag, h_cls, h_id, h_contains) in enumerate(self.hints):
+            if h_tag and h_tag != tag:
+                continue
+            if h_cls and h_cls not in classes.split():
+                continue
+            if h_id and h_id != element_id:
+                continue
+            if h_contains and h_contains not in classes:
+                continue
+            return index
+        return None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'head':
+            self.in_head = True
+            return
+        if self.in_head and tag not in _HEAD_TAGS:
+            self.in_head = False
+        if tag in _SKIP_TAGS:
+            if tag not in _VOID_TAGS:
+                self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+
+        if tag == 'a':
+            self.link_depth += 1
+        if tag in _BLOCK_TAGS:
+            self._break()
+        if tag in _VOID_TAGS:
+            return
+
+        # 段落隐式闭合（如连续的 <p> 未写结束标签）
+        closes = _AUTO_CLOSE.get(tag)
+        if closes and self.stack and self.stack[-1].tag in closes:
+            self._close_top()
+
+        weight = 0
+        if self.main_only:
+            for key, value in attrs:
+                if key in ('class', 'id') and value:
+                    if _POSITIVE_RE.search(value):
+                        weight += 25
+                    if _NEGATIVE_RE.search(value):
+                        weight -= 25
+            if tag == 'article':
+                weight += 10
+        hint = self._match_hint(tag, attrs) if self.main_only else None
+
+        self.stack.append(_Node(tag, weight, hint, len(self.fragments), self.chars, self.link_chars, self.commas))
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _BLOCK_TAGS and not self.skip_depth:
+            self._break()
+
+    def handle_endtag(self, tag):
+        if tag == 'head':
+            self.in_head = False
+            return
+        if tag in _SKIP_TAGS:
+            if self.skip_depth:
+                self.skip_depth -= 1
+            return
+        if self.skip_depth:
+            return
+
+        if tag == 'a' and self.link_depth:
+            self.link_depth -= 1
+        if tag in _BLOCK_TAGS:
+            self._break()
+
+        # 容错：关闭到最近的同名元素，找不到则忽略
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth].tag == tag:
+                while len(self.stack) > depth:
+                    self._close_top()
+                break
+
+    def _break(self):
+        """块级边界换行，连续边界只记录一次"""
+        if self.fragments and self.fragments[-1] != '\n':
+            self.fragments.append('\n')
+
+    def handle_data(self, data):
+        if self.skip_depth or self.in_head or not data:
+            return
+        self.fragments.append(data)
+        length = len(data)
+        self.chars += length
+        if self.link_depth:
+            self.link_chars += length
+        for mark in _PUNCTUATION:
+            self.commas += data.count(mark)
+
+        if not self.main_only:
+            return
+        # 最高优先级选择器命中的区域已经足够长，后面的内容不会再被选中
+        if self.max_length and self.stack:
+            for node in self.stack:
+                if node.hint == 0 and self.chars - node.chars_start >= self.max_length:
+                    self.hinted = _Candidate(node.frag_start, len(self.fragments), self.chars - node.chars_start, 0)
+                    self.hinted_priority = 0
+                    raise _StopParsing()
+        if self.scan_limit and self.chars >= self.scan_limit:
+            raise _StopParsing()
+
+    def _close_top(self):
+        """闭合栈顶元素并完成评分"""
+        node = self.stack.pop()
+        if not self.main_only:
+            return
+
+        chars = self.chars - node.chars_start
+        frag_end = len(self.fragments)
+
+        if node.hint is not None and node.hint < self.hinted_priority and chars:
+            self.hinted = _Candidate(node.frag_start, frag_end, chars, 0)
+            self.hinted_priority = node.hint
+            if node.hint == 0:
+                raise _StopParsing()
+
+        # 段落得分累加到父级和祖父级容器
+        if node.tag in _PARAGRAPH_TAGS and chars >= 25:
+            paragraph_score = 1 + (self.commas - node.commas_start) + min(chars / 100, 3)
+            if self.stack:
+                self.stack[-1].score += paragraph_score
+            if len(self.stack) > 1:
+                self.stack[-2].score += paragraph_score / 2
+        elif node.tag == 'div' and chars >= 25 and self.stack:
+            # 直接承载文字的 div 视为段落
+            self.stack[-1].score += 1 + min(chars / 100, 3)
+
+        if node.is_candidate and chars:
+            link_density = (self.link_chars - node.links_start) / chars
+            score = (node.score + node.weight) * (1 - link_density)
+            if score > 0 and (self.best is None or score > self.best.score):
+                self.best = _Candidate(node.frag_start, frag_end, chars, score)
+
+    def finish(self):
+        """闭合所有未闭合元素，使其参与评分"""
+        try:
+            while self.stack:
+                self._close_top()
+        except _StopParsing:
+            pass
+
+    def result(self) -> str:
+        """拼接选中区域文本，达到最大长度即停止"""
+        if self.main_only:
+            chosen = self.hinted or self.best
+        else:
+            chosen = None
+        if chosen:
+            fragments = self.fragments[chosen.frag_start:chosen.frag_end]
+        else:
+            fragments = self.fragments
+        return _join_limited(fragments, self.max_length)
+
+
+def _join_limited(fragments: List[str], max_length: int) -> str:
+    """拼接片段并规整空白，只处理到 max_length 为止"""
+    if max_length:
+        total = 0
+        for index, fragment in enumerate(fragments):
+            total += len(fragment)
+            if total >= max_length * 2:
+                fragments = fragments[:index + 1]
+                break
+    text = normalize_whitespace(''.join(fragments)).strip()
+    return text[:max_length] if max_length else text
+
+
+def normalize_whitespace(text: str) -> str:
+    """压缩连续空白"""
+    return _WHITESPACE_RE.sub(' ', text)
+
+
+def _run(parser: _ContentParser, html: str) -> str:
+    try:
+        parser.feed(html)
+        parser.close()
+    except _StopParsing:
+        pass
+    parser.finish()
+    return parser.result()
+
+
+def extract_main_content(html: str, hints: List[str] = None, max_length: int = DEFAULT_MAX_LENGTH) -> str:
+    """单次扫描提取正文（纯函数，可提交到CPU工作池执行）
+
+    Args:
+        html: 页面原始HTML
+        hints: 按优先级排列的正文区域选择器，命中时优先于评分结果
+        max_length: 正文最大长度，0表示不限制；命中首选区域且达到该长度时提前结束扫描
+    """
+    if not html:
+        return ""
+    return _run(_ContentParser(hints or [], max_length, main_only=True), html)
+
+
+def extract_all_text(html: str, max_length: int = 0) -> str:
+    """提取整个文档的可见文本"""
+    if not html:
+        return ""
+    return _run(_ContentParser([], max_length, main_only=False), html)
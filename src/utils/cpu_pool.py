@@ -0,0 +1,84 @@
+"""
+CPU工作池 - 将HTML解析等CPU密集任务移出事件循环
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 全部爬虫共享同一个进程池
+_executor: Optional[ProcessPoolExecutor] = None
+_max_workers: int = min(4, os.cpu_count() or 1)
+
+
+def configure_cpu_pool(config: Dict[str, Any] = None):
+    """根据配置设置工作进程数量
+
+    Args:
+        config: config.ini 中的 cpu_pool 配置，workers 为 0 时在事件循环内直接解析
+    """
+    global _max_workers
+    config = config or {}
+    workers = config.get('workers')
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+
+    if _executor is not None and workers != _max_workers:
+        shutdown_cpu_pool()
+
+    _max_workers = max(0, int(workers))
+    logger.info(f"CPU工作池进程数: {_max_workers}")
+
+
+def get_cpu_pool() -> Optional[ProcessPoolExecutor]:
+    """获取共享进程池（首次使用时创建）"""
+    global _executor
+    if _max_workers <= 0:
+        return None
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=_max_workers)
+    return _executor
+
+
+async def run_in_cpu_pool(func: Callable, *args, **kwargs) -> Any:
+    """在进程池中执行函数，func 及参数必须可被pickle"""
+    global _executor
+    executor = get_cpu_pool()
+    if executor is None:
+        return func(*args, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+    except BrokenProcessPool as e:
+        # 工作进程异常退出时重建进程池，本次任务退回当前进程执行
+        logger.error(f"CPU工作池已损坏，重建进程池: {e}")
+        _executor = None
+        return func(*args, **kwargs)
+
+
+def _timed_call(func: Callable, *args, **kwargs) -> Tuple[Any, float]:
+    """执行函数并返回结果和本进程消耗的CPU时间"""
+    start = time.process_time()
+    result = func(*args, **kwargs)
+    return result, time.process_time() - start
+
+
+async def run_in_cpu_pool_timed(func: Callable, *args, **kwargs) -> Tuple[Any, float]:
+    """同 run_in_cpu_pool，额外返回解析消耗的CPU秒数"""
+    return await run_in_cpu_pool(_timed_call, func, *args, **kwargs)
+
+
+def shutdown_cpu_pool():
+    """关闭进程池"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
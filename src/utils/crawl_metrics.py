@@ -0,0 +1,178 @@
+"""
+爬虫指标 - 按来源统计请求耗时、下载量、解析CPU时间、产出与错误
+"""
+
+import json
+import logging
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List
+
+# 请求耗时直方图分桶（秒）
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+logger = logging.getLogger(__name__)
+
+
+class SourceMetrics:
+    """单个来源的指标"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.fetch_count = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.bytes_downloaded = 0
+        self.parse_cpu_seconds = 0.0
+        self.articles_yielded = 0
+        self.duplicates_skipped = 0
+        self.new_entries = 0
+        self.duration = 0.0
+        self.errors: Counter = Counter()
+
+    def observe_fetch(self, latency: float, size: int):
+        """记录一次成功的请求"""
+        self.fetch_count += 1
+        self.latency_sum += latency
+        self.bytes_downloaded += size
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.latency_buckets[index] += 1
+                break
+
+    def observe_parse(self, cpu_seconds: float):
+        """记录解析消耗的CPU时间"""
+        self.parse_cpu_seconds += cpu_seconds
+
+    def observe_error(self, error: BaseException):
+        """按异常类型记录错误"""
+        self.errors[type(error).__name__] += 1
+
+    def to_state(self) -> Dict[str, Any]:
+        """原始计数，用于从子进程汇总到主进程"""
+        return {
+            'fetch_count': self.fetch_count,
+            'latency_sum': self.latency_sum,
+            'latency_buckets': self.latency_buckets,
+            'bytes_downloaded': self.bytes_downloaded,
+            'parse_cpu_seconds': self.parse_cpu_seconds,
+            'errors': dict(self.errors)
+        }
+
+    def merge_state(self, state: Dict[str, Any]):
+        """累加 to_state() 的结果"""
+        self.fetch_count += state.get('fetch_count', 0)
+        self.latency_sum += state.get('latency_sum', 0.0)
+        for index, count in enumerate(state.get('latency_buckets', [])[:len(LATENCY_BUCKETS)]):
+            self.latency_buckets[index] += count
+        self.bytes_downloaded += state.get('bytes_downloaded', 0)
+        self.parse_cpu_seconds += state.get('parse_cpu_seconds', 0.0)
+        self.errors.update(state.get('errors', {}))
+
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(LATENCY_BUCKETS, self.latency_buckets):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets['+Inf'] = self.fetch_count
+        return {
+            'duration_seconds': round(self.duration, 3),
+            'fetch_count': self.fetch_count,
+            'fetch_latency_avg': round(self.latency_sum / self.fetch_count, 3) if self.fetch_count else 0,
+            'fetch_latency_buckets': buckets,
+            'bytes_downloaded': self.bytes_downloaded,
+            'parse_cpu_seconds': round(self.parse_cpu_seconds, 4),
+            'articles_yielded': self.articles_yielded,
+            'new_entries': self.new_entries,
+            'duplicates_skipped': self.duplicates_skipped,
+            'errors': dict(self.errors)
+        }
+
+
+def _label(value: str) -> str:
+    """转义 Prometheus 标签值"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class CrawlMetrics:
+    """一次运行的爬虫指标"""
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.sources: Dict[str, SourceMetrics] = {}
+        # 运行级别的附加信息（如各阶段耗时）
+        self.extra: Dict[str, Any] = {}
+
+    def source(self, name: str) -> SourceMetrics:
+        """获取来源的指标对象"""
+        metrics = self.sources.get(name)
+        if metrics is None:
+            metrics = SourceMetrics(name)
+            self.sources[name] = metrics
+        return metrics
+
+    def to_report(self) -> Dict[str, Any]:
+        """生成JSON运行报告"""
+        return {
+            'started_at': self.started_at.isoformat(),
+            'finished_at': datetime.now().isoformat(),
+            'sources': {name: metrics.to_dict() for name, metrics in self.sources.items()},
+            **self.extra
+        }
+
+    def to_prometheus(self) -> str:
+        """生成 Prometheus 文本格式"""
+        lines: List[str] = [
+            '# HELP crawler_fetch_latency_seconds HTTP fetch latency per source.',
+            '# TYPE crawler_fetch_latency_seconds histogram'
+        ]
+        for name, metrics in self.sources.items():
+            source = _label(name)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, metrics.latency_buckets):
+                cumulative += count
+                lines.append(f'crawler_fetch_latency_seconds_bucket{{source="{source}",le="{bound}"}} {cumulative}')
+            lines.append(f'crawler_fetch_latency_seconds_bucket{{source="{source}",le="+Inf"}} {metrics.fetch_count}')
+            lines.append(f'crawler_fetch_latency_seconds_sum{{source="{source}"}} {metrics.latency_sum:.6f}')
+            lines.append(f'crawler_fetch_latency_seconds_count{{source="{source}"}} {metrics.fetch_count}')
+
+        counters = (
+            ('crawler_bytes_downloaded_total', 'Response bytes downloaded.', 'bytes_downloaded'),
+            ('crawler_parse_cpu_seconds_total', 'CPU seconds spent parsing.', 'parse_cpu_seconds'),
+            ('crawler_articles_yielded_total', 'Articles produced by the crawler.', 'articles_yielded'),
+            ('crawler_new_entries_total', 'Entries not seen in the previous run.', 'new_entries'),
+            ('crawler_duplicates_skipped_total', 'Articles skipped because they were already stored.', 'duplicates_skipped')
+        )
+        for metric, help_text, attr in counters:
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} counter')
+            for name, metrics in self.sources.items():
+                lines.append(f'{metric}{{source="{_label(name)}"}} {getattr(metrics, attr)}')
+
+        lines.append('# HELP crawler_errors_total Errors by exception class.')
+        lines.append('# TYPE crawler_errors_total counter')
+        for name, metrics in self.sources.items():
+            for error, count in metrics.errors.items():
+                lines.append(f'crawler_errors_total{{source="{_label(name)}",error="{_label(error)}"}} {count}')
+
+        lines.append('# HELP crawler_duration_seconds Wall time of the crawler in this run.')
+        lines.append('# TYPE crawler_duration_seconds gauge')
+        for name, metrics in self.sources.items():
+            lines.append(f'crawler_duration_seconds{{source="{_label(name)}"}} {metrics.duration:.3f}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, data_dir: str = 'data'):
+        """写入 data/metrics/run_report.json 和 crawler_metrics.prom"""
+        metrics_dir = os.path.join(data_dir, 'metrics')
+        try:
+            os.makedirs(metrics_dir, exist_ok=True)
+            with open(os.path.join(metrics_dir, 'run_report.json'), 'w', encoding='utf-8') as f:
+                json.dump(self.to_report(), f, ensure_ascii=False, indent=2)
+            with open(os.path.join(metrics_dir, 'crawler_metrics.prom'), 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus())
+            logger.info(f"爬虫指标已写入: {metrics_dir}")
+        except Exception as e:
+            logger.error(f"写入爬虫指标失败: {e}")
@@ -1,28 +1,13 @@
-import re
-from bs4 import BeautifulSoup
+from utils.content_extractor import extract_all_text, normalize_whitespace
 
 def clean_html(html_content: str) -> str:
     """清理HTML内容"""
     if not html_content:
         return ""
 
-    # 如果输入是HTML，使用BeautifulSoup清理
+    # 如果输入是HTML，单次扫描提取可见文本（已完成空白规整）
     if '<' in html_content and '>' in html_content:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # 移除不需要的标签
-        for tag in soup(['script', 'style', 'meta', 'link']):
-            tag.decompose()
-        
-        # 转换为纯文本但保留一些格式
-        text = soup.get_text(separator='\n', strip=True)
-    else:
-        text = html_content
-    
-    # 清理多余的空行
-    text = re.sub(r'\n\s*\n', '\n\n', text)
-    
-    # 清理多余的空格
-    text = re.sub(r'\s{2,}', ' ', text)
-    
-    return text
\ No newline at end of file
+        return extract_all_text(html_content)
+
+    # 清理多余的空行和空格
+    return normalize_whitespace(html_content)
\ No newline at end of file
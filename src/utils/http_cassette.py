@@ -0,0 +1,273 @@
+"""
+HTTP录制/回放 - 将请求与响应保存到本地磁带目录，离线回放用于基准测试和回归验证
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可在 config.ini 的 http_cassette 中覆盖
+DEFAULT_CASSETTE = {
+    'mode': 'off',              # off / record / replay
+    'dir': 'data/cassettes',    # 磁带目录
+    'latency': 0.0,             # 回放时每个请求的附加延迟（秒）
+    'bandwidth': 0              # 回放时模拟的带宽（字节/秒），0表示不限
+}
+
+# 响应体已解码，回放时不能再声明压缩或分块
+_SKIPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'set-cookie'}
+
+# 请求头中的凭据，磁带中只保留名称
+_SECRET_HEADERS = {'authorization', 'proxy-authorization', 'cookie', 'x-api-key', 'x-auth-token', 'x-csrf-token'}
+_REDACTED = '<已移除>'
+
+
+def redact_headers(headers) -> list:
+    """请求头转为 [名称, 值] 列表，凭据的值替换为占位符"""
+    return [[k, _REDACTED if k.lower() in _SECRET_HEADERS else v] for k, v in (headers or {}).items()]
+
+
+def cassette_key(method: str, url: str) -> str:
+    """请求对应的磁带文件名"""
+    return hashlib.sha1(f"{method.upper()} {url}".encode('utf-8')).hexdigest()[:20]
+
+
+class CassetteStore:
+    """磁带存储：每个请求一个JSON文件"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, method: str, url: str) -> str:
+        return os.path.join(self.directory, f"{cassette_key(method, url)}.json")
+
+    def save(self, method: str, url: str, status: int, headers: Dict[str, str], body: bytes, elapsed: float = 0.0,
+             request_headers: Dict[str, str] = None):
+        """保存一次请求的请求头（凭据已移除）和响应"""
+        record = {
+            'method': method.upper(),
+            'url': url,
+            'request_headers': redact_headers(request_headers),
+            'status': status,
+            'headers': [[k, v] for k, v in headers.items() if k.lower() not in _SKIPPED_HEADERS],
+            'body': base64.b64encode(body).decode('ascii'),
+            'elapsed': round(elapsed, 4)
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(method, url)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"保存磁带失败 {url}: {e}")
+
+    def load(self, method: str, url: str) -> Optional[Dict[str, Any]]:
+        """读取请求对应的响应，不存在时返回None"""
+        path = self._path(method, url)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            record = json.load(f)
+        record['body'] = base64.b64decode(record['body'])
+        return record
+
+
+class CassetteMiss(Exception):
+    """回放时磁带中没有该请求（不重试）"""
+
+
+class _ReplayContent:
+    """模拟 aiohttp 的 StreamReader，按带宽分块产出"""
+
+    def __init__(self, body: bytes, bandwidth: float):
+        self._body = body
+        self._bandwidth = bandwidth
+
+    async def iter_chunked(self, n: int):
+        for offset in range(0, len(self._body), n):
+            chunk = self._body[offset:offset + n]
+            if self._bandwidth:
+                await asyncio.sleep(len(chunk) / self._bandwidth)
+            yield chunk
+
+    async def read(self) -> bytes:
+        chunks = [chunk async for chunk in self.iter_chunked(64 * 1024)]
+        return b''.join(chunks)
+
+
+class ReplayResponse:
+    """回放的响应，提供爬虫用到的 aiohttp.ClientResponse 接口"""
+
+    def __init__(self, method: str, url: str, record: Dict[str, Any], bandwidth: float):
+        self.method = method
+        self.url = URL(url)
+        self.status = record['status']
+        headers = CIMultiDict((k, v) for k, v in record['headers'])
+        headers['Content-Length'] = str(len(record['body']))
+        self.headers = CIMultiDictProxy(headers)
+        self.content_length = len(record['body'])
+        self.content = _ReplayContent(record['body'], bandwidth)
+        # 录制时实际发送的请求头（旧磁带没有该项）
+        request_headers = CIMultiDictProxy(CIMultiDict((k, v) for k, v in record.get('request_headers', [])))
+        self.request_info = aiohttp.RequestInfo(self.url, method, request_headers, self.url)
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise aiohttp.ClientResponseError(self.request_info, (), status=self.status,
+                                              message=f"回放状态码 {self.status}", headers=self.headers)
+
+    async def read(self) -> bytes:
+        return await self.content.read()
+
+    async def text(self, encoding: str = 'utf-8') -> str:
+        return (await self.read()).decode(encoding, errors='replace')
+
+    async def json(self, **kwargs) -> Any:
+        return json.loads(await self.read())
+
+    def close(self):
+        pass
+
+    def release(self):
+        pass
+
+
+class _ReplayRequest:
+    """session.get() 的返回值，可 await 也可用 async with"""
+
+    def __init__(self, session: 'ReplaySession', method: str, url: str, headers: Optional[Dict[str, str]]):
+        self._session = session
+        self._method = method
+        self._url = url
+        self._headers = headers
+
+    def __await__(self):
+        return self._session._respond(self._method, self._url, self._headers).__await__()
+
+    async def __aenter__(self) -> ReplayResponse:
+        return await self._session._respond(self._method, self._url, self._headers)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class ReplaySession:
+    """从磁带回放的会话，替代 aiohttp.ClientSession"""
+
+    def __init__(self, store: CassetteStore, latency: float = 0.0, bandwidth: float = 0):
+        self.store = store
+        self.latency = float(latency or 0)
+        self.bandwidth = float(bandwidth or 0)
+        self.closed = False
+
+    async def _respond(self, method: str, url: str, headers: Optional[Dict[str, str]] = None) -> ReplayResponse:
+        record = self.store.load(method, url)
+        if record is None:
+            raise CassetteMiss(f"磁带中没有请求: {method} {url}")
+        if headers and 'request_headers' in record:
+            # 只比较调用方显式设置的请求头，会话自动添加的请求头不计入
+            recorded = CIMultiDict((k, v) for k, v in record['request_headers'])
+            changed = [k for k, v in redact_headers(headers) if recorded.get(k) != v]
+            if changed:
+                logger.debug(f"回放 {method} {url} 的请求头与录制时不同: {', '.join(changed)}")
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ReplayResponse(method, url, record, self.bandwidth)
+
+    def get(self, url: str, headers: Dict[str, str] = None, **kwargs) -> _ReplayRequest:
+        return _ReplayRequest(self, 'GET', str(url), headers)
+
+    async def close(self):
+        self.closed = True
+
+
+# 全局录制/回放配置
+_config: Dict[str, Any] = dict(DEFAULT_CASSETTE)
+_store: Optional[CassetteStore] = None
+
+
+def configure_cassette(config: Dict[str, Any] = None):
+    """根据 config.ini 的 http_cassette 配置设置录制/回放模式"""
+    global _config, _store
+    _config = {**DEFAULT_CASSETTE, **(config or {})}
+    if _config['mode'] not in ('off', 'record', 'replay'):
+        logger.error(f"未知的磁带模式: {_config['mode']}，已关闭录制/回放")
+        _config['mode'] = 'off'
+    _store = CassetteStore(_config['dir']) if _config['mode'] != 'off' else None
+    if _store is not None:
+        logger.info(f"HTTP磁带模式: {_config['mode']}，目录: {_config['dir']}")
+
+
+def cassette_config() -> Dict[str, Any]:
+    """当前录制/回放配置（传给隔离运行的爬虫子进程）"""
+    return dict(_config)
+
+
+def cassette_mode() -> str:
+    """当前模式：off / record / replay"""
+    return _config['mode']
+
+
+def open_session(timeout: aiohttp.ClientTimeout):
+    """创建爬虫会话，回放模式下返回 ReplaySession"""
+    if cassette_mode() == 'replay':
+        return ReplaySession(_store, _config['latency'], _config['bandwidth'])
+    return aiohttp.ClientSession(timeout=timeout)
+
+
+def record_response(method: str, url: str, status: int, headers, body: bytes, elapsed: float = 0.0,
+                    request_headers=None):
+    """录制模式下保存请求头和响应，其他模式下不做任何事"""
+    if cassette_mode() == 'record':
+        _store.save(method, url, status, dict(headers), body, elapsed,
+                    dict(request_headers) if request_headers is not None else None)
+
+
+async def attach_to_page(page):
+    """为 Playwright 页面接入录制/回放
+
+    录制模式下保存页面加载的全部响应；回放模式下拦截所有请求，
+    命中磁带的请求直接返回录制内容，未命中的请求中止。
+    """
+    mode = cassette_mode()
+    if mode == 'record':
+        async def on_response(response):
+            try:
+                body = await response.body()
+            except Exception:
+                # 重定向等响应没有响应体
+                return
+            elapsed = max(response.request.timing.get('responseEnd', 0), 0) / 1000
+            record_response(response.request.method, response.url, response.status, response.headers, body, elapsed,
+                            response.request.headers)
+
+        page.on("response", on_response)
+
+    elif mode == 'replay':
+        latency = float(_config['latency'] or 0)
+        bandwidth = float(_config['bandwidth'] or 0)
+
+        async def on_route(route):
+            request = route.request
+            record = _store.load(request.method, request.url)
+            if record is None:
+                await route.abort()
+                return
+            delay = latency + (len(record['body']) / bandwidth if bandwidth else 0)
+            if delay:
+                await asyncio.sleep(delay)
+            await route.fulfill(status=record['status'], headers=dict(record['headers']), body=record['body'])
+
+        await page.route("**/*", on_route)
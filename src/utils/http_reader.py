@@ -0,0 +1,92 @@
+"""
+响应读取 - 按字节上限流式读取响应体，超限或类型不符时提前中止
+"""
+
+from typing import Optional, Sequence
+
+import aiohttp
+
+# 默认单个响应的字节上限，可在 config.ini 的爬虫条目中通过 max_response_bytes 覆盖
+DEFAULT_MAX_RESPONSE_BYTES = 2 * 1024 * 1024
+
+# 每次从连接读取的块大小
+CHUNK_SIZE = 64 * 1024
+
+# 常用的允许类型（按子串匹配 Content-Type）
+HTML_TYPES = ('text/html', 'application/xhtml', 'text/plain')
+FEED_TYPES = ('xml', 'rss', 'atom', 'text/plain')
+JSON_TYPES = ('json', 'javascript', 'text/plain')
+
+
+class ResponseTooLarge(Exception):
+    """响应体超过字节上限（不重试）"""
+
+
+class UnexpectedContentType(Exception):
+    """响应类型不在允许列表中（不重试）"""
+
+
+def check_content_type(response: aiohttp.ClientResponse, allowed_types: Optional[Sequence[str]]):
+    """检查 Content-Type，未声明类型时放行"""
+    if not allowed_types:
+        return
+    content_type = response.headers.get('Content-Type', '').lower()
+    if content_type and not any(allowed in content_type for allowed in allowed_types):
+        raise UnexpectedContentType(f"不支持的响应类型 {content_type}: {response.url}")
+
+
+async def read_capped(response: aiohttp.ClientResponse, max_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+                      allowed_types: Optional[Sequence[str]] = None, truncate: bool = False) -> bytes:
+    """流式读取响应体
+
+    Args:
+        response: aiohttp响应
+        max_bytes: 字节上限，0表示不限制
+        allowed_types: 允许的 Content-Type 子串列表，None表示不检查
+        truncate: 超限时截断返回已读部分（适合HTML正文页），否则抛出 ResponseTooLarge
+
+    Returns:
+        响应体字节
+    """
+    check_content_type(response, allowed_types)
+
+    # 声明长度已超限时不读取响应体
+    declared = response.content_length
+    if max_bytes and declared is not None and declared > max_bytes and not truncate:
+        raise ResponseTooLarge(f"响应体 {declared} 字节超过上限 {max_bytes}: {response.url}")
+
+    body = bytearray()
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        body.extend(chunk)
+        if max_bytes and len(body) > max_bytes:
+            if not truncate:
+                raise ResponseTooLarge(f"响应体超过上限 {max_bytes} 字节: {response.url}")
+            # 已读够，放弃剩余部分并关闭连接
+            del body[max_bytes:]
+            response.close()
+            break
+    return bytes(body)
+
+
+class StreamedResponse:
+    """流式读取的响应，按块产出并累计已读字节数"""
+
+    def __init__(self, response: aiohttp.ClientResponse, max_bytes: int = 0, keep_body: bool = False):
+        self.response = response
+        self.max_bytes = max_bytes
+        self.content_type = response.headers.get('Content-Type', '')
+        self.received = 0
+        self.completed = False
+        # 需要完整响应体时（如录制）保留已读内容
+        self.body: Optional[bytearray] = bytearray() if keep_body else None
+
+    async def iter_chunks(self):
+        """逐块产出响应体，超过字节上限时抛出 ResponseTooLarge"""
+        async for chunk in self.response.content.iter_chunked(CHUNK_SIZE):
+            self.received += len(chunk)
+            if self.max_bytes and self.received > self.max_bytes:
+                raise ResponseTooLarge(f"响应体超过上限 {self.max_bytes} 字节: {self.response.url}")
+            if self.body is not None:
+                self.body.extend(chunk)
+            yield chunk
+        self.completed = True
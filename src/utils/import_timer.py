@@ -0,0 +1,47 @@
+"""
+按需导入 - 通过点分路径加载类并记录导入耗时
+"""
+
+import importlib
+import logging
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# 本进程内各模块的导入耗时（秒），首次导入包含其依赖的加载时间
+_import_times: Dict[str, float] = {}
+
+
+def record_import_time(name: str, seconds: float):
+    """记录一次导入耗时"""
+    _import_times[name] = _import_times.get(name, 0.0) + seconds
+
+
+def import_object(path: str) -> Any:
+    """按 "包.模块.对象名" 导入对象
+
+    Raises:
+        ImportError: 模块或对象不存在
+    """
+    module_name, _, attr = path.rpartition('.')
+    if not module_name:
+        raise ImportError(f"无效的导入路径: {path}")
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    elapsed = time.perf_counter() - start
+    if module_name not in _import_times:
+        record_import_time(module_name, elapsed)
+        logger.debug(f"导入 {module_name} 耗时 {elapsed * 1000:.1f} ms")
+
+    try:
+        return getattr(module, attr)
+    except AttributeError:
+        raise ImportError(f"模块 {module_name} 中不存在 {attr}") from None
+
+
+def get_import_report() -> Dict[str, float]:
+    """导入耗时报告（毫秒，按耗时降序）"""
+    ordered = sorted(_import_times.items(), key=lambda item: item[1], reverse=True)
+    return {name: round(seconds * 1000, 1) for name, seconds in ordered}
@@ -0,0 +1,206 @@
+"""
+按主机限速 - 令牌桶控制请求速率，AIMD 自适应控制并发
+"""
+
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# 默认限速配置，可在 config.ini 的爬虫条目中通过 rate_limit 覆盖
+DEFAULT_RATE_LIMIT = {
+    'enabled': True,
+    'rate': 2.0,              # 每秒最多请求数
+    'min_rate': 0.2,          # 被限流后速率下限
+    'burst': 4,               # 令牌桶容量
+    'max_concurrency': 4,     # 并发上限
+    'min_concurrency': 1,     # 并发下限
+    'latency_target': 3.0,    # 响应时间超过该值（秒）视为拥塞
+    'decrease_factor': 0.5    # 拥塞时的乘性减少系数
+}
+
+
+class RequestOutcome:
+    """单次请求结果，由调用方在请求完成后填写"""
+
+    __slots__ = ('status', 'retry_after', 'error')
+
+    def __init__(self):
+        self.status: Optional[int] = None
+        self.retry_after: Optional[str] = None
+        self.error = False
+
+
+class HostRateLimiter:
+    """单个主机的限速器"""
+
+    def __init__(self, host: str, config: Dict[str, Any] = None):
+        config = {**DEFAULT_RATE_LIMIT, **(config or {})}
+        self.host = host
+        self.enabled = config['enabled']
+        self.max_rate = float(config['rate'])
+        self.min_rate = min(float(config['min_rate']), self.max_rate)
+        self.burst = max(1.0, float(config['burst']))
+        self.max_concurrency = max(1, int(config['max_concurrency']))
+        self.min_concurrency = max(1, min(int(config['min_concurrency']), self.max_concurrency))
+        self.latency_target = float(config['latency_target'])
+        self.decrease_factor = float(config['decrease_factor'])
+
+        self.rate = self.max_rate
+        self.tokens = self.burst
+        self.limit = float(self.min_concurrency)
+        self.inflight = 0
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: List[asyncio.Future] = []
+        # 已合并过的配置，避免每次请求重复合并
+        self._configs = {_config_key(config)}
+
+    def merge(self, config: Dict[str, Any] = None):
+        """合并同一主机的另一份限速配置，各项取更严格的值，主机的总速率和并发不超过任一配置"""
+        key = _config_key(config)
+        if key in self._configs:
+            return
+        self._configs.add(key)
+        config = {**DEFAULT_RATE_LIMIT, **(config or {})}
+        self.enabled = self.enabled or config['enabled']
+        self.max_rate = min(self.max_rate, float(config['rate']))
+        self.min_rate = min(self.min_rate, float(config['min_rate']), self.max_rate)
+        self.burst = min(self.burst, max(1.0, float(config['burst'])))
+        self.max_concurrency = min(self.max_concurrency, max(1, int(config['max_concurrency'])))
+        self.min_concurrency = max(1, min(self.min_concurrency, int(config['min_concurrency']), self.max_concurrency))
+        self.latency_target = min(self.latency_target, float(config['latency_target']))
+        self.decrease_factor = min(self.decrease_factor, float(config['decrease_factor']))
+
+        self.rate = min(self.rate, self.max_rate)
+        self.tokens = min(self.tokens, self.burst)
+        self.limit = min(self.limit, float(self.max_concurrency))
+        logger.info(f"主机 {self.host} 有多份限速配置，按最严格的合并: 速率 {self.max_rate:.2f}/s，并发上限 {self.max_concurrency}")
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def acquire(self):
+        """等待并发名额与令牌"""
+        # 并发控制
+        while self.inflight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif not waiter.cancelled():
+                    # 已被唤醒但任务取消，把名额让给下一个等待者
+                    self._wake()
+                raise
+        self.inflight += 1
+
+        try:
+            # 服务端要求的暂停（Retry-After）
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+            # 令牌桶：先预占令牌，不足部分按速率等待
+            self._refill()
+            self.tokens -= 1
+            if self.tokens < 0:
+                await asyncio.sleep(-self.tokens / self.rate)
+        except BaseException:
+            self.inflight -= 1
+            self._wake()
+            raise
+
+    def release(self, outcome: RequestOutcome, latency: float):
+        """归还并发名额，并根据结果调整速率和并发"""
+        self.inflight -= 1
+
+        throttled = outcome.status == 429 or (outcome.status is not None and outcome.status >= 500)
+        if throttled or outcome.error:
+            # 乘性减少
+            old_limit = self.limit
+            self.limit = max(float(self.min_concurrency), self.limit * self.decrease_factor)
+            if throttled:
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self._apply_retry_after(outcome.retry_after)
+            if int(old_limit) != int(self.limit):
+                logger.info(f"主机 {self.host} 限流: 状态 {outcome.status}，并发降为 {int(self.limit)}，速率 {self.rate:.2f}/s")
+        elif latency > self.latency_target:
+            # 响应变慢，轻度减少并发
+            self.limit = max(float(self.min_concurrency), self.limit * 0.9)
+        else:
+            # 加性增加：大约每完成一轮并发请求增加一个名额
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / max(self.limit, 1.0))
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+        self._wake()
+
+    def _apply_retry_after(self, retry_after: Optional[str]):
+        if not retry_after:
+            return
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            return
+        self._paused_until = max(self._paused_until, time.monotonic() + min(seconds, 300))
+
+    def _wake(self):
+        """唤醒可以获得名额的等待者"""
+        available = int(self.limit) - self.inflight
+        while available > 0 and self._waiters:
+            waiter = self._waiters.pop(0)
+            if not waiter.done():
+                waiter.set_result(None)
+                available -= 1
+
+    @asynccontextmanager
+    async def throttle(self):
+        """限速上下文，调用方在块内填写返回的 RequestOutcome"""
+        outcome = RequestOutcome()
+        if not self.enabled:
+            yield outcome
+            return
+
+        await self.acquire()
+        start = time.monotonic()
+        try:
+            yield outcome
+        except Exception:
+            outcome.error = outcome.status is None
+            raise
+        finally:
+            self.release(outcome, time.monotonic() - start)
+
+
+def _config_key(config: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(config or {}, sort_keys=True)
+
+
+# 同一主机的爬虫共享限速器，限速配置不同时合并为最严格的一份
+_limiters: Dict[str, HostRateLimiter] = {}
+
+
+def get_host_limiter(url: str, config: Dict[str, Any] = None) -> HostRateLimiter:
+    """获取URL所属主机的限速器"""
+    host = urlparse(url).netloc.lower()
+    limiter = _limiters.get(host)
+    if limiter is None:
+        limiter = HostRateLimiter(host, config)
+        _limiters[host] = limiter
+    else:
+        limiter.merge(config)
+    return limiter
+
+
+def reset_host_limiters():
+    """丢弃全部限速器（重新加载配置后调用，新的配置和并发状态从头开始）"""
+    _limiters.clear()
@@ -0,0 +1,52 @@
+"""
+重试工具 - 带抖动的指数退避
+"""
+
+import asyncio
+import logging
+import random
+from typing import Any, Awaitable, Callable, Dict, Tuple, Type
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# 默认重试配置，可在 config.ini 的爬虫条目中通过 retry 覆盖
+DEFAULT_RETRY = {
+    'attempts': 3,       # 总尝试次数（含首次）
+    'base_delay': 1.0,   # 退避基数（秒）
+    'max_delay': 30.0    # 单次退避上限（秒）
+}
+
+# 值得重试的HTTP状态码
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """第 attempt 次失败后的等待时间（full jitter）"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def is_retryable(error: BaseException) -> bool:
+    """判断异常是否值得重试"""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUS
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+async def retry_async(func: Callable[[], Awaitable[Any]], config: Dict[str, Any] = None,
+                      retry_on: Callable[[BaseException], bool] = is_retryable,
+                      description: str = "") -> Any:
+    """执行异步函数，失败时按退避策略重试，最后一次失败的异常原样抛出"""
+    config = {**DEFAULT_RETRY, **(config or {})}
+    attempts = max(1, int(config['attempts']))
+
+    for attempt in range(attempts):
+        try:
+            return await func()
+        except Exception as e:
+            if attempt + 1 >= attempts or not retry_on(e):
+                raise
+            delay = backoff_delay(attempt, float(config['base_delay']), float(config['max_delay']))
+            logger.warning(f"{description} 第{attempt + 1}次失败: {e!r}，{delay:.1f}秒后重试")
+            await asyncio.sleep(delay)
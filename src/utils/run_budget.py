@@ -0,0 +1,67 @@
+"""
+运行时间预算 - 整轮运行的截止时间和各阶段（爬取、保存、发布、清理）的时间上限
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 默认预算（秒），可在 config.ini 的 run_budget 中覆盖；整点任务需要在一小时内结束
+DEFAULT_RUN_BUDGET = {
+    'enabled': True,
+    'total': 3300,      # 整轮运行的截止时间
+    'crawl': 1800,      # 爬取阶段
+    'save': 300,        # 爬取结束后完成去重和保存
+    'publish': 600,     # 上游结束后完成发布
+    'cleanup': 120      # 清理旧数据
+}
+
+
+class RunBudget:
+    """一轮运行的时间预算
+
+    每个阶段的可用时间取该阶段预算与整轮剩余时间中较小者；
+    超时的阶段被取消，已完成的部分（已保存的文章、已发布的平台）保留。
+    """
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = {**DEFAULT_RUN_BUDGET, **(config or {})}
+        self.enabled = self.config['enabled']
+        self.deadline = time.monotonic() + float(self.config['total'])
+        # 超时被取消的阶段
+        self.exceeded = []
+        # 各阶段从开始等待到结束（或超时取消）的秒数；保存和发布从上游结束时开始计时
+        self.stage_seconds: Dict[str, float] = {}
+
+    def remaining(self) -> Optional[float]:
+        """整轮剩余秒数，未启用时返回None"""
+        if not self.enabled:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def timeout(self, stage: str) -> Optional[float]:
+        """阶段的可用秒数，未启用时返回None"""
+        if not self.enabled:
+            return None
+        stage_budget = self.config.get(stage)
+        remaining = self.remaining()
+        return remaining if stage_budget is None else min(float(stage_budget), remaining)
+
+    def mark_exceeded(self, stage: str):
+        """记录阶段超时"""
+        self.exceeded.append(stage)
+        logger.warning(f"{stage} 阶段超出时间预算（{self.config.get(stage)} 秒），已取消，保留已完成的部分")
+
+    async def run(self, stage: str, awaitable: Awaitable) -> Any:
+        """在阶段预算内等待，超时取消并返回None，同时记录阶段耗时"""
+        start = time.monotonic()
+        try:
+            return await asyncio.wait_for(awaitable, timeout=self.timeout(stage))
+        except asyncio.TimeoutError:
+            self.mark_exceeded(stage)
+            return None
+        finally:
+            self.stage_seconds[stage] = round(self.stage_seconds.get(stage, 0.0) + time.monotonic() - start, 3)
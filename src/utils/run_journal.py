@@ -0,0 +1,126 @@
+"""
+运行日志 - 记录本轮已完成的爬虫、已保存的文章和各平台的发布结果，中断后的下一次运行从断点继续
+"""
+
+import fcntl
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class RunJournal:
+    """按轮次追加写入的JSONL日志（data/state/run_journal.jsonl）
+
+    一轮以当前小时为标识（与发布的时间窗口一致）。上一轮在同一小时内未正常结束时，
+    本轮读取其记录继续执行：跳过已完成的爬虫，补发已保存但未发布的文章，不重复发布。
+    运行期间持有文件锁，上一轮仍在运行时（定时任务重叠）本轮直接退出。
+    """
+
+    def __init__(self, data_dir: str = 'data'):
+        self.path = os.path.join(data_dir, 'state', 'run_journal.jsonl')
+        self.run_id: Optional[str] = None
+        self.resumed = False
+        self.crawlers_done: Set[str] = set()
+        self.saved_files: List[str] = []
+        self.published: Dict[str, Set[str]] = {}
+        self._file = None
+        self._lock_file = None
+
+    def begin(self, run_id: str = None) -> bool:
+        """开始一轮，上一轮仍在运行时返回False"""
+        run_id = run_id or datetime.now().strftime('%Y_%m_%d_%H')
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        self._lock_file = open(f"{self.path}.lock", 'a')
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            self._lock_file = None
+            logger.warning("上一轮任务仍在运行，本轮跳过")
+            return False
+
+        self.run_id = run_id
+        records = self._read()
+        if records and records[0].get('run') == run_id and records[-1].get('type') != 'finish':
+            self.resumed = True
+            for record in records:
+                self._apply(record)
+            logger.info(
+                f"从中断的运行 {run_id} 继续：已完成爬虫 {len(self.crawlers_done)} 个，"
+                f"已保存文章 {len(self.saved_files)} 篇，已发布 {sum(len(keys) for keys in self.published.values())} 项"
+            )
+            self._file = open(self.path, 'a', encoding='utf-8')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._append({'type': 'start', 'run': run_id, 'time': datetime.now().isoformat()}, sync=True)
+        return True
+
+    def _read(self) -> List[Dict[str, Any]]:
+        """读取日志，忽略中断时写了一半的最后一行"""
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+        return records
+
+    def _apply(self, record: Dict[str, Any]):
+        record_type = record.get('type')
+        if record_type == 'crawler':
+            self.crawlers_done.add(record['source'])
+        elif record_type == 'saved':
+            self.saved_files.append(record['file'])
+        elif record_type == 'published':
+            self.published.setdefault(record['platform'], set()).add(record['key'])
+
+    def _append(self, record: Dict[str, Any], sync: bool = False):
+        if self._file is None:
+            return
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        if sync:
+            # 发布结果必须落盘，断电重启后也不会重复发布
+            os.fsync(self._file.fileno())
+
+    def crawler_done(self, source: str):
+        """记录爬虫已完成"""
+        self.crawlers_done.add(source)
+        self._append({'type': 'crawler', 'source': source})
+
+    def article_saved(self, filename: str):
+        """记录文章已保存"""
+        self.saved_files.append(filename)
+        self._append({'type': 'saved', 'file': filename})
+
+    def is_published(self, platform: str, key: str) -> bool:
+        """该平台是否已发布过（key 为文章文件名或汇总发布的名称）"""
+        return key in self.published.get(platform, ())
+
+    def mark_published(self, platform: str, key: str):
+        """记录发布成功"""
+        self.published.setdefault(platform, set()).add(key)
+        self._append({'type': 'published', 'platform': platform, 'key': key}, sync=True)
+
+    def finish(self):
+        """本轮正常结束"""
+        self._append({'type': 'finish', 'time': datetime.now().isoformat()}, sync=True)
+        self.close()
+
+    def close(self):
+        """关闭日志并释放锁（未调用 finish 时下一轮会从断点继续）"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
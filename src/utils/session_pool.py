@@ -0,0 +1,43 @@
+"""
+共享HTTP会话 - 常驻模式下所有爬虫复用同一个连接池，跨运行保留DNS缓存和空闲连接
+"""
+
+import logging
+from typing import Tuple
+
+import aiohttp
+
+from utils.http_cassette import open_session
+
+logger = logging.getLogger(__name__)
+
+_enabled = False
+_session = None
+
+
+def enable_shared_session(enabled: bool = True):
+    """开启或关闭共享会话（仅常驻模式开启）"""
+    global _enabled
+    _enabled = enabled
+
+
+def acquire_session(timeout: aiohttp.ClientTimeout) -> Tuple[object, bool]:
+    """获取爬虫会话，返回 (会话, 是否由调用方负责关闭)
+
+    未开启共享时为每个爬虫新建会话；开启时返回共享会话，超时需在每次请求时单独传入。
+    """
+    global _session
+    if not _enabled:
+        return open_session(timeout), True
+    if _session is None or _session.closed:
+        _session = open_session(aiohttp.ClientTimeout(total=None))
+        logger.info("已创建共享HTTP会话")
+    return _session, False
+
+
+async def close_shared_session():
+    """关闭共享会话"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
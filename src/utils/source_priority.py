@@ -0,0 +1,139 @@
+"""
+来源优先级 - 按每秒带来的新文章数（历史平滑值）乘以配置的权重排序，时间不足时放弃低价值来源
+"""
+
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.state_file import read_json, update_entry
+
+# 默认优先级配置，可在 config.ini 的 source_priority 中覆盖，单个来源通过 priority 设置权重
+DEFAULT_SOURCE_PRIORITY = {
+    'enabled': True,
+    'alpha': 0.3,               # 新文章速率和耗时的指数平滑系数
+    'default_duration': 60,     # 没有历史记录的来源预计耗时（秒）
+    'drop_low_value': True,     # 预计完成不了的低价值来源本次跳过
+    'headroom': 0.8,            # 只按爬取预算的该比例安排来源，留出余量
+    'max_skip_seconds': 21600   # 来源被连续跳过超过该秒数后优先运行，不再跳过（0表示不限）
+}
+
+
+class SourcePriority:
+    """按来源持久化的产出统计（data/state/source_priority.json）"""
+
+    def __init__(self, data_dir: str = 'data', config: Dict[str, Any] = None):
+        self.config = {**DEFAULT_SOURCE_PRIORITY, **(config or {})}
+        self.enabled = self.config['enabled']
+        self.path = os.path.join(data_dir, 'state', 'source_priority.json')
+        self.logger = logging.getLogger("source_priority")
+        try:
+            self._stats = read_json(self.path)
+        except Exception as e:
+            self.logger.error(f"读取来源优先级失败: {e}")
+            self._stats = {}
+
+    def record(self, source: str, new_count: int, duration: float):
+        """记录一次爬取的新文章数和耗时（失败按0篇记录，浪费的时间同样计入）"""
+        if not self.enabled:
+            return
+        duration = max(duration, 0.001)
+        rate = new_count / duration
+        stats = self._stats.get(source)
+        if stats is None or 'rate' not in stats:
+            stats = {'rate': rate, 'duration': duration}
+        else:
+            stats.pop('dropped_since', None)
+            alpha = float(self.config['alpha'])
+            stats['rate'] = alpha * rate + (1 - alpha) * stats['rate']
+            stats['duration'] = alpha * duration + (1 - alpha) * stats['duration']
+        stats['rate'] = round(stats['rate'], 4)
+        stats['duration'] = round(stats['duration'], 2)
+        try:
+            self._stats = update_entry(self.path, source, stats)
+        except Exception as e:
+            self.logger.error(f"保存来源优先级失败: {e}")
+
+    def score(self, source: str, source_config: Dict[str, Any] = None) -> float:
+        """来源价值：配置的权重 × 历史每秒新文章数；没有历史的来源按已知最高速率估计，保证先被尝试"""
+        weight = float((source_config or {}).get('priority', 1.0))
+        stats = self._stats.get(source)
+        if stats is None or 'rate' not in stats:
+            known = [item['rate'] for item in self._stats.values() if 'rate' in item]
+            rate = max(known) if known else 1.0
+        else:
+            rate = stats['rate']
+        return weight * rate
+
+    def expected_duration(self, source: str) -> float:
+        """来源的预计耗时（秒）"""
+        stats = self._stats.get(source)
+        return stats['duration'] if stats and 'duration' in stats else float(self.config['default_duration'])
+
+    def _overdue(self, source: str, now: float) -> bool:
+        """来源是否已被连续跳过超过 max_skip_seconds 秒"""
+        max_skip = float(self.config['max_skip_seconds'])
+        dropped_since = self._stats.get(source, {}).get('dropped_since')
+        return bool(max_skip) and dropped_since is not None and now - dropped_since >= max_skip
+
+    def _mark_dropped(self, sources: List[str], now: float):
+        """记录来源开始被跳过的时间，运行后由 record() 清除"""
+        for source in sources:
+            stats = self._stats.get(source, {})
+            if 'dropped_since' in stats:
+                continue
+            try:
+                self._stats = update_entry(self.path, source, {**stats, 'dropped_since': round(now)})
+            except Exception as e:
+                self.logger.error(f"保存来源优先级失败: {e}")
+
+    def plan(self, sources: Sequence[Tuple[str, Dict[str, Any]]], budget: Optional[float] = None,
+             concurrency: int = 0) -> List[str]:
+        """按价值从高到低排列来源，预算不足时去掉排不下的来源
+
+        Args:
+            sources: (来源名, 来源配置) 列表
+            budget: 爬取阶段可用秒数，None表示不限
+            concurrency: 同时运行的爬虫数，0表示全部同时运行
+
+        Returns:
+            本次要运行的来源名，按启动顺序排列
+        """
+        names = [name for name, _ in sources]
+        if not self.enabled:
+            return names
+        configs = dict(sources)
+        ordered = sorted(names, key=lambda name: self.score(name, configs[name]), reverse=True)
+        if budget is None or not self.config['drop_low_value']:
+            return ordered
+
+        # 被跳过太久的来源排在最前且不再跳过，避免低价值来源永远得不到运行
+        now = time.time()
+        overdue = [name for name in ordered if self._overdue(name, now)]
+        if overdue:
+            self.logger.info(f"来源已连续跳过超过 {self.config['max_skip_seconds']} 秒，本次优先运行: {', '.join(overdue)}")
+            ordered = overdue + [name for name in ordered if name not in overdue]
+
+        # 价值已按单位时间计算，按顺序贪心装入 预算 × 并发数 的总时间
+        usable = budget * float(self.config['headroom'])
+        capacity = usable * concurrency if concurrency else None
+        planned, dropped, used = [], [], 0.0
+        for name in ordered:
+            duration = self.expected_duration(name)
+            if name in overdue:
+                planned.append(name)
+                used += duration
+                continue
+            if duration > usable or (capacity is not None and used + duration > capacity):
+                dropped.append(name)
+                continue
+            planned.append(name)
+            used += duration
+        if not planned and ordered:
+            # 一个都排不下时仍运行价值最高的来源，超时取消后已产出的部分照样保留
+            planned.append(dropped.pop(0))
+        if dropped:
+            self._mark_dropped(dropped, now)
+            self.logger.warning(f"爬取预算 {budget:.0f} 秒不足，本次跳过低价值来源: {', '.join(dropped)}")
+        return planned
@@ -0,0 +1,64 @@
+"""
+状态文件 - data/state 下按来源保存的JSON文件，多个进程同时写入时按条目合并
+"""
+
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+
+@contextmanager
+def file_lock(path: str, shared: bool = False) -> Iterator[None]:
+    """对 path 对应的 .lock 文件加锁（同一台机器或支持 flock 的共享卷上的进程之间互斥）"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(f"{path}.lock", 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_json(path: str) -> Dict[str, Any]:
+    """读取JSON状态文件，不存在时返回空字典"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json(path: str, data: Dict[str, Any], mode: Optional[int] = None):
+    """原子写入JSON状态文件（临时文件名带进程号，避免多个进程互相覆盖临时文件）
+
+    Args:
+        mode: 文件权限，如 0o600；在临时文件上设置后再替换，替换前后都不会以更宽的权限出现
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if mode is None:
+        f = open(tmp_path, 'w', encoding='utf-8')
+    else:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        # 临时文件可能是上次中断时留下的，O_CREAT 不会修改已存在文件的权限
+        os.fchmod(fd, mode)
+        f = os.fdopen(fd, 'w', encoding='utf-8')
+    with f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def update_entry(path: str, key: str, value: Any) -> Dict[str, Any]:
+    """加锁后重新读取文件，只替换 key 对应的条目再写回，返回合并后的全部内容
+
+    其他进程在此期间写入的条目会被保留。
+    """
+    with file_lock(path):
+        try:
+            data = read_json(path)
+        except (OSError, ValueError):
+            data = {}
+        data[key] = value
+        write_json(path, data)
+    return data
@@ -0,0 +1,53 @@
+"""
+模板注册表 - 启动时把 config.ini 中 templates 的模板一次性编译到共用的 Jinja2 环境，发布器按名称取用
+"""
+
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from jinja2 import DictLoader, Environment, FileSystemBytecodeCache, Template, TemplateSyntaxError
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateRegistry:
+    """已编译模板的注册表
+
+    模板在创建时全部编译并校验，语法错误的模板记录到 errors 并在日志中报出，
+    取用时视为未配置（发布器使用各自的备用格式）。配置了 cache_dir 时启用字节码缓存，
+    后续进程直接加载编译结果；模板内容变化后缓存自动失效。
+    """
+
+    def __init__(self, templates: Dict[str, str], cache_dir: str = None):
+        self.sources = {name: source for name, source in (templates or {}).items() if isinstance(source, str)}
+        bytecode_cache = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(cache_dir)
+        self.environment = Environment(loader=DictLoader(self.sources), bytecode_cache=bytecode_cache, auto_reload=False)
+        self.templates: Dict[str, Template] = {}
+        self.errors: Dict[str, str] = {}
+        for name in self.sources:
+            try:
+                self.templates[name] = self.environment.get_template(name)
+            except TemplateSyntaxError as e:
+                self.errors[name] = f"第 {e.lineno} 行: {e.message}"
+                logger.error(f"模板 {name} 语法错误，已忽略: {self.errors[name]}")
+        # 代码中的默认模板（不在配置中）按内容缓存
+        self._inline: Dict[str, Template] = {}
+
+    def get(self, name: str) -> Optional[Template]:
+        """按名称取已编译的模板，未配置或有语法错误时返回None"""
+        return self.templates.get(name)
+
+    def render(self, name: str, default: str = None, **context: Any) -> str:
+        """渲染模板，未配置时使用 default 模板字符串，两者都没有时返回空字符串"""
+        template = self.get(name)
+        if template is None:
+            if not default:
+                return ''
+            template = self._inline.get(default)
+            if template is None:
+                template = self._inline[default] = self.environment.from_string(default)
+        return template.render(**context)
@@ -0,0 +1,122 @@
+"""
+访问令牌缓存 - 把发布平台的 access_token 和过期时间保存到 data/state，多个进程和多次运行共用
+"""
+
+import asyncio
+import fcntl
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from utils.state_file import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+# 默认配置，可在 config.ini 的 token_cache 中覆盖
+DEFAULT_TOKEN_CACHE = {
+    'enabled': True,
+    'refresh_margin': 300,      # 距过期不足该秒数时提前刷新
+    'default_expires_in': 7200  # 接口未返回 expires_in 时按该秒数计算
+}
+
+# 获取令牌的回调：成功返回 (access_token, expires_in)，失败返回None
+TokenFetcher = Callable[[], Awaitable[Optional[Tuple[str, Optional[int]]]]]
+
+
+class TokenCache:
+    """按键（平台:账号）保存的令牌缓存（data/state/access_tokens.json）
+
+    令牌在过期前 refresh_margin 秒内视为需要刷新。刷新期间持有文件锁，
+    同时运行的其他进程等待后直接读取新令牌，不会各自请求一次。
+    进程内另外保存一份，有效期内不重复读文件；未启用时只使用进程内的令牌。
+    """
+
+    def __init__(self, data_dir: str = 'data', config: Dict[str, Any] = None):
+        self.config = {**DEFAULT_TOKEN_CACHE, **(config or {})}
+        self.enabled = self.config['enabled']
+        self.path = os.path.join(data_dir, 'state', 'access_tokens.json')
+        # 同一进程内的协程按键串行刷新
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # 进程内的令牌，按键保存 access_token、expires_in、expires_at
+        self._memory: Dict[str, Dict[str, Any]] = {}
+
+    def _valid(self, entry: Optional[Dict[str, Any]]) -> bool:
+        if not entry:
+            return False
+        # 有效期很短的令牌最多提前一半有效期刷新，避免每次都重新请求
+        margin = min(float(self.config['refresh_margin']), entry.get('expires_in', 0) / 2)
+        return entry.get('expires_at', 0) - margin > time.time()
+
+    def _read_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return self._memory.get(key)
+        try:
+            return read_json(self.path).get(key)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取令牌缓存失败: {e}")
+            return None
+
+    def _write_entry(self, key: str, entry: Dict[str, Any]):
+        """调用方已持有文件锁"""
+        try:
+            data = read_json(self.path)
+        except (OSError, ValueError):
+            data = {}
+        data[key] = entry
+        # 令牌等同于密钥，只允许当前用户读写
+        write_json(self.path, data, mode=0o600)
+
+    async def get(self, key: str, fetch: TokenFetcher, stale: str = None) -> Optional[str]:
+        """返回有效的令牌，缓存中没有、即将过期或等于 stale 时调用 fetch 刷新
+
+        Args:
+            key: 缓存键，如 "wechat:<app_id>"
+            fetch: 向平台请求新令牌的协程函数
+            stale: 已被接口判定失效的令牌，其他进程已刷新成不同的令牌时直接使用新令牌
+        """
+        def usable(entry):
+            return self._valid(entry) and entry.get('access_token') != stale
+
+        entry = self._memory.get(key)
+        if usable(entry):
+            return entry['access_token']
+        entry = self._read_entry(key)
+        if usable(entry):
+            self._memory[key] = entry
+            return entry['access_token']
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if not self.enabled:
+                return await self._refresh(key, fetch, usable)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(f"{self.path}.lock", 'a') as lock_file:
+                # 其他进程可能正在刷新，在线程中等待文件锁，不阻塞事件循环
+                await asyncio.to_thread(fcntl.flock, lock_file, fcntl.LOCK_EX)
+                try:
+                    return await self._refresh(key, fetch, usable)
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    async def _refresh(self, key: str, fetch: TokenFetcher, usable: Callable[[Any], bool]) -> Optional[str]:
+        """持有锁后再检查一次（等待期间可能已被刷新），仍不可用时请求新令牌"""
+        entry = self._read_entry(key)
+        if usable(entry):
+            self._memory[key] = entry
+            return entry['access_token']
+
+        result = await fetch()
+        if not result:
+            return None
+        token, expires_in = result
+        expires_in = int(expires_in or self.config['default_expires_in'])
+        entry = {'access_token': token, 'expires_in': expires_in, 'expires_at': time.time() + expires_in}
+        self._memory[key] = entry
+        if self.enabled:
+            try:
+                self._write_entry(key, entry)
+            except OSError as e:
+                logger.warning(f"保存令牌缓存失败: {e}")
+        logger.info(f"已刷新访问令牌 {key}，{expires_in} 秒后过期")
+        return token